@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncioによるスキルシートの変換パイプライン
+1つのスキルシートのxlsx・docx・html・pdfは互いに独立しているため、同時に変換を始め、
+ドキュメントあたりの所要時間を各形式の合計ではなく最も遅い形式の時間にする
+
+- xlsx・docx・ネイティブのPDFはCPU処理のため、プロセスプール（executor）で描画する
+- マークダウンの読み込みとHTMLの書き込みはスレッドで行い、イベントループを止めない
+- browserのPDFはメモリ上のHTML（htmlの出力と共通）を常駐のPdfRenderWorkerに渡し、HTMLファイルを待たない
+- 複数ドキュメントを変換する場合、同時に変換するドキュメント数をlimitで制限する
+
+使い方:
+    python async_pipeline.py HM_スキルシート.md -f xlsx docx html pdf
+    python async_pipeline.py skillsheets/ --limit 8 --pdf-backend native
+
+    # Pythonから
+    results = asyncio.run(render_documents(md_files, ['xlsx', 'docx', 'html', 'pdf']))
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_convert import CONVERTERS, DEFAULT_FORMATS, PDF_BACKENDS, collect_markdown_files, load_renderer, output_path, print_result
+from instrumentation import init_worker, worker_config
+from skill_sheet_model import load_document
+
+# 同時に変換するドキュメント数の既定値
+DEFAULT_LIMIT = 4
+
+def render_format(fmt, pdf_backend, document, target):
+    """executorで実行する描画（プロセスプールに渡すため、モジュールの関数にする）"""
+    load_renderer(fmt, pdf_backend)(document, target)
+    return target
+
+def render_html_text(document):
+    """executorで実行するHTMLの作成（文字列を返す）"""
+    from simple_md_to_pdf import render_html
+    return render_html(document)
+
+def write_text(path, text):
+    """テキストファイルの書き込み（スレッドで実行する）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+def prepare_document(md_file):
+    """スキルシートを読み込み、描画で使う解析結果を作成しておく（スレッドで実行する）
+
+    executorの各プロセスには解析済みのドキュメントを渡すため、形式ごとに解析し直さない
+    """
+    document = load_document(md_file)
+    document.blocks
+    return document
+
+class AsyncPipeline:
+    """executorとPDF描画ワーカーを保持し、ドキュメントを非同期に変換する"""
+
+    def __init__(self, formats=DEFAULT_FORMATS, output_dir=None, pdf_backend='browser', limit=DEFAULT_LIMIT,
+                 executor=None, pdf_worker=None):
+        self.formats = list(formats)
+        self.output_dir = output_dir
+        self.pdf_backend = pdf_backend
+        self.limit = asyncio.Semaphore(limit)
+        self.executor = executor
+        self.pdf_worker = pdf_worker
+        self._owns_executor = executor is None
+        self._owns_pdf_worker = pdf_worker is None
+
+    async def __aenter__(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(initializer=init_worker, initargs=(worker_config(),))
+        if self.pdf_worker is None and 'pdf' in self.formats and self.pdf_backend == 'browser':
+            from pdf_render_worker import PdfRenderWorker
+            # ブラウザの起動を待つ間もイベントループを止めない
+            self.pdf_worker = await asyncio.to_thread(PdfRenderWorker)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        # プロセスプールの子プロセスはPDF描画ワーカーの標準入力を引き継いでいるため、先に終了させる
+        # （残っているとワーカーが入力の終わりを受け取れず、終了を待ち続ける）
+        if self._owns_executor and self.executor is not None:
+            await asyncio.to_thread(self.executor.shutdown)
+            self.executor = None
+        if self._owns_pdf_worker and self.pdf_worker is not None:
+            await asyncio.to_thread(self.pdf_worker.close)
+            self.pdf_worker = None
+
+    async def run_in_executor(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def html(self, document, target):
+        """HTMLを作成し、htmlの出力があればファイルに書き込む（PDFはこの結果の文字列を使う）"""
+        html = await self.run_in_executor(render_html_text, document)
+        if 'html' in self.formats:
+            await asyncio.to_thread(write_text, target, html)
+        return html
+
+    async def pdf(self, document, html_task, target):
+        """PDFを描画する（browserの場合はHTMLの作成を待ってからワーカーに渡す）"""
+        if self.pdf_backend != 'browser':
+            return await self.run_in_executor(render_format, 'pdf', self.pdf_backend, document, target)
+        if self.pdf_worker is None:
+            raise RuntimeError("PDF描画ワーカーが起動していません")
+        html = await html_task
+        return await asyncio.wrap_future(self.pdf_worker.render(html, target))
+
+    async def render_document(self, md_file):
+        """1ファイルをすべての形式に同時に変換し、batch_convert.convert_one と同じ形式の結果を返す"""
+        async with self.limit:
+            started = time.perf_counter()
+            try:
+                document = await asyncio.to_thread(prepare_document, md_file)
+                load_error = None
+            except Exception as e:
+                document = None
+                load_error = f"{type(e).__name__}: {e}"
+
+            targets = {fmt: output_path(md_file, CONVERTERS[fmt][0], self.output_dir) for fmt in self.formats}
+            outcomes = {fmt: (0.0, load_error) for fmt in self.formats}
+            if document is not None:
+                # htmlとbrowserのPDFは同じHTMLを使う
+                tasks = {}
+                html_task = None
+                if 'html' in self.formats or ('pdf' in self.formats and self.pdf_backend == 'browser'):
+                    html_task = asyncio.ensure_future(self.html(document, targets.get('html')))
+                for fmt in self.formats:
+                    if fmt == 'html':
+                        tasks[fmt] = html_task
+                    elif fmt == 'pdf':
+                        tasks[fmt] = asyncio.ensure_future(self.pdf(document, html_task, targets[fmt]))
+                    else:
+                        tasks[fmt] = asyncio.ensure_future(
+                            self.run_in_executor(render_format, fmt, self.pdf_backend, document, targets[fmt]))
+                timings = await asyncio.gather(*(timed(task, started) for task in tasks.values()))
+                outcomes = dict(zip(tasks, timings))
+                if html_task is not None and 'html' not in self.formats:
+                    await asyncio.gather(html_task, return_exceptions=True)
+
+            return {
+                'file': md_file,
+                'results': {
+                    fmt: {'output': targets[fmt], 'seconds': seconds, 'error': error}
+                    for fmt, (seconds, error) in outcomes.items()
+                },
+                'issues': [],
+                'seconds': time.perf_counter() - started,
+            }
+
+    async def render_documents(self, md_files):
+        """複数ファイルを同時に変換し、完了順に結果を返す（非同期イテレーター）"""
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        for future in asyncio.as_completed([self.render_document(md_file) for md_file in md_files]):
+            yield await future
+
+async def timed(task, started):
+    """タスクの完了を待ち、(変換開始からの秒数, エラー) を返す（例外は形式ごとのエラーにする）"""
+    try:
+        await task
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - started, error
+
+async def render_documents(md_files, formats=DEFAULT_FORMATS, output_dir=None, pdf_backend='browser',
+                           limit=DEFAULT_LIMIT):
+    """複数ファイルを変換し、結果のリストを完了順に返す"""
+    async with AsyncPipeline(formats, output_dir, pdf_backend, limit) as pipeline:
+        return [result async for result in pipeline.render_documents(md_files)]
+
+async def run(md_files, formats, output_dir, pdf_backend, limit):
+    """変換しながら結果を表示し、失敗したファイル数を返す"""
+    failures = 0
+    async with AsyncPipeline(formats, output_dir, pdf_backend, limit) as pipeline:
+        async for result in pipeline.render_documents(md_files):
+            print_result(result)
+            if any(item['error'] for item in result['results'].values()):
+                failures += 1
+    return failures
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="スキルシートの各形式をasyncioで同時に変換します")
+    parser.add_argument('targets', nargs='+', help="マークダウンファイル、ディレクトリ、またはglobパターン")
+    parser.add_argument('-f', '--formats', nargs='+', choices=sorted(CONVERTERS), default=DEFAULT_FORMATS,
+                        help="出力形式（既定: xlsx docx html）")
+    parser.add_argument('--pdf-backend', choices=sorted(PDF_BACKENDS), default='browser',
+                        help="PDFの描画方式（browser: 常駐のブラウザ, native: Pythonのみ）")
+    parser.add_argument('-o', '--output-dir', help="出力先ディレクトリ（既定: 入力ファイルと同じ場所）")
+    parser.add_argument('-r', '--recursive', action='store_true', help="ディレクトリを再帰的に探索する")
+    parser.add_argument('--csv', action='store_true', help="ディレクトリ内のグリッド形式のCSV（*.csv）も変換する")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f"同時に変換するドキュメント数（既定: {DEFAULT_LIMIT}）")
+    args = parser.parse_args(argv)
+
+    extensions = ('.md', '.csv') if args.csv else ('.md',)
+    md_files = collect_markdown_files(args.targets, args.recursive, extensions)
+    if not md_files:
+        print("✗ 変換対象のファイルが見つかりません")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        failures = asyncio.run(run(md_files, args.formats, args.output_dir, args.pdf_backend, max(1, args.limit)))
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+    print(f"\n{len(md_files)}ファイルを {time.perf_counter() - started:.2f}秒で変換しました（失敗: {failures}）")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
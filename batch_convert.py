@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ディレクトリ・globで指定した複数のスキルシートを一括変換するスクリプト
+変換はファイル単位で独立しているため、プロセスプールで並列に実行する
+各ファイルは描画の前に構造を検査し（validate_sheet.py）、エラーのあるファイルは描画せずに除外する
+"""
+
+import argparse
+import glob
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from build_cache import BuildCache, CACHE_FILE_NAME
+from instrumentation import init_worker, span, worker_config
+from skill_sheet_model import load_document
+
+# 出力形式ごとの拡張子と描画関数（モジュール名, 関数名）
+# 描画関数はいずれも共通ドキュメントモデルを受け取る。pandas・openpyxl・python-docxなどの
+# 重い依存は、load_renderer()で実際に使う形式のモジュールを読み込むときだけインポートされる
+CONVERTERS = {
+    'xlsx': ('.xlsx', 'md_to_xlsx_improved', 'render_workbook'),
+    'docx': ('.docx', 'md_to_docx', 'render_docx'),
+    'html': ('.html', 'simple_md_to_pdf', 'write_html'),
+    'pdf': ('.pdf', 'simple_md_to_pdf', 'render_pdf'),
+}
+
+# PDFの描画方式（browser: html_to_pdf.js, native: Pythonのみで描画）
+PDF_BACKENDS = {
+    'browser': ('simple_md_to_pdf', 'render_pdf'),
+    'native': ('md_to_pdf_native', 'render_pdf_native'),
+}
+
+# 既定で変換する形式（PDFはNode.jsとpuppeteerが必要なため明示指定のみ）
+DEFAULT_FORMATS = ['xlsx', 'docx', 'html']
+
+# 出力形式ごとの変換スクリプト（ビルドキャッシュでバージョンとして扱う）
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONVERTER_SOURCES = {
+    'xlsx': ['md_to_xlsx_improved.py', 'skill_experience.py', 'skill_index.py'],
+    'docx': ['md_to_docx.py', 'font_subset.py'],
+    'html': ['simple_md_to_pdf.py', 'font_subset.py'],
+}
+PDF_BACKEND_SOURCES = {
+    'browser': ['simple_md_to_pdf.py', 'pdf_render_worker.py', 'html_to_pdf.js', 'font_subset.py'],
+    'native': ['md_to_pdf_native.py', 'font_subset.py'],
+}
+
+# すべての形式が使うマークダウンの解析スクリプト（共通ドキュメントモデルと、その見出し索引・抽出関数）
+MODEL_SOURCES = ['skill_sheet_model.py', 'md_to_xlsx_improved.py']
+
+# 日本語フォントのサブセットを埋め込む形式（font_subset.py）
+FONT_FORMATS = ['docx', 'html', 'pdf']
+
+# マークダウン以外の入力の読み込みスクリプト（拡張子ごと）
+READER_SOURCES = {
+    '.csv': ['read_hm_csv.py', 'skill_sheet_writer.py'],
+}
+
+def converter_files(fmt, pdf_backend='browser', md_file=None):
+    """出力形式の変換スクリプトのパス一覧（解析スクリプトと、md_fileがCSVなどの場合は読み込みスクリプトも含める）"""
+    names = PDF_BACKEND_SOURCES[pdf_backend] if fmt == 'pdf' else CONVERTER_SOURCES[fmt]
+    names = MODEL_SOURCES + [name for name in names if name not in MODEL_SOURCES]
+    if md_file is not None:
+        names = names + READER_SOURCES.get(os.path.splitext(md_file)[1].lower(), [])
+    return [os.path.join(SCRIPT_DIR, name) for name in names]
+
+def build_inputs(md_file, fmt, docx_template=None):
+    """出力の生成元のファイル（docxのテンプレート・埋め込むフォントがある場合はそれも含める）"""
+    from font_subset import find_font
+
+    inputs = [md_file]
+    if fmt == 'docx' and docx_template:
+        inputs.append(docx_template)
+    font_file = find_font() if fmt in FONT_FORMATS else None
+    if font_file:
+        inputs.append(font_file)
+    return inputs
+
+def build_params(fmt):
+    """出力の内容を変えるファイル以外の条件（xlsxは経験年数（実績）の基準の月）"""
+    if fmt == 'xlsx':
+        from skill_experience import current_month, month_label
+        return {'as_of': month_label(current_month())}
+    return {}
+
+def load_renderer(fmt, pdf_backend='browser'):
+    """出力形式の描画関数を読み込む"""
+    module_name, function_name = PDF_BACKENDS[pdf_backend] if fmt == 'pdf' else CONVERTERS[fmt][1:]
+    return getattr(importlib.import_module(module_name), function_name)
+
+def collect_markdown_files(targets, recursive=False, extensions=('.md',)):
+    """ディレクトリ・glob・ファイルの指定からマークダウンファイルを列挙
+
+    ディレクトリ内はextensionsの拡張子のファイルを対象にする
+    """
+    md_files = []
+    for target in targets:
+        if os.path.isdir(target):
+            for extension in extensions:
+                name = '*' + extension
+                pattern = os.path.join(target, '**', name) if recursive else os.path.join(target, name)
+                md_files.extend(glob.glob(pattern, recursive=recursive))
+        elif glob.has_magic(target):
+            md_files.extend(glob.glob(target, recursive=recursive))
+        else:
+            md_files.append(target)
+
+    # 重複を除き、実行順を安定させる
+    return sorted(set(os.path.normpath(path) for path in md_files))
+
+def output_path(md_file, extension, output_dir=None):
+    """入力ファイルに対応する出力ファイルのパスを決定"""
+    base_name = os.path.splitext(os.path.basename(md_file))[0] + extension
+    directory = output_dir if output_dir else os.path.dirname(md_file)
+    return os.path.join(directory, base_name)
+
+def convert_one(md_file, formats, output_dir=None, pdf_backend='browser', defer_pdf=False, docx_template=None,
+                validate='off'):
+    """1ファイルを指定形式に変換し、形式ごとの結果と所要時間を返す
+
+    例外は形式ごとに捕捉し、他の形式・他のファイルの変換は継続する
+    defer_pdfを指定した場合、PDFは描画せずにHTMLを結果の'html'に入れて返す
+    docx_templateを指定した場合、Word文書はそのテンプレート（.docx・.dotx）のスタイルで作成する
+    validateが'on'・'strict'の場合は描画の前に構造を検査して結果の'issues'に入れ、
+    エラー（'strict'では警告も）があればどの形式も描画しない
+    """
+    started = time.perf_counter()
+    results = {}
+    issues = []
+
+    # マークダウンの解析は1回だけ行い、検査とすべての形式で共有する
+    try:
+        document = load_document(md_file)
+        load_error = None
+        if validate != 'off':
+            from validate_sheet import is_rejected, validate_document
+            with span('validate', file=md_file):
+                issues = validate_document(document)
+            if is_rejected(issues, validate == 'strict'):
+                document = None
+                load_error = f"構造の検査で不合格のため変換しません（{len(issues)}件）"
+    except Exception as e:
+        document = None
+        load_error = f"{type(e).__name__}: {e}"
+
+    for fmt in formats:
+        extension = CONVERTERS[fmt][0]
+        target = output_path(md_file, extension, output_dir)
+        fmt_started = time.perf_counter()
+        error = load_error
+        if document is not None:
+            try:
+                with span('convert', file=md_file, format=fmt):
+                    if fmt == 'pdf' and defer_pdf:
+                        from simple_md_to_pdf import render_html
+                        results[fmt] = {'html': render_html(document)}
+                    elif fmt == 'docx' and docx_template:
+                        load_renderer(fmt)(document, target, template_file=docx_template)
+                    else:
+                        load_renderer(fmt, pdf_backend)(document, target)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        results.setdefault(fmt, {}).update({
+            'output': target,
+            'seconds': time.perf_counter() - fmt_started,
+            'error': error,
+        })
+
+    return {
+        'file': md_file,
+        'results': results,
+        'issues': issues,
+        'seconds': time.perf_counter() - started,
+    }
+
+def plan_builds(md_files, formats, cache=None, force=False, output_dir=None, pdf_backend='browser',
+                docx_template=None):
+    """ファイルごとに再生成が必要な形式とその理由を決定
+
+    戻り値は (md_file, {形式: 理由}) のリスト。再生成不要の形式は含まない
+    """
+    plan = []
+    for md_file in md_files:
+        reasons = {}
+        for fmt in formats:
+            if force:
+                reasons[fmt] = '--force'
+            elif cache is None:
+                reasons[fmt] = 'キャッシュ無効'
+            else:
+                target = output_path(md_file, CONVERTERS[fmt][0], output_dir)
+                reason = cache.check(target, build_inputs(md_file, fmt, docx_template),
+                                     converter_files(fmt, pdf_backend, md_file), build_params(fmt))
+                if reason:
+                    reasons[fmt] = reason
+        plan.append((md_file, reasons))
+    return plan
+
+def convert_all(jobs, workers=None, output_dir=None, pdf_backend='browser', defer_pdf=False, docx_template=None,
+                validate='off'):
+    """(ファイル, 形式リスト) の一覧をプロセスプールで変換し、完了順に結果を返す"""
+    if workers == 1:
+        # 1ワーカーの場合はプロセスを起動せずに順番に処理
+        for md_file, formats in jobs:
+            yield convert_one(md_file, formats, output_dir, pdf_backend, defer_pdf, docx_template, validate)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(worker_config(),)) as executor:
+        futures = {
+            executor.submit(convert_one, md_file, formats, output_dir, pdf_backend, defer_pdf, docx_template,
+                            validate): (md_file, formats)
+            for md_file, formats in jobs
+        }
+        for future in as_completed(futures):
+            md_file, formats = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                # ワーカープロセス自体の異常終了もファイル単位のエラーとして扱う
+                error = f"{type(e).__name__}: {e}"
+                yield {
+                    'file': md_file,
+                    'results': {fmt: {'output': None, 'seconds': 0.0, 'error': error} for fmt in formats},
+                    'issues': [],
+                    'seconds': 0.0,
+                }
+
+def finish_pdf(result, submitted, future):
+    """PDF描画ワーカーの結果を変換結果に反映（所要時間は描画待ちを含む）"""
+    item = result['results']['pdf']
+    try:
+        future.result()
+    except Exception as e:
+        item['error'] = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - submitted
+    item['seconds'] += elapsed
+    result['seconds'] += elapsed
+    return result
+
+def run_batch(jobs, workers=None, output_dir=None, pdf_backend='browser', docx_template=None, validate='off'):
+    """(ファイル, 形式リスト) の一覧を変換し、完了順に結果を返す
+
+    browserのPDFは各ワーカーでHTMLまで作成し、ブラウザを1回だけ起動した常駐ワーカーでまとめて描画する
+    nativeのPDFは他の形式と同じくプロセスプールで描画する
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    jobs = list(jobs)
+    if pdf_backend != 'browser' or not any('pdf' in formats for _, formats in jobs):
+        yield from convert_all(jobs, workers, output_dir, pdf_backend, docx_template=docx_template, validate=validate)
+        return
+
+    from pdf_render_worker import PdfRenderWorker
+    try:
+        pdf_worker = PdfRenderWorker()
+        startup_error = None
+    except (OSError, RuntimeError) as e:
+        pdf_worker = None
+        startup_error = f"{type(e).__name__}: {e}"
+
+    pending = {}
+    try:
+        for result in convert_all(jobs, workers, output_dir, pdf_backend, True, docx_template, validate):
+            item = result['results'].get('pdf')
+            html = item.pop('html', None) if item else None
+            if html is None or item['error']:
+                yield result
+                continue
+            if pdf_worker is None:
+                item['error'] = startup_error
+                yield result
+                continue
+            try:
+                future = pdf_worker.render(html, item['output'])
+            except (OSError, RuntimeError) as e:
+                item['error'] = f"{type(e).__name__}: {e}"
+                yield result
+                continue
+            pending[future] = (result, time.perf_counter())
+
+            # 描画が終わったものから順に返す
+            for future in [future for future in pending if future.done()]:
+                yield finish_pdf(*pending.pop(future), future)
+
+        for future in as_completed(list(pending)):
+            yield finish_pdf(*pending.pop(future), future)
+    finally:
+        if pdf_worker is not None:
+            pdf_worker.close()
+
+def print_result(result):
+    """1ファイル分の変換結果を表示"""
+    failed = [fmt for fmt, item in result['results'].items() if item['error']]
+    mark = '✗' if failed else '✓'
+    timings = ', '.join(f"{fmt} {item['seconds']:.2f}s" for fmt, item in result['results'].items())
+    print(f"{mark} {result['file']} ({result['seconds']:.2f}s: {timings})")
+    if result.get('issues'):
+        from validate_sheet import format_issue
+        for issue in result['issues']:
+            print(f"    {format_issue(result['file'], issue)}")
+    for fmt in failed:
+        print(f"    ✗ {fmt}: {result['results'][fmt]['error']}")
+
+def print_rebuild_report(plan, skipped_outputs):
+    """再生成した出力と理由、スキップした件数を表示"""
+    rebuilt = [(md_file, fmt, reason) for md_file, reasons in plan for fmt, reason in reasons.items()]
+    print(f"\n再生成: {len(rebuilt)}件 / 変更なしでスキップ: {skipped_outputs}件")
+    for md_file, fmt, reason in rebuilt:
+        print(f"  - {md_file} [{fmt}] {reason}")
+
+def print_summary(results, elapsed, workers):
+    """全体の件数・所要時間・スループットを表示"""
+    failed = [result for result in results if any(item['error'] for item in result['results'].values())]
+    outputs = sum(len(result['results']) for result in results)
+    cpu_seconds = sum(result['seconds'] for result in results)
+
+    print("\n" + "=" * 50)
+    print("一括変換完了")
+    print("=" * 50)
+    print(f"ファイル数: {len(results)}（成功 {len(results) - len(failed)} / 失敗 {len(failed)}）")
+    print(f"ワーカー数: {workers}")
+    print(f"経過時間: {elapsed:.2f}秒（変換時間の合計 {cpu_seconds:.2f}秒）")
+    if elapsed > 0:
+        print(f"スループット: {len(results) / elapsed:.2f} ファイル/秒, {outputs / elapsed:.2f} 出力/秒")
+    warned = [result for result in results if result.get('issues')]
+    if warned:
+        print(f"構造の検査: 問題のあるファイル {len(warned)}件"
+              f"（エラー・警告 {sum(len(result['issues']) for result in warned)}件）")
+    if failed:
+        print("\n失敗したファイル:")
+        for result in failed:
+            print(f"  - {result['file']}")
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="スキルシート（マークダウン）を一括で変換します")
+    parser.add_argument('targets', nargs='+', help="マークダウンファイル、ディレクトリ、またはglobパターン")
+    parser.add_argument('-f', '--formats', nargs='+', choices=sorted(CONVERTERS), default=DEFAULT_FORMATS,
+                        help="出力形式（既定: xlsx docx html）")
+    parser.add_argument('--pdf-backend', choices=sorted(PDF_BACKENDS), default='browser',
+                        help="PDFの描画方式（browser: Node.jsとpuppeteer, native: Pythonのみ）")
+    parser.add_argument('--docx-template', metavar='FILE',
+                        help="Word文書のスタイル・ページ設定に使うテンプレート（.docx・.dotx）")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help="並列ワーカー数（既定: CPUコア数）")
+    parser.add_argument('-o', '--output-dir', help="出力先ディレクトリ（既定: 入力ファイルと同じ場所）")
+    parser.add_argument('-r', '--recursive', action='store_true', help="ディレクトリを再帰的に探索する")
+    parser.add_argument('--csv', action='store_true',
+                        help="ディレクトリ内のグリッド形式のスキルシートCSV（*.csv）も変換する")
+    parser.add_argument('--force', action='store_true', help="キャッシュを無視してすべて再生成する")
+    parser.add_argument('--cache-file', help=f"ビルドキャッシュのパス（既定: 出力先の{CACHE_FILE_NAME}）")
+    parser.add_argument('--no-cache', action='store_true', help="ビルドキャッシュを使用しない")
+    parser.add_argument('--validate', choices=['on', 'strict', 'off'], default='on',
+                        help="描画前の構造の検査（on: エラーのあるファイルを除外, strict: 警告のあるファイルも除外, off: 検査しない）")
+    parser.add_argument('--as-of', metavar='YYYY-MM',
+                        help="「現在」まで続くプロジェクトの経験年数（実績）を数える基準の月（既定: 今月）")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers には1以上を指定してください")
+    if args.docx_template and not os.path.exists(args.docx_template):
+        print(f"✗ テンプレートが見つかりません: {args.docx_template}")
+        return 1
+
+    # 基準の月は開始時に固定し、環境変数でワーカープロセスにも渡す
+    # （月をまたいで実行しても全ファイルで揃え、ビルドキャッシュにも同じ月を記録する）
+    from skill_experience import AS_OF_ENV, current_month, month_label
+    if args.as_of:
+        os.environ[AS_OF_ENV] = args.as_of
+    try:
+        os.environ[AS_OF_ENV] = month_label(current_month())
+    except ValueError as e:
+        print(f"✗ --as-of: {e}")
+        return 1
+
+    extensions = ('.md', '.csv') if args.csv else ('.md',)
+    md_files = collect_markdown_files(args.targets, args.recursive, extensions)
+    if not md_files:
+        print("✗ 変換対象のマークダウンファイルが見つかりません")
+        return 1
+
+    cache = None
+    if not args.no_cache:
+        cache_file = args.cache_file or os.path.join(args.output_dir or '.', CACHE_FILE_NAME)
+        cache = BuildCache(cache_file)
+
+    # 入力・変換スクリプトが変わっていない出力は除外
+    plan = plan_builds(md_files, args.formats, cache, args.force, args.output_dir, args.pdf_backend, args.docx_template)
+    jobs = [(md_file, list(reasons)) for md_file, reasons in plan if reasons]
+    skipped_outputs = len(md_files) * len(args.formats) - sum(len(formats) for _, formats in jobs)
+
+    print(f"{len(md_files)}件中{len(jobs)}件のマークダウンファイルを変換します（ワーカー数: {args.workers}）...\n")
+
+    started = time.perf_counter()
+    results = []
+    for result in run_batch(jobs, args.workers, args.output_dir, args.pdf_backend, args.docx_template, args.validate):
+        print_result(result)
+        results.append(result)
+        if cache is not None:
+            for fmt, item in result['results'].items():
+                if not item['error']:
+                    cache.record(item['output'], build_inputs(result['file'], fmt, args.docx_template),
+                                 converter_files(fmt, args.pdf_backend, result['file']), build_params(fmt))
+    elapsed = time.perf_counter() - started
+
+    if cache is not None:
+        cache.save()
+
+    print_rebuild_report(plan, skipped_outputs)
+    print_summary(results, elapsed, args.workers)
+    return 1 if any(item['error'] for result in results for item in result['results'].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
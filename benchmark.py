@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+変換処理のベンチマーク
+generate_skill_sheet.py で作成した架空のスキルシートを規模別に変換し、
+処理時間とピークメモリを計測してJSONに保存する（前回の結果と比較して劣化を検出できる）
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from generate_skill_sheet import write_skill_sheet
+
+# 規模ごとの生成パラメータ
+SIZES = {
+    'small': {'projects': 3, 'table_rows': 3, 'list_items': 3, 'text_length': 40},
+    'medium': {'projects': 12, 'table_rows': 6, 'list_items': 5, 'text_length': 80},
+    'large': {'projects': 50, 'table_rows': 15, 'list_items': 8, 'text_length': 150},
+    'xlarge': {'projects': 200, 'table_rows': 40, 'list_items': 12, 'text_length': 300},
+}
+
+# 計測対象の変換関数（出力の拡張子, モジュール名, 関数名）
+TARGETS = {
+    'xlsx': ('.xlsx', 'md_to_xlsx_improved', 'parse_markdown_to_excel'),
+    'docx': ('.docx', 'md_to_docx', 'markdown_to_docx'),
+    'html': ('.html', 'simple_md_to_pdf', 'markdown_to_html'),
+}
+
+# 結果ファイルの形式が変わったら上げる
+RESULT_FORMAT_VERSION = 1
+
+def git_revision():
+    """計測したコードのコミット（gitが使えない場合はNone）"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+def run_quietly(function, *args):
+    """変換関数の完了メッセージを表示せずに実行"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+def measure(function, md_file, output_file, repeat):
+    """処理時間（repeat回）とピークメモリ（tracemallocで1回）を計測"""
+    # 初回のインポート・キャッシュの影響を除くため1回空実行する
+    run_quietly(function, md_file, output_file)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run_quietly(function, md_file, output_file)
+        timings.append(time.perf_counter() - started)
+
+    # tracemallocは処理を遅くするため、時間の計測とは別に実行する
+    tracemalloc.start()
+    try:
+        run_quietly(function, md_file, output_file)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': {
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.mean(timings),
+        },
+        'peak_memory_bytes': peak,
+        'output_bytes': os.path.getsize(output_file),
+    }
+
+def run_benchmark(sizes, targets, repeat=3, seed=0):
+    """規模・変換関数の組み合わせごとに計測し、結果のリストを返す"""
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            params = SIZES[size]
+            md_file = write_skill_sheet(os.path.join(work_dir, f"{size}.md"), seed=seed, **params)
+            for target in targets:
+                extension, module_name, function_name = TARGETS[target]
+                function = getattr(importlib.import_module(module_name), function_name)
+                output_file = os.path.join(work_dir, f"{size}{extension}")
+                result = {
+                    'size': size,
+                    'params': params,
+                    'target': target,
+                    'function': f"{module_name}.{function_name}",
+                    'input_bytes': os.path.getsize(md_file),
+                    'repeat': repeat,
+                }
+                result.update(measure(function, md_file, output_file, repeat))
+                print_result(result)
+                results.append(result)
+    return results
+
+def print_result(result):
+    """1件分の計測結果を表示"""
+    seconds = result['seconds']
+    print(f"✓ {result['size']:<7} {result['target']:<5} "
+          f"中央値 {seconds['median'] * 1000:9.1f} ms (最小 {seconds['min'] * 1000:9.1f} ms)  "
+          f"ピークメモリ {result['peak_memory_bytes'] / 1024 / 1024:7.2f} MiB  "
+          f"入力 {result['input_bytes'] / 1024:7.1f} KiB")
+
+def save_results(results, result_file, repeat, seed):
+    """計測結果と実行環境をJSONに保存"""
+    data = {
+        'version': RESULT_FORMAT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'seed': seed,
+        'results': results,
+    }
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def compare_results(results, baseline_file, threshold):
+    """前回の結果と比較し、処理時間・ピークメモリがthreshold倍を超えた項目を表示
+
+    劣化した項目数を返す
+    """
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(item['size'], item['target']): item for item in baseline.get('results', [])}
+
+    print("\n" + "=" * 50)
+    print(f"前回の結果との比較: {baseline_file}（{baseline.get('revision') or '-'}）")
+    print("=" * 50)
+    regressions = 0
+    for result in results:
+        item = previous.get((result['size'], result['target']))
+        if item is None or item.get('params') != result['params']:
+            print(f"  - {result['size']:<7} {result['target']:<5} 比較対象なし")
+            continue
+        time_ratio = result['seconds']['median'] / item['seconds']['median'] if item['seconds']['median'] else 1.0
+        memory_ratio = result['peak_memory_bytes'] / item['peak_memory_bytes'] if item['peak_memory_bytes'] else 1.0
+        regressed = time_ratio > threshold or memory_ratio > threshold
+        regressions += regressed
+        mark = '✗' if regressed else '✓'
+        print(f"  {mark} {result['size']:<7} {result['target']:<5} 時間 x{time_ratio:.2f}  メモリ x{memory_ratio:.2f}")
+    return regressions
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="スキルシート変換のベンチマークを実行します")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small', 'medium', 'large'],
+                        help="計測する規模（既定: small medium large）")
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS),
+                        help="計測する変換（既定: すべて）")
+    parser.add_argument('--repeat', type=int, default=3, help="時間を計測する回数（既定: 3）")
+    parser.add_argument('--seed', type=int, default=0, help="スキルシート生成の乱数シード")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="結果の保存先")
+    parser.add_argument('--compare', help="比較する前回の結果ファイル")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="劣化とみなす前回比（既定: 1.2倍）")
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat には1以上を指定してください")
+
+    results = run_benchmark(args.sizes, args.targets, args.repeat, args.seed)
+    save_results(results, args.output, args.repeat, args.seed)
+    print(f"\n結果を保存しました: {args.output}")
+
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n✗ {regressions}件で処理時間またはメモリが{args.threshold}倍を超えました")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+変換結果のビルドキャッシュ
+入力ファイルと変換スクリプトの内容ハッシュ（と、ファイル以外の変換条件）を出力ごとに記録し、
+どれも変わっていない出力は再生成をスキップする
+"""
+
+import hashlib
+import json
+import os
+
+CACHE_FILE_NAME = '.skillsheet_build_cache.json'
+
+# マニフェストの形式が変わったら上げる（古いキャッシュは破棄される）
+CACHE_FORMAT_VERSION = 1
+
+def file_digest(path):
+    """ファイル内容のSHA-256ハッシュを返す"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class BuildCache:
+    """出力ファイルごとに、生成元の入力と変換スクリプトのハッシュを保持する"""
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.entries = {}
+        self._digests = {}
+
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if data.get('version') == CACHE_FORMAT_VERSION:
+                self.entries = data.get('outputs', {})
+
+    def digest(self, path):
+        """ハッシュを計算（変換スクリプトなど同じファイルは1回だけ読む）"""
+        key = os.path.abspath(path)
+        if key not in self._digests:
+            self._digests[key] = file_digest(path)
+        return self._digests[key]
+
+    def _fingerprint(self, paths):
+        return {os.path.normpath(path): self.digest(path) for path in paths}
+
+    def check(self, target, inputs, converter_files, params=None):
+        """再生成が必要な理由を返す（不要な場合はNone）
+
+        paramsは出力の内容を変えるファイル以外の条件（経験年数の基準の月など）の辞書
+        """
+        entry = self.entries.get(os.path.normpath(target))
+        if entry is None:
+            return '新規'
+        if not os.path.exists(target):
+            return '出力なし'
+        try:
+            if entry.get('inputs') != self._fingerprint(inputs):
+                return '入力変更'
+        except OSError:
+            return '入力変更'
+        if entry.get('converter') != self._fingerprint(converter_files):
+            return '変換スクリプト変更'
+        if entry.get('params', {}) != (params or {}):
+            return '変換条件変更'
+        return None
+
+    def record(self, target, inputs, converter_files, params=None):
+        """出力の生成元を記録"""
+        # 入力が変換中に書き換えられた場合に備え、ハッシュを取り直す
+        for path in inputs:
+            self._digests.pop(os.path.abspath(path), None)
+        entry = {
+            'inputs': self._fingerprint(inputs),
+            'converter': self._fingerprint(converter_files),
+        }
+        if params:
+            entry['params'] = params
+        self.entries[os.path.normpath(target)] = entry
+
+    def save(self):
+        """マニフェストを書き出す（途中で中断しても壊れないよう置き換えで保存）"""
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = self.cache_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_FORMAT_VERSION, 'outputs': self.entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temp_file, self.cache_file)
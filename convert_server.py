@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシート変換のHTTPサービス（ローカル専用）
+変換モジュールを読み込み済みのワーカープロセスを常駐させ、リクエストごとのPythonの起動・
+インポート・ブラウザの起動を待たずに変換する（標準ライブラリのhttp.serverのみを使用）
+
+- POST /convert/<形式>   本文のマークダウン（UTF-8）を xlsx・docx・html・pdf に変換して返す
+    ?filename=名前        ダウンロード時のファイル名（拡張子なし、既定: skillsheet）
+    ?validate=on|strict   変換の前に構造を検査し、不合格の場合は422で問題の一覧（JSON）を返す
+- GET /metrics            処理時間（形式ごと）・待ち行列の長さ・ステータスごとの件数（JSON）
+- GET /health             稼働確認
+
+同時に受け付ける変換は「ワーカー数 + 待ち行列の長さ」までで、それを超えるリクエストは
+待たせずに503（Retry-After付き）で断る
+
+処理時間の目安（HM_スキルシート.md、ワーカー1つ、/metrics の中央値）: html 約5〜20ms・xlsx 約20ms・
+ネイティブのPDF 約40ms。docxはpython-docxの文書の複製・保存に時間がかかり、環境によって約100〜190msかかる
+（数十msには収まらない）
+
+使い方:
+    python convert_server.py --port 8765 -j 4 --queue 16
+    curl --data-binary @HM_スキルシート.md -o HM.xlsx http://127.0.0.1:8765/convert/xlsx
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from batch_convert import PDF_BACKENDS
+from instrumentation import init_worker, worker_config
+from skill_sheet_api import MEDIA_TYPES
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE = 16
+DEFAULT_TIMEOUT = 60
+
+# 受け付ける本文の最大サイズ（バイト）
+DEFAULT_MAX_BODY = 10 * 1024 * 1024
+
+# 処理時間の統計に使う直近のリクエスト数（形式ごと）
+LATENCY_WINDOW = 1000
+
+# ワーカーの起動時に変換しておく小さなスキルシート（各変換の初回だけの処理を済ませておく）
+WARMUP_MARKDOWN = """# ウォームアップ
+
+## 基本情報
+
+| 項目 | 内容 |
+|------|------|
+| **氏名** | - |
+
+## 技術スキル
+
+### 開発言語
+| 言語 | 経験年数 |
+|------|----------|
+| Python | 1年 |
+"""
+
+class ServiceBusy(Exception):
+    """同時に受け付けられる変換の上限に達している"""
+
+class ValidationRejected(Exception):
+    """構造の検査で不合格（issuesは (行番号, 重大度, メッセージ) のリスト）"""
+
+    def __init__(self, issues):
+        super().__init__(f"構造の検査で不合格です（{len(issues)}件）")
+        self.issues = issues
+
+def warm_up(pdf_backend, docx_template, trace=None):
+    """ワーカーの初期化（変換モジュールの読み込み・基本文書の作成を済ませておく）
+
+    traceは instrumentation.worker_config() の設定（計測する場合、区間をメインのプロセスに送る）
+    """
+    init_worker(trace)
+    from skill_sheet_api import convert
+    for fmt in MEDIA_TYPES:
+        if fmt == 'pdf' and pdf_backend == 'browser':
+            continue
+        convert(WARMUP_MARKDOWN, fmt, **format_options(fmt, pdf_backend, docx_template))
+    import validate_sheet  # noqa: F401
+
+def format_options(fmt, pdf_backend, docx_template):
+    """形式ごとの書き込み関数の引数"""
+    if fmt == 'pdf':
+        return {'backend': pdf_backend}
+    if fmt == 'docx' and docx_template:
+        return {'template_file': docx_template}
+    if fmt == 'xlsx':
+        return {'streaming': True}
+    return {}
+
+def ping():
+    """ワーカーが起動していることの確認用"""
+    return True
+
+def convert_request(text, fmt, pdf_backend, docx_template, validate='off'):
+    """ワーカーで実行する変換（browserのPDFはHTMLまで作成して返し、PDFの描画はメインのプロセスで行う）
+
+    戻り値は (種類, 内容, 検査結果)。種類は 'data'（変換結果のバイト列）・'html'（PDF用のHTML）・
+    'rejected'（検査で不合格）
+    """
+    from skill_sheet_api import convert, load_source
+
+    document = load_source(text)
+    issues = []
+    if validate != 'off':
+        from validate_sheet import is_rejected, validate_document
+        issues = validate_document(document)
+        if is_rejected(issues, validate == 'strict'):
+            return 'rejected', None, issues
+    if fmt == 'pdf' and pdf_backend == 'browser':
+        from simple_md_to_pdf import render_html
+        return 'html', render_html(document), issues
+    return 'data', convert(document, fmt, **format_options(fmt, pdf_backend, docx_template)), issues
+
+class ServiceMetrics:
+    """形式ごとの処理時間とステータスごとの件数を集計する（スレッド間で共有）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.latencies = {}
+        self.counts = {}
+        self.statuses = {}
+
+    def record(self, fmt, seconds):
+        with self.lock:
+            self.latencies.setdefault(fmt, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+            self.counts[fmt] = self.counts.get(fmt, 0) + 1
+
+    def record_status(self, status):
+        with self.lock:
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            latency = {fmt: latency_summary(list(values), self.counts[fmt]) for fmt, values in self.latencies.items()}
+            return {
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'responses': dict(self.statuses),
+                'latency_ms': latency,
+            }
+
+def latency_summary(values, count):
+    """直近の処理時間の件数・平均・パーセンタイル（ミリ秒）"""
+    values.sort()
+
+    def percentile(p):
+        return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 1)
+
+    return {
+        'count': count,
+        'window': len(values),
+        'mean': round(sum(values) / len(values) * 1000, 1),
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'max': round(values[-1] * 1000, 1),
+    }
+
+class ConversionService:
+    """常駐のワーカープールと同時実行数の上限を持ち、マークダウンを変換する（HTTPとは独立）"""
+
+    def __init__(self, workers=None, queue_size=DEFAULT_QUEUE, pdf_backend='native', docx_template=None,
+                 timeout=DEFAULT_TIMEOUT):
+        self.workers = workers or 1
+        self.queue_size = queue_size
+        self.pdf_backend = pdf_backend
+        self.docx_template = docx_template
+        self.timeout = timeout
+        self.metrics = ServiceMetrics()
+        self.slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+        # ワーカーを起動して変換モジュールを読み込ませる（起動を待ってから受付を始める）
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up,
+                                            initargs=(pdf_backend, docx_template, worker_config()))
+        for future in [self.executor.submit(ping) for _ in range(self.workers)]:
+            future.result()
+
+        # プロセスプールの子プロセスに標準入力を引き継がせないよう、ブラウザはワーカーの起動後に起動する
+        self.pdf_worker = None
+        if pdf_backend == 'browser':
+            from pdf_render_worker import PdfRenderWorker
+            try:
+                self.pdf_worker = PdfRenderWorker()
+            except Exception:
+                self.executor.shutdown()
+                raise
+
+    def close(self):
+        # プロセスプールの子プロセスはPDF描画ワーカーの標準入力を引き継いでいるため、先に終了させる
+        self.executor.shutdown(cancel_futures=True)
+        if self.pdf_worker is not None:
+            self.pdf_worker.close()
+
+    def acquire(self):
+        """変換の枠を確保する（空きがない場合は待たずにServiceBusy）"""
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise ServiceBusy(f"変換の受付数が上限（{self.workers + self.queue_size}件）に達しています")
+        with self.lock:
+            self.in_flight += 1
+
+    def release(self, future=None):
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def convert(self, text, fmt, validate='off'):
+        """マークダウンを変換し、変換結果のバイト列を返す
+
+        枠は最後の処理（browserのPDFはブラウザでの描画、それ以外はワーカーでの処理）が終わったときに
+        解放する（クライアントがタイムアウトしても、処理中の変換は上限に数える）
+        """
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"不明な形式です: {fmt}（{', '.join(MEDIA_TYPES)}）")
+        self.acquire()
+        started = time.perf_counter()
+        try:
+            future = self.executor.submit(convert_request, text, fmt, self.pdf_backend, self.docx_template, validate)
+        except Exception:
+            self.release()
+            raise
+
+        # 処理中の段階（ワーカー → ブラウザ）のFuture。終了時（完了済みの場合はすぐ）に枠を解放する
+        last = future
+        try:
+            kind, payload, issues = future.result(self.timeout)
+            if kind == 'rejected':
+                raise ValidationRejected(issues)
+            if kind == 'html':
+                last = self.pdf_worker.render(payload)
+                payload = last.result(self.timeout)
+        finally:
+            last.add_done_callback(self.release)
+        self.metrics.record(fmt, time.perf_counter() - started)
+        return payload
+
+    def status(self):
+        """メトリクス（処理時間・待ち行列の長さ・件数）"""
+        with self.lock:
+            in_flight, rejected = self.in_flight, self.rejected
+        status = self.metrics.snapshot()
+        status.update({
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'in_flight': in_flight,
+            'queue_depth': max(0, in_flight - self.workers),
+            'rejected': rejected,
+        })
+        return status
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """変換・メトリクスのリクエストを処理する（serviceなどはサーバーの属性から参照する）"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'SkillSheetConverter'
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/metrics':
+            self.send_json(200, self.server.service.status())
+        elif path == '/health':
+            self.send_body(200, b'ok\n', 'text/plain; charset=utf-8')
+        else:
+            self.send_error_text(404, "見つかりません")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'convert':
+            self.reject_unread(404, "POST /convert/<形式> に送信してください")
+            return
+        fmt = parts[1]
+        query = parse_qs(url.query)
+        validate = query.get('validate', ['off'])[0]
+        filename = query.get('filename', ['skillsheet'])[0]
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self.reject_unread(400, "Content-Lengthが不正です")
+            return
+        if length > self.server.max_body:
+            self.reject_unread(413, f"本文が大きすぎます（上限 {self.server.max_body}バイト）")
+            return
+        body = self.rfile.read(length)
+        if fmt not in MEDIA_TYPES:
+            self.send_error_text(400, f"不明な形式です: {fmt}（{', '.join(MEDIA_TYPES)}）")
+            return
+        if validate not in ('off', 'on', 'strict'):
+            self.send_error_text(400, f"validateには off・on・strict を指定してください: {validate}")
+            return
+        if not body.strip():
+            self.send_error_text(400, "本文にマークダウンを指定してください")
+            return
+
+        service = self.server.service
+        try:
+            data = service.convert(body, fmt, validate)
+        except ServiceBusy as e:
+            self.send_error_text(503, str(e), {'Retry-After': '1'})
+            return
+        except ValidationRejected as e:
+            self.send_json(422, {'error': str(e), 'issues': [
+                {'line': line, 'severity': severity, 'message': message} for line, severity, message in e.issues
+            ]})
+            return
+        except TimeoutError:
+            self.send_error_text(504, f"変換が{service.timeout}秒以内に終わりませんでした")
+            return
+        except (ValueError, UnicodeDecodeError) as e:
+            self.send_error_text(400, f"{type(e).__name__}: {e}")
+            return
+        except Exception as e:
+            self.send_error_text(500, f"変換に失敗しました: {type(e).__name__}: {e}")
+            return
+
+        disposition = f"attachment; filename*=UTF-8''{quote(filename + '.' + fmt)}"
+        self.send_body(200, data, MEDIA_TYPES[fmt], {'Content-Disposition': disposition})
+
+    def send_body(self, status, data, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.service.metrics.record_status(status)
+
+    def send_json(self, status, value):
+        self.send_body(status, json.dumps(value, ensure_ascii=False, indent=2).encode('utf-8') + b'\n',
+                       'application/json; charset=utf-8')
+
+    def send_error_text(self, status, message, headers=None):
+        self.send_body(status, (message + '\n').encode('utf-8'), 'text/plain; charset=utf-8', headers)
+
+    def reject_unread(self, status, message):
+        """本文を読まずにエラーを返し、接続を閉じる
+
+        keep-aliveの接続では、読まなかった本文が次のリクエストとして解釈されてしまうため
+        """
+        self.close_connection = True
+        self.send_error_text(status, message, {'Connection': 'close'})
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+class ConversionServer(ThreadingHTTPServer):
+    """リクエストごとのスレッドで受け付け、変換はConversionServiceのワーカーに渡す"""
+
+    daemon_threads = True
+
+    def __init__(self, address, service, max_body=DEFAULT_MAX_BODY, quiet=False):
+        super().__init__(address, ConversionRequestHandler)
+        self.service = service
+        self.max_body = max_body
+        self.quiet = quiet
+
+def main(argv=None):
+    """メイン関数"""
+    import os
+
+    parser = argparse.ArgumentParser(description="スキルシートを変換するHTTPサービスを起動します（ローカル専用）")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"待ち受けるアドレス（既定: {DEFAULT_HOST}）")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"待ち受けるポート（既定: {DEFAULT_PORT}）")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help="常駐させるワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument('--queue', type=int, default=DEFAULT_QUEUE,
+                        help=f"ワーカーの空きを待てるリクエスト数。超えた分は503で断る（既定: {DEFAULT_QUEUE}）")
+    parser.add_argument('--pdf-backend', choices=sorted(PDF_BACKENDS), default='native',
+                        help="PDFの描画方式（native: Pythonのみ, browser: 常駐のブラウザ、既定: native）")
+    parser.add_argument('--docx-template', metavar='FILE',
+                        help="Word文書のスタイル・ページ設定に使うテンプレート（.docx・.dotx）")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"1件の変換を待つ秒数（既定: {DEFAULT_TIMEOUT}）")
+    parser.add_argument('--max-body', type=int, default=DEFAULT_MAX_BODY,
+                        help=f"受け付ける本文の最大サイズ（バイト、既定: {DEFAULT_MAX_BODY}）")
+    parser.add_argument('-q', '--quiet', action='store_true', help="リクエストごとのログを表示しない")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1 or args.queue < 0:
+        parser.error("--workers には1以上、--queue には0以上を指定してください")
+    if args.docx_template and not os.path.exists(args.docx_template):
+        print(f"✗ テンプレートが見つかりません: {args.docx_template}")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        service = ConversionService(args.workers, args.queue, args.pdf_backend, args.docx_template, args.timeout)
+    except Exception as e:
+        print(f"✗ ワーカーを起動できませんでした: {type(e).__name__}: {e}")
+        return 1
+    try:
+        server = ConversionServer((args.host, args.port), service, args.max_body, args.quiet)
+    except OSError as e:
+        service.close()
+        print(f"✗ {args.host}:{args.port} で待ち受けできません: {e}")
+        return 1
+
+    print(f"✓ http://{args.host}:{server.server_port}/ で待ち受けています"
+          f"（ワーカー {args.workers} / 待ち行列 {args.queue}、起動 {time.perf_counter() - started:.2f}秒、Ctrl+Cで終了）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n終了します")
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシートから抽出したレコードを分析用にJSON Lines・Parquetで書き出すスクリプト
+複数のスキルシート（マークダウン・グリッド形式のCSV・Excel）を1件ずつ読み込み、
+エンティティごとのテーブル（engineers・skills・projects・responsibilities）に行を追記する
+
+列名・列の型はTABLESで固定し、スキルシートに項目がない場合も列は省略せず空（null）にする
+（列を追加するときは末尾に足し、既存の列の名前・型は変えない）
+基本情報・得意分野など項目名がスキルシートごとに異なるものは、JSON文字列の列にする
+
+Parquetの出力にはpyarrowが必要（pip install pyarrow）。JSON Linesは追加のパッケージなしで出力できる
+
+使い方:
+    python export_records.py skillsheets/ -o export/
+    python export_records.py skillsheets/ -r --csv --xlsx -o export/ -f jsonl parquet
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from instrumentation import span
+from skill_index import ONGOING_MONTH, normalize_term, open_sheet, parse_period, parse_years
+
+DEFAULT_OUTPUT_DIR = 'export'
+
+# テーブルごとの列と型（string・int64・float64・bool）
+TABLES = {
+    'engineers': [
+        ('sheet', 'string'),
+        ('name', 'string'),
+        ('title', 'string'),
+        ('updated', 'string'),
+        ('basic_info', 'string'),        # {項目: 内容} のJSON
+        ('specialty_areas', 'string'),   # {カテゴリ: [内容]} のJSON
+        ('self_pr', 'string'),           # [内容] のJSON
+        ('strengths', 'string'),         # [内容] のJSON
+        ('project_count', 'int64'),
+        ('skill_count', 'int64'),
+    ],
+    'skills': [
+        ('sheet', 'string'),
+        ('category', 'string'),
+        ('technology', 'string'),
+        ('term', 'string'),              # 正規化した技術名（skill_index.py の索引語と同じ）
+        ('years_text', 'string'),
+        ('years', 'float64'),
+    ],
+    'projects': [
+        ('sheet', 'string'),
+        ('no', 'string'),
+        ('company', 'string'),
+        ('period', 'string'),
+        ('start_month', 'string'),       # YYYY-MM
+        ('end_month', 'string'),         # YYYY-MM（継続中の場合はnull）
+        ('ongoing', 'bool'),
+        ('industry', 'string'),
+        ('employment', 'string'),
+        ('team_size', 'string'),
+        ('technologies', 'string'),
+        ('overview', 'string'),
+        ('duties', 'string'),
+        ('skills', 'string'),
+        ('achievements', 'string'),
+    ],
+    'responsibilities': [
+        ('sheet', 'string'),
+        ('project', 'string'),
+        ('phase', 'string'),
+        ('mark', 'string'),
+        ('assigned', 'bool'),
+    ],
+}
+
+# プロジェクト経験のレコードからそのまま書き出す列
+PROJECT_KEYS = ['no', 'company', 'period', 'industry', 'employment', 'team_size', 'technologies', 'overview', 'duties', 'skills', 'achievements']
+
+# 担当領域で「担当していない」を表す記号
+UNASSIGNED_MARKS = {'', '-', '－', '×'}
+
+def to_json(value):
+    return json.dumps(value, ensure_ascii=False)
+
+def month_text(month):
+    """月の通し番号をYYYY-MMにする"""
+    if month is None or month == ONGOING_MONTH:
+        return None
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+def project_row(sheet, project):
+    """projectsテーブルの1行"""
+    period = project.get('period', '')
+    start, end = parse_period(period) if period else (None, None)
+    values = {key: str(project.get(key, '')) for key in PROJECT_KEYS}
+    values.update({
+        'sheet': sheet,
+        'start_month': month_text(start),
+        'end_month': month_text(end),
+        'ongoing': end == ONGOING_MONTH,
+    })
+    return tuple(values[name] for name, _ in TABLES['projects'])
+
+def sheet_rows(document, sheet):
+    """1件のスキルシートから、テーブルごとの行（列の順のタプル）のリストを作成"""
+    skills = [
+        (sheet, category, technology, normalize_term(technology), str(years), parse_years(years))
+        for category, items in document.technical_skills.items()
+        for technology, years in items.items()
+    ]
+    projects = [project_row(sheet, project) for project in document.iter_projects()]
+
+    responsibilities = []
+    if document.responsibility_rows is not None:
+        headers, rows = document.responsibility_rows
+        for row in rows:
+            for phase, mark in zip(headers[1:], row[1:]):
+                responsibilities.append((sheet, row[0], phase, mark, mark.strip() not in UNASSIGNED_MARKS))
+
+    basic_info = document.basic_info
+    engineers = [(
+        sheet,
+        basic_info.get("氏名", ''),
+        document.title,
+        document.updated,
+        to_json(basic_info),
+        to_json(document.specialty_areas),
+        to_json(list(document.self_pr)),
+        to_json(list(document.strengths)),
+        len(projects),
+        len(skills),
+    )]
+    return {
+        'engineers': engineers,
+        'skills': skills,
+        'projects': projects,
+        'responsibilities': responsibilities,
+    }
+
+class JsonLinesWriter:
+    """1行を1つのJSONオブジェクト（全列を含む）として書き出す"""
+
+    extension = '.jsonl'
+
+    @staticmethod
+    def prepare():
+        """追加のパッケージは不要"""
+
+    def __init__(self, path, columns):
+        self.names = [name for name, _ in columns]
+        self.f = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows):
+        for row in rows:
+            self.f.write(to_json(dict(zip(self.names, row))) + '\n')
+
+    def close(self):
+        self.f.close()
+
+class ParquetWriter:
+    """行をまとめてParquetの行グループとして書き出す（pyarrowが必要）"""
+
+    extension = '.parquet'
+
+    # 1つの行グループにまとめる行数
+    ROW_GROUP_SIZE = 10000
+
+    @staticmethod
+    def prepare():
+        """pyarrowを読み込む（ない場合はファイルを作成する前にエラーにする）"""
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquetの出力にはpyarrowが必要です（pip install pyarrow）")
+        return pyarrow
+
+    def __init__(self, path, columns):
+        pyarrow = self.prepare()
+        types = {
+            'string': pyarrow.string(),
+            'int64': pyarrow.int64(),
+            'float64': pyarrow.float64(),
+            'bool': pyarrow.bool_(),
+        }
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema([(name, types[type_name]) for name, type_name in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.buffer = []
+
+    def write(self, rows):
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.ROW_GROUP_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        columns = list(zip(*self.buffer))
+        arrays = [self.pyarrow.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+# 出力形式と書き出しクラス
+WRITERS = {
+    'jsonl': JsonLinesWriter,
+    'parquet': ParquetWriter,
+}
+
+class RecordExporter:
+    """テーブル・出力形式ごとのファイルを開いたままにし、スキルシートの行を順に追記する"""
+
+    def __init__(self, output_dir, formats=('jsonl',)):
+        for fmt in formats:
+            WRITERS[fmt].prepare()
+        os.makedirs(output_dir, exist_ok=True)
+        self.counts = {table: 0 for table in TABLES}
+        self.writers = []
+        try:
+            for fmt in formats:
+                writer_class = WRITERS[fmt]
+                for table, columns in TABLES.items():
+                    path = os.path.join(output_dir, table + writer_class.extension)
+                    self.writers.append((table, writer_class(path, columns)))
+        except Exception:
+            self.close()
+            raise
+
+    def add(self, document, sheet):
+        """1件のスキルシートの行を追記する（すべての行を作成してから書き込む）"""
+        rows = sheet_rows(document, sheet)
+        for table, writer in self.writers:
+            writer.write(rows[table])
+        for table, table_rows in rows.items():
+            self.counts[table] += len(table_rows)
+
+    def close(self):
+        for _, writer in self.writers:
+            writer.close()
+        self.writers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def export_records(paths, output_dir, formats=('jsonl',)):
+    """スキルシートの一覧を書き出し、(テーブルごとの行数, 失敗した (パス, エラー) のリスト) を返す"""
+    failures = []
+    with RecordExporter(output_dir, formats) as exporter:
+        for path in paths:
+            try:
+                with span('export.sheet', file=path):
+                    with open_sheet(path) as document:
+                        exporter.add(document, path)
+            except Exception as e:
+                failures.append((path, f"{type(e).__name__}: {e}"))
+    return exporter.counts, failures
+
+def main(argv=None):
+    """メイン関数"""
+    from batch_convert import collect_markdown_files
+
+    parser = argparse.ArgumentParser(description="スキルシートのレコードをJSON Lines・Parquetで書き出します")
+    parser.add_argument('targets', nargs='+', help="スキルシートのファイル、ディレクトリ、またはglobパターン")
+    parser.add_argument('-o', '--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help=f"出力先ディレクトリ（既定: {DEFAULT_OUTPUT_DIR}）")
+    parser.add_argument('-f', '--formats', nargs='+', choices=sorted(WRITERS), default=['jsonl'],
+                        help="出力形式（既定: jsonl、parquetにはpyarrowが必要）")
+    parser.add_argument('-r', '--recursive', action='store_true', help="ディレクトリを再帰的に探索する")
+    parser.add_argument('--csv', action='store_true', help="ディレクトリ内のグリッド形式のCSV（*.csv）も含める")
+    parser.add_argument('--xlsx', action='store_true',
+                        help="ディレクトリ内のExcelファイル（md_to_xlsx_improved.py で作成したもの）も含める")
+    args = parser.parse_args(argv)
+
+    extensions = ['.md']
+    if args.csv:
+        extensions.append('.csv')
+    if args.xlsx:
+        extensions.append('.xlsx')
+    paths = collect_markdown_files(args.targets, args.recursive, extensions)
+    if not paths:
+        print("✗ スキルシートが見つかりません")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        counts, failures = export_records(paths, args.output_dir, args.formats)
+    except (OSError, RuntimeError) as e:
+        print(f"✗ エラー: {e}")
+        return 1
+    for path, error in failures:
+        print(f"✗ {path}: {error}")
+    print(f"✓ {len(paths) - len(failures)}件のスキルシートを {args.output_dir} に書き出しました"
+          f"（{time.perf_counter() - started:.2f}秒）")
+    for table, count in counts.items():
+        print(f"    {table}: {count}行")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
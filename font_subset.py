@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日本語フォントのサブセット化（PDF・HTML・Word文書への埋め込み用）
+フォント全体（数MB）を埋め込む代わりに、文書で使っている文字のグリフだけを残したフォントを作成する。
+サブセットは「フォントの内容・文字の集合・形式」のハッシュをキーにメモリとディスクにキャッシュし、
+同じスキルシート（同じ文字の集合）を何度変換してもサブセット化は1回だけ行う
+
+埋め込むフォントは次の順に探す（見つからない場合は埋め込まず、従来どおりシステムのフォントで表示する）
+1. 変換関数の引数 font_file
+2. 環境変数 SKILLSHEET_CJK_FONT
+3. このスクリプトと同じ場所の fonts/ ディレクトリ内のTrueTypeフォント（*.ttf、ファイル名順で最初のもの）
+
+TrueType（glyf）形式のフォント（IPAexゴシック・Noto Sans JPのTTF版など）に対応。
+サブセット化にはfontToolsが必要（pip install fonttools）
+
+使い方:
+    font_file = find_font()
+    data = subset_font(font_file, set(text), flavor='woff')   # HTMLの@font-face用
+    font = load_subset(font_file, set(text))                  # PDF・Word文書用（グリフ番号・寸法付き）
+"""
+
+import hashlib
+import io
+import os
+from collections import OrderedDict
+
+from build_cache import file_digest
+
+FONT_ENV = 'SKILLSHEET_CJK_FONT'
+CACHE_ENV = 'SKILLSHEET_FONT_CACHE'
+
+# 同梱のフォントを置くディレクトリ
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+FONT_EXTENSIONS = ('.ttf',)
+
+# サブセットのキャッシュ（環境変数 SKILLSHEET_FONT_CACHE で変更できる）
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'skillsheet', 'fonts')
+
+# サブセットの作り方を変えたら上げる（古いキャッシュは使わない）
+SUBSET_FORMAT_VERSION = 1
+
+# プロセス内で保持するサブセットの数（変換サービスなどで同じ文書を繰り返し変換する場合用）
+MEMORY_CACHE_SIZE = 32
+
+# フォントファイルの (更新日時, サイズ, ハッシュ)（絶対パスごと）
+_font_digests = {}
+
+# フォントのファミリー名（フォントのハッシュ → 名前）
+_font_families = {}
+
+# サブセットのバイト列（キャッシュキー → バイト列、古いものから捨てる）
+_subsets = OrderedDict()
+
+def find_font(font_file=None):
+    """埋め込むフォントのパス（見つからない場合はNone）"""
+    if font_file:
+        return font_file
+    if os.environ.get(FONT_ENV):
+        return os.environ[FONT_ENV]
+    if os.path.isdir(FONT_DIR):
+        for name in sorted(os.listdir(FONT_DIR)):
+            if name.lower().endswith(FONT_EXTENSIONS):
+                return os.path.join(FONT_DIR, name)
+    return None
+
+def require_fonttools():
+    """fontToolsのサブセット化モジュールを読み込む"""
+    try:
+        from fontTools import subset
+    except ImportError:
+        raise RuntimeError("フォントのサブセット化にはfontToolsが必要です（pip install fonttools）")
+    return subset
+
+def font_digest(font_file):
+    """フォントファイルのハッシュ（更新日時・サイズが変わらない限り計算し直さない）"""
+    path = os.path.abspath(font_file)
+    stat = os.stat(path)
+    cached = _font_digests.get(path)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        cached = _font_digests[path] = (stat.st_mtime_ns, stat.st_size, file_digest(path))
+    return cached[2]
+
+def subset_key(font_file, characters, flavor=None):
+    """サブセットのキャッシュキー（フォントの内容・文字の集合・形式のハッシュ）"""
+    digest = hashlib.sha256(f"{SUBSET_FORMAT_VERSION}:{font_digest(font_file)}:{flavor or 'ttf'}:".encode('ascii'))
+    digest.update(''.join(sorted(characters)).encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+def font_family(font_file):
+    """フォントのファミリー名（サブセットを作らずに名前の表だけを読む）"""
+    digest = font_digest(font_file)
+    if digest not in _font_families:
+        require_fonttools()
+        from fontTools.ttLib import TTFont
+
+        font = TTFont(font_file, lazy=True)
+        _font_families[digest] = font['name'].getBestFamilyName() or 'SkillSheet CJK'
+    return _font_families[digest]
+
+def cache_dir():
+    return os.environ.get(CACHE_ENV) or DEFAULT_CACHE_DIR
+
+def build_subset(font_file, characters, flavor=None):
+    """fontToolsでサブセットを作成する（charactersのうちフォントにない文字は無視する）"""
+    subset = require_fonttools()
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(font_file)
+    if 'glyf' not in font:
+        raise RuntimeError(f"TrueType（glyf）形式のフォントを指定してください: {font_file}")
+    options = subset.Options()
+    options.flavor = flavor
+    options.notdef_outline = True
+    # ヒンティング命令は小さい文字の画面表示用で、印刷・PDFの表示にはほとんど影響しないため削除する（約4割小さくなる）
+    options.hinting = False
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[ord(ch) for ch in characters])
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+def subset_font(font_file, characters, flavor=None):
+    """charactersのグリフだけを残したフォントのバイト列を返す
+
+    flavorは None（TrueTypeのまま）または 'woff'。メモリ・ディスクのキャッシュにあればそれを返し、
+    ディスクに書き込めない場合はキャッシュせずに続ける
+    """
+    key = subset_key(font_file, characters, flavor)
+    data = _subsets.get(key)
+    if data is not None:
+        _subsets.move_to_end(key)
+        return data
+
+    path = os.path.join(cache_dir(), f"{key}.{flavor or 'ttf'}")
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        data = build_subset(font_file, characters, flavor)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 同時に作成する他のプロセスと競合しないよう、一時ファイルから置き換える
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+    _subsets[key] = data
+    if len(_subsets) > MEMORY_CACHE_SIZE:
+        _subsets.popitem(last=False)
+    return data
+
+class EmbeddedFont:
+    """サブセット化したTrueTypeフォントと、埋め込みに使う名前・寸法・文字幅（1000単位）・グリフ番号"""
+
+    def __init__(self, data, family=None):
+        from fontTools.ttLib import TTFont
+
+        font = TTFont(io.BytesIO(data))
+        self.data = data
+        self.digest = hashlib.sha256(data).hexdigest()
+        names = font['name']
+        # サブセットでは名前の表の一部が削られるため、元のフォントのファミリー名を渡せるようにする
+        self.family = family or names.getBestFamilyName() or 'SkillSheet CJK'
+        self.postscript_name = (names.getDebugName(6) or self.family).replace(' ', '')
+        cmap = font.getBestCmap()
+        self.glyph_ids = {code: font.getGlyphID(name) for code, name in cmap.items()}
+
+        scale = 1000 / font['head'].unitsPerEm
+        metrics = font['hmtx'].metrics
+        self.advances = {code: round(metrics[name][0] * scale) for code, name in cmap.items()}
+        head, hhea = font['head'], font['hhea']
+        self.bbox = [round(value * scale) for value in (head.xMin, head.yMin, head.xMax, head.yMax)]
+        self.ascent = round(hhea.ascent * scale)
+        self.descent = round(hhea.descent * scale)
+        os2 = font['OS/2'] if 'OS/2' in font else None
+        cap_height = getattr(os2, 'sCapHeight', 0)
+        self.cap_height = round(cap_height * scale) if cap_height else self.ascent
+
+    @property
+    def tag(self):
+        """サブセットのフォント名に付ける6文字の英大文字（PDFの仕様）"""
+        return ''.join(chr(ord('A') + int(self.digest[i * 2:i * 2 + 2], 16) % 26) for i in range(6))
+
+def load_subset(font_file, characters):
+    """TrueTypeのままサブセット化したフォント（PDF・Word文書用、ファミリー名は font_family と同じ）"""
+    require_fonttools()
+    return EmbeddedFont(subset_font(font_file, characters), font_family(font_file))
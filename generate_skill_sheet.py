@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用の架空のスキルシートを作成するスクリプト
+HM_スキルシート.md と同じ構成（md_to_xlsx_improved・md_to_docx が前提とする見出し・表・リスト）で、
+プロジェクト数・表の行数・リストの項目数・文章の長さを指定して生成する
+実在のエンジニアのデータは含まない
+"""
+
+import argparse
+import os
+import random
+
+# 文章の部品（組み合わせて任意の長さの文章を作る）
+PHRASES = [
+    "既存システムの改修", "新規機能の設計・実装", "要件定義からリリースまでを担当", "顧客との仕様調整",
+    "パフォーマンス改善", "テストの自動化", "コードレビューの実施", "チームメンバーの育成",
+    "クラウドインフラの構築", "運用・保守の効率化", "障害対応の手順整備", "ドキュメントの整備",
+    "APIの設計", "データ移行の計画と実施", "スケジュール管理", "品質向上の取り組み",
+]
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Go", "Java", "Ruby", "PHP", "Kotlin", "Swift", "Rust", "C#", "Scala"]
+FRAMEWORKS = ["Django", "Flask", "FastAPI", "Vue.js (Nuxt.js)", "React (Next.js)", "NestJS", "Spring Boot", "Rails", "Laravel", "Express"]
+DATABASES = ["MySQL", "PostgreSQL", "DynamoDB", "Redis", "MongoDB", "SQLite", "Oracle", "BigQuery"]
+PLATFORMS = ["AWS", "GCP", "Azure", "Linux", "Docker", "Kubernetes", "Terraform", "Vercel"]
+TOOLS = ["Github", "GitLab", "Slack", "Teams", "Jira", "Backlog", "Notion", "Figma"]
+INDUSTRIES = ["情報", "IT", "金融", "製造", "小売", "医療", "教育", "広告"]
+EMPLOYMENT_TYPES = ["業務委託", "正社員", "契約社員", "派遣"]
+SYSTEMS = ["在庫管理システム", "予約管理システム", "社内チャットボット", "ECサイト", "WEBメディア", "分析基盤", "顧客管理システム", "業務自動化ツール"]
+PHASES = ["要件定義", "基本設計", "詳細設計", "実装・開発", "テスト・コードレビュー", "保守・運用"]
+
+def make_text(rng, length):
+    """指定した文字数程度の文章を作成"""
+    parts = []
+    while sum(len(part) for part in parts) < length:
+        parts.append(rng.choice(PHRASES))
+    return '、'.join(parts) + 'を行った。'
+
+def make_years(rng):
+    """経験年数（0.5年単位）"""
+    years = rng.randint(1, 20) / 2
+    return f"{years:g}年"
+
+def pick(rng, pool, count):
+    """poolから重複なくcount個選ぶ（足りない場合は番号を付けて増やす）"""
+    if count <= len(pool):
+        return rng.sample(pool, count)
+    return [f"{rng.choice(pool)}{i + 1}" for i in range(count)]
+
+def generate_skill_sheet(projects=10, table_rows=4, list_items=5, text_length=80, seed=0):
+    """架空のスキルシートのマークダウンを作成
+
+    projects: プロジェクト経験の件数
+    table_rows: 技術スキルの各表の行数
+    list_items: 各リストの項目数
+    text_length: 文章1つあたりのおおよその文字数
+    """
+    rng = random.Random(seed)
+    lines = []
+    add = lines.append
+
+    add(f"# サンプル{seed} スキルシート")
+    add("")
+    add(f"**更新日：2025年{rng.randint(1, 12)}月{rng.randint(1, 28)}日**")
+    add("")
+    add("---")
+    add("")
+
+    # 基本情報
+    add("## 基本情報")
+    add("")
+    add("| 項目 | 内容 |")
+    add("|------|------|")
+    for label, value in [
+        ("氏名", f"サンプル{seed}"),
+        ("性別", rng.choice(["男性", "女性", "-"])),
+        ("年齢", f"{rng.randint(22, 60)}歳"),
+        ("最終学歴", "サンプル大学 卒業"),
+        ("最寄り駅", "サンプル線 サンプル駅"),
+        ("GitHub ID", "-"),
+        ("ポートフォリオ", "-"),
+    ]:
+        add(f"| **{label}** | {value} |")
+    add("")
+    add("---")
+    add("")
+
+    # 得意分野
+    add("## 得意分野")
+    add("")
+    for system in pick(rng, SYSTEMS, list_items):
+        add(f"- **{system}の開発**")
+    add("")
+    add("### 得意言語")
+    for language in pick(rng, LANGUAGES, list_items):
+        add(f"- {language}")
+    add("")
+    add("### 得意業務")
+    for _ in range(list_items):
+        add(f"- {make_text(rng, text_length // 2)}")
+    add("")
+    add("---")
+    add("")
+
+    # 自己PR・備考
+    add("## 自己PR・備考")
+    add("")
+    for i in range(list_items):
+        text = make_text(rng, text_length)
+        add(f"- **{text}**" if i % 3 == 1 else f"- {text}")
+    add("")
+    add("---")
+    add("")
+
+    # 技術スキル
+    add("## 技術スキル")
+    add("")
+    for title, label, pool in [
+        ("開発言語", "言語", LANGUAGES),
+        ("フレームワーク", "フレームワーク", FRAMEWORKS),
+        ("データベース", "DB", DATABASES),
+        ("サーバー・OS", "技術", PLATFORMS),
+    ]:
+        add(f"### {title}")
+        add(f"| {label} | 経験年数 |")
+        add("|------|----------|")
+        for name in pick(rng, pool, table_rows):
+            add(f"| {name} | {make_years(rng)} |")
+        add("")
+    add("---")
+    add("")
+
+    # 職歴・プロジェクト経験（新しい順）
+    add("## 職歴・プロジェクト経験（時系列順）")
+    add("")
+    project_names = []
+    year, month = 2025, 6
+    for n in range(1, projects + 1):
+        months = rng.randint(2, 24)
+        end = f"{year}年{month}月"
+        start_index = year * 12 + month - 1 - months
+        start_year, start_month = divmod(start_index, 12)
+        start = f"{start_year}年{start_month + 1}月"
+        year, month = divmod(start_index - 1, 12)
+        month += 1
+
+        name = f"{chr(ord('A') + (n - 1) % 26)}社 - {rng.choice(SYSTEMS)}"
+        project_names.append(name)
+        add(f"### {n}. {name}（{start}〜{'現在' if n == 1 else end}）")
+        add(f"**期間：** {months}ヶ月 | **業種：** {rng.choice(INDUSTRIES)} | **雇用形態：** {rng.choice(EMPLOYMENT_TYPES)}  ")
+        add(f"**チーム規模：** 全体{rng.randint(3, 50)}名、チーム{rng.randint(2, 10)}名")
+        add("")
+        add("#### 使用技術")
+        add(f"- **言語・FW：** {', '.join(pick(rng, LANGUAGES + FRAMEWORKS, 3))}")
+        add(f"- **DB：** {', '.join(pick(rng, DATABASES, 2))}")
+        add(f"- **インフラ：** {', '.join(pick(rng, PLATFORMS, 3))}")
+        add(f"- **ツール：** {', '.join(pick(rng, TOOLS, 2))}")
+        add("")
+        add("#### プロジェクト概要")
+        add(make_text(rng, text_length * 2))
+        add("")
+        add("#### 主な業務内容")
+        for i in range(list_items):
+            add(f"- **{make_text(rng, text_length // 2)}**" if i == 0 else f"- {make_text(rng, text_length // 2)}")
+            if i == 0:
+                add(f"  - {make_text(rng, text_length // 4)}")
+        add("")
+        add("#### 習得スキル")
+        for _ in range(list_items):
+            add(f"- {make_text(rng, text_length // 2)}")
+        add("")
+        add("#### 成果・実績")
+        for _ in range(max(1, list_items // 2)):
+            add(f"- {make_text(rng, text_length // 2)}")
+        add("")
+        add("---")
+        add("")
+
+    # 担当領域
+    add("## 担当領域")
+    add("")
+    add("| プロジェクト | " + " | ".join(PHASES) + " |")
+    add("|" + "|".join("-" * 12 for _ in range(len(PHASES) + 1)) + "|")
+    for name in project_names:
+        add(f"| {name} | " + " | ".join(rng.choice(["●", "●", "-"]) for _ in PHASES) + " |")
+    add("")
+    add("---")
+    add("")
+
+    # 強み・特徴
+    add("## 強み・特徴")
+    add("")
+    for i in range(1, list_items + 1):
+        add(f"{i}. **{rng.choice(PHRASES)}**: {make_text(rng, text_length // 2)}")
+    add("")
+    add("---")
+    return '\n'.join(lines) + '\n'
+
+def write_skill_sheet(md_file, **params):
+    """架空のスキルシートをファイルに書き出す"""
+    with open(md_file, 'w', encoding='utf-8') as f:
+        f.write(generate_skill_sheet(**params))
+    return md_file
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="ベンチマーク用の架空のスキルシートを作成します")
+    parser.add_argument('-o', '--output-dir', default='.', help="出力先ディレクトリ")
+    parser.add_argument('-n', '--count', type=int, default=1, help="作成するファイル数")
+    parser.add_argument('--projects', type=int, default=10, help="プロジェクト経験の件数")
+    parser.add_argument('--table-rows', type=int, default=4, help="技術スキルの各表の行数")
+    parser.add_argument('--list-items', type=int, default=5, help="各リストの項目数")
+    parser.add_argument('--text-length', type=int, default=80, help="文章1つあたりのおおよその文字数")
+    parser.add_argument('--seed', type=int, default=0, help="乱数のシード（ファイルごとに1ずつ増やす）")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for i in range(args.count):
+        seed = args.seed + i
+        md_file = os.path.join(args.output_dir, f"sample_{seed:04d}.md")
+        write_skill_sheet(md_file, projects=args.projects, table_rows=args.table_rows,
+                          list_items=args.list_items, text_length=args.text_length, seed=seed)
+        print(f"✓ {md_file}")
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,11 @@
 const puppeteer = require('puppeteer');
 const fs = require('fs');
 const path = require('path');
+const readline = require('readline');
 
-async function convertHtmlToPdf(htmlFilePath, pdfFilePath) {
-    const browser = await puppeteer.launch();
-    const page = await browser.newPage();
-    
-    // HTMLファイルを読み込み
-    const htmlContent = fs.readFileSync(htmlFilePath, 'utf8');
-    await page.setContent(htmlContent, { waitUntil: 'networkidle0' });
-    
-    // PDFオプション
-    const pdfOptions = {
+// PDFオプション
+function buildPdfOptions(pdfFilePath) {
+    return {
         path: pdfFilePath,
         format: 'A4',
         margin: {
@@ -26,15 +20,112 @@ async function convertHtmlToPdf(htmlFilePath, pdfFilePath) {
         footerTemplate: '<div style="font-size: 10px; width: 100%; text-align: center; color: #666;">Page <span class="pageNumber"></span> of <span class="totalPages"></span></div>',
         preferCSSPageSize: true
     };
+}
+
+// 開いているページにHTMLを流し込んでPDFを生成（pdfFilePathを省略するとバイト列のみ返す）
+async function renderPdf(page, htmlContent, pdfFilePath) {
+    await page.setContent(htmlContent, { waitUntil: 'networkidle0' });
+    return page.pdf(buildPdfOptions(pdfFilePath));
+}
+
+async function convertHtmlToPdf(htmlFilePath, pdfFilePath) {
+    const browser = await puppeteer.launch();
+    const page = await browser.newPage();
+    
+    // HTMLファイルを読み込み
+    const htmlContent = fs.readFileSync(htmlFilePath, 'utf8');
     
     // PDFを生成
-    await page.pdf(pdfOptions);
+    await renderPdf(page, htmlContent, pdfFilePath);
     await browser.close();
     
     console.log(`✓ PDFファイルが作成されました: ${pdfFilePath}`);
 }
 
+// 常駐モード: ブラウザを1回だけ起動し、ページのプールを使い回してPDFを生成する
+// 標準入力から1行1ジョブのJSON {"id", "html", "output"} を受け取り、
+// 標準出力に1行1件の結果 {"id", "ok", "output" | "data" | "error"} を返す
+async function serve(pageCount) {
+    const browser = await puppeteer.launch();
+    const idlePages = [];
+    for (let i = 0; i < pageCount; i++) {
+        idlePages.push(await browser.newPage());
+    }
+    
+    const waiters = [];
+    const acquirePage = () => {
+        if (idlePages.length > 0) {
+            return Promise.resolve(idlePages.pop());
+        }
+        return new Promise((resolve) => waiters.push(resolve));
+    };
+    const releasePage = (page) => {
+        const waiter = waiters.shift();
+        if (waiter) {
+            waiter(page);
+        } else {
+            idlePages.push(page);
+        }
+    };
+    const send = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+    
+    const running = new Set();
+    const input = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+    input.on('line', (line) => {
+        if (!line.trim()) {
+            return;
+        }
+        let job;
+        try {
+            job = JSON.parse(line);
+        } catch (error) {
+            send({ id: null, ok: false, error: `ジョブを解析できません: ${error.message}` });
+            return;
+        }
+        
+        const task = (async () => {
+            let page = await acquirePage();
+            try {
+                const pdf = await renderPdf(page, job.html, job.output || undefined);
+                if (job.output) {
+                    send({ id: job.id, ok: true, output: job.output });
+                } else {
+                    send({ id: job.id, ok: true, data: Buffer.from(pdf).toString('base64') });
+                }
+            } catch (error) {
+                send({ id: job.id, ok: false, error: error.message });
+                // クラッシュしたページは作り直す
+                if (page.isClosed()) {
+                    page = await browser.newPage();
+                }
+            } finally {
+                releasePage(page);
+            }
+        })();
+        running.add(task);
+        task.finally(() => running.delete(task));
+    });
+    
+    send({ ready: true, pages: pageCount });
+    await new Promise((resolve) => input.on('close', resolve));
+    await Promise.all(running);
+    await browser.close();
+}
+
 async function main() {
+    // 引数で「入力HTML 出力PDF」が指定された場合はその1ファイルのみ変換
+    const args = process.argv.slice(2);
+    if (args[0] === '--serve') {
+        const pagesIndex = args.indexOf('--pages');
+        const pageCount = pagesIndex >= 0 ? parseInt(args[pagesIndex + 1], 10) : 4;
+        await serve(pageCount > 0 ? pageCount : 4);
+        return;
+    }
+    if (args.length === 2) {
+        await convertHtmlToPdf(args[0], args[1]);
+        return;
+    }
+    
     const htmlFiles = [
         'HM_スキルシート.html',
         'README.html'
@@ -58,4 +149,7 @@ async function main() {
     console.log('\n変換処理が完了しました！');
 }
 
-main().catch(console.error); 
\ No newline at end of file
+main().catch((error) => {
+    console.error(error);
+    process.exitCode = 1;
+}); 
\ No newline at end of file
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+変換処理の計測フック
+各変換の段階（読み込み・解析・抽出・シート作成・保存など）を名前付きの区間（span）で囲み、
+処理時間と必要に応じてピークメモリを記録して、JSON Lines・Chromeのトレース形式・コールバックに出力する
+無効な場合のspan()は何もしない共有オブジェクトを返すだけなので、ほとんどコストがかからない
+計測はenable()を呼んだプロセスで行い、プロセスプールのワーカーは initializer=init_worker,
+initargs=(worker_config(),) を指定した場合だけ計測する。ワーカーの区間はキューで親プロセスに送り、
+親のシンクにプロセスID（pid）付きで書き込む（Chromeのトレースではプロセスごとの行に分かれる）
+
+使い方:
+    with instrumentation.recording(ChromeTraceSink('trace.json'), memory=True):
+        markdown_to_docx('HM_スキルシート.md', 'HM_スキルシート.docx')
+
+        with ProcessPoolExecutor(initializer=init_worker, initargs=(worker_config(),)) as executor:
+            ...
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+class _Recorder:
+    """有効なシンクと区間のネストを保持する"""
+
+    def __init__(self):
+        self.enabled = False
+        self.sinks = []
+        self.memory = False
+        self.started_tracemalloc = False
+        self.pid = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        # ワーカープロセスの区間を受け取るキューと、親のシンクに書き込むスレッド
+        self.queue = None
+        self.receiver = None
+
+    def stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def emit(self, event):
+        with self.lock:
+            for sink in self.sinks:
+                sink.write(event)
+
+_recorder = _Recorder()
+
+class _NullSpan:
+    """計測が無効なときの何もしない区間"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """計測中の1区間"""
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.peak = 0
+
+    def set(self, **attrs):
+        """区間の属性を追加（件数など、処理後に分かる値）"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = _recorder.stack()
+        self.parent = stack[-1] if stack else None
+        self.depth = len(stack)
+        stack.append(self)
+        if _recorder.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # 親区間のピークを確定させてから、この区間用にピークをリセットする
+            if self.parent is not None:
+                self.parent.peak = max(self.parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = current
+            self.peak = current
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        stack = _recorder.stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+        event = {
+            'name': self.name,
+            'start': self.start,
+            'duration': duration,
+            'depth': self.depth,
+            'parent': self.parent.name if self.parent is not None else None,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'attrs': self.attrs,
+        }
+        if exc_type is not None:
+            event['error'] = exc_type.__name__
+        if _recorder.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            if self.parent is not None:
+                self.parent.peak = max(self.parent.peak, self.peak)
+            event['memory_peak_bytes'] = self.peak - self.start_memory
+            event['memory_delta_bytes'] = current - self.start_memory
+        _recorder.emit(event)
+        return False
+
+def span(name, **attrs):
+    """名前付きの計測区間（with文で使う）"""
+    if not _recorder.enabled:
+        return _NULL_SPAN
+    # プロセスプールでforkされた子プロセスでは、親のシンクに書き込まない
+    if os.getpid() != _recorder.pid:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+def is_enabled():
+    """計測が有効かどうか"""
+    return _recorder.enabled
+
+def enable(*sinks, memory=False):
+    """計測を開始する（memory=Trueの場合はtracemallocでピークメモリも記録）"""
+    _recorder.sinks = list(sinks)
+    _recorder.memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _recorder.started_tracemalloc = True
+    _recorder.pid = os.getpid()
+    _recorder.enabled = True
+
+def worker_config():
+    """ワーカープロセスの計測の設定（init_worker の引数。計測が無効な場合はNone）
+
+    最初に呼んだときに、ワーカーの区間を受け取るキューと受信スレッドを作成する
+    """
+    if not _recorder.enabled or os.getpid() != _recorder.pid:
+        return None
+    if _recorder.queue is None:
+        import multiprocessing
+        _recorder.queue = multiprocessing.Queue()
+        _recorder.receiver = threading.Thread(target=_receive, args=(_recorder.queue,), daemon=True)
+        _recorder.receiver.start()
+    return (_recorder.queue, _recorder.memory)
+
+def _receive(queue):
+    """ワーカーの区間を親のシンクに書き込む（Noneを受け取ったら終了）"""
+    for event in iter(queue.get, None):
+        _recorder.emit(event)
+
+def init_worker(config):
+    """プロセスプールのinitializer（worker_config() の設定で、区間を親プロセスに送る）"""
+    if config is None:
+        return
+    queue, memory = config
+    # forkで引き継いだ親のシンクは閉じずに置き換える
+    _recorder.sinks = []
+    enable(QueueSink(queue), memory=memory)
+
+def disable():
+    """計測を終了し、シンクを閉じる
+
+    ワーカーの区間は、プロセスプールを終了してから呼ぶと（送信済みのものが）すべて書き込まれる
+    """
+    if _recorder.queue is not None:
+        _recorder.queue.put(None)
+        _recorder.receiver.join()
+        _recorder.queue.close()
+        _recorder.queue = _recorder.receiver = None
+    _recorder.enabled = False
+    if _recorder.started_tracemalloc:
+        tracemalloc.stop()
+        _recorder.started_tracemalloc = False
+    _recorder.memory = False
+    sinks, _recorder.sinks = _recorder.sinks, []
+    for sink in sinks:
+        sink.close()
+
+@contextlib.contextmanager
+def recording(*sinks, memory=False):
+    """with文の間だけ計測を有効にする"""
+    enable(*sinks, memory=memory)
+    try:
+        yield
+    finally:
+        disable()
+
+class JsonLinesSink:
+    """1区間を1行のJSONとしてファイルに追記する"""
+
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, event):
+        self.file.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+
+    def close(self):
+        self.file.close()
+
+class ChromeTraceSink:
+    """Chromeのトレース形式（chrome://tracing・Perfettoで表示できるJSON）で保存する"""
+
+    def __init__(self, path):
+        self.path = path
+        self.events = []
+
+    def write(self, event):
+        args = dict(event['attrs'])
+        for key in ('memory_peak_bytes', 'memory_delta_bytes', 'error'):
+            if key in event:
+                args[key] = event[key]
+        self.events.append({
+            'name': event['name'],
+            'ph': 'X',
+            'ts': event['start'] * 1_000_000,
+            'dur': event['duration'] * 1_000_000,
+            'pid': event['pid'],
+            'tid': event['tid'],
+            'args': args,
+        })
+
+    def close(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False, default=str)
+
+class QueueSink:
+    """ワーカープロセスの区間を親プロセスのキューに送る（init_worker が使う）"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def write(self, event):
+        self.queue.put(event)
+
+    def close(self):
+        pass
+
+class CallbackSink:
+    """区間が終わるたびに関数を呼び出す"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, event):
+        self.callback(event)
+
+    def close(self):
+        pass
@@ -1,13 +1,26 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import re
+import io
 import os
+import uuid
+import zipfile
 from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
+from docx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part
+from docx.oxml import parse_xml
 from docx.oxml.shared import OxmlElement, qn
+from lxml import etree
+
+from font_subset import find_font, font_family, load_subset
+from instrumentation import span
+from skill_sheet_model import (
+    Blockquote, CodeBlock, Heading, LineBreak, ListBlock, Paragraph, Table, TextRun, load_document,
+)
 
 def add_hyperlink(paragraph, text, url):
     """段落にハイパーリンクを追加する"""
@@ -36,6 +49,88 @@ def add_hyperlink(paragraph, text, url):
     paragraph._p.append(hyperlink)
     return hyperlink
 
+# 描画で追加するスタイル（名前, 種類, 基にするスタイル, フォント名, サイズ, 太字）
+# 表の罫線・表のセル・コードの書式はこれらのスタイルから継承し、ランごとにフォントを設定しない
+CUSTOM_STYLES = [
+    ('Table Text', WD_STYLE_TYPE.PARAGRAPH, 'Normal', None, Pt(9), None),
+    ('Table Header', WD_STYLE_TYPE.PARAGRAPH, 'Table Text', None, None, True),
+    ('Code Block', WD_STYLE_TYPE.PARAGRAPH, 'No Spacing', 'Consolas', Pt(9), None),
+    ('Code Char', WD_STYLE_TYPE.CHARACTER, 'Default Paragraph Font', 'Consolas', None, None),
+    ('Table Grid', WD_STYLE_TYPE.TABLE, 'Normal Table', None, None, None),
+]
+
+# 表のスタイル（Table Grid）がないテンプレートに追加する罫線（上下左右と内側の細い実線）
+TABLE_GRID_BORDERS = (
+    '<w:tblPr xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:tblBorders>'
+    + ''.join(f'<w:{edge} w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+              for edge in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'))
+    + '</w:tblBorders></w:tblPr>'
+)
+
+# 描画で使うスタイル（IDは基本文書ごとに1回だけ解決する）
+USED_STYLES = [
+    'Heading 1', 'Heading 2', 'Heading 3', 'Heading 4',
+    'List Bullet', 'List Bullet 2', 'List Bullet 3', 'No Spacing', 'Quote',
+] + [style[0] for style in CUSTOM_STYLES]
+
+# 埋め込むフォント（先頭を難読化したTrueType）のコンテンツタイプ
+OBFUSCATED_FONT_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.obfuscatedFont'
+
+# 埋め込んだフォントを使うスタイル（表・リストなどは標準スタイルから継承する）
+EMBEDDED_FONT_STYLES = ['Normal', 'Heading 1', 'Heading 2', 'Heading 3', 'Heading 4']
+
+# w:settings の子要素のうち、埋め込みの設定（w:embedTrueTypeFonts・w:saveSubsetFonts）までの順序
+SETTINGS_ORDER = [
+    'w:writeProtection', 'w:view', 'w:zoom', 'w:removePersonalInformation', 'w:removeDateAndTime',
+    'w:doNotDisplayPageBoundaries', 'w:displayBackgroundShape', 'w:printPostScriptOverText',
+    'w:printFractionalCharacterWidth', 'w:printFormsData', 'w:embedTrueTypeFonts', 'w:embedSystemFonts',
+    'w:saveSubsetFonts',
+]
+
+# フォントテーブルがないテンプレート用の空のフォントテーブル
+EMPTY_FONT_TABLE = (
+    '<w:fonts xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"/>'
+)
+
+# Wordのテンプレート（.dotx）とWord文書の本文のコンテンツタイプ
+TEMPLATE_CONTENT_TYPE = b'application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml'
+DOCUMENT_CONTENT_TYPE = b'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml'
+
+# 作成済みの基本文書（テンプレートの絶対パス → (更新日時, DocxTemplate)。既定の基本文書はNone）
+_templates = {}
+
+class DocxStyles:
+    """描画で使うスタイルIDと書式の設定方法
+
+    python-docxはスタイルを名前で指定するたびに全スタイルを検索するため、IDを先に解決して直接設定する
+    explicit_fontsを指定した場合は、以前と同じくランごとにフォント名（font_name）・サイズを設定する
+    """
+
+    def __init__(self, ids, explicit_fonts=False, font_name='Yu Gothic'):
+        self.explicit_fonts = explicit_fonts
+        self.ids = ids
+        self.font_name = font_name
+
+    def apply(self, paragraph, name):
+        """段落にスタイルを設定する（テンプレートにないスタイルは標準のままにする）"""
+        if self.ids.get(name):
+            paragraph._p.style = self.ids[name]
+        return paragraph
+
+    def apply_table(self, table, name):
+        """表にスタイルを設定する（テンプレートにないスタイルは標準のままにする）"""
+        if self.ids.get(name):
+            table._tbl.tblStyle_val = self.ids[name]
+        return table
+
+    def add_paragraph(self, doc, name=None):
+        """スタイルを設定した段落を追加する"""
+        paragraph = doc.add_paragraph()
+        if name:
+            self.apply(paragraph, name)
+        return paragraph
+
 def setup_document_styles(doc):
     """文書のスタイルを設定する"""
     # 標準スタイルの設定
@@ -64,45 +159,32 @@ def setup_document_styles(doc):
     normal.font.name = 'Yu Gothic'
     normal.font.size = Pt(10)
     
+    add_custom_styles(doc)
     return doc
 
-def parse_markdown_table(lines, start_idx):
-    """マークダウンテーブルを解析する"""
-    table_lines = []
-    i = start_idx
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        if not line or not line.startswith('|'):
-            break
-        if not line.startswith('|---') and not line.startswith('|-'):
-            table_lines.append(line)
-        i += 1
-    
-    if not table_lines:
-        return None, start_idx
-    
-    # テーブルデータを解析
-    table_data = []
-    for line in table_lines:
-        cells = [cell.strip() for cell in line.split('|')[1:-1]]
-        if cells:
-            table_data.append(cells)
-    
-    return table_data, i
+def add_custom_styles(doc):
+    """表のセル・コード用のスタイルを追加する（同じ名前のスタイルが文書にある場合はそれを使う）"""
+    styles = doc.styles
+    for name, style_type, base, font_name, size, bold in CUSTOM_STYLES:
+        if name in styles:
+            continue
+        style = styles.add_style(name, style_type)
+        if base in styles:
+            style.base_style = styles[base]
+        if font_name:
+            style.font.name = font_name
+        if size:
+            style.font.size = size
+        if bold:
+            style.font.bold = True
+        if name == 'Code Block':
+            style.paragraph_format.space_before = Pt(6)
+            style.paragraph_format.space_after = Pt(6)
+        if name == 'Table Grid':
+            style.element.append(parse_xml(TABLE_GRID_BORDERS))
 
-def markdown_to_docx(md_file, docx_file):
-    """マークダウンファイルをWord文書に変換する"""
-    
-    # マークダウンファイルを読み込み
-    with open(md_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 新しいWord文書を作成
-    doc = Document()
-    doc = setup_document_styles(doc)
-    
-    # ページ設定
+def setup_page(doc):
+    """A4・余白1インチのページ設定"""
     section = doc.sections[0]
     section.page_height = Inches(11.69)  # A4
     section.page_width = Inches(8.27)    # A4
@@ -110,126 +192,287 @@ def markdown_to_docx(md_file, docx_file):
     section.right_margin = Inches(1)
     section.top_margin = Inches(1)
     section.bottom_margin = Inches(1)
+
+def read_template_file(template_file):
+    """テンプレート（.docx・.dotx）を読み込む
+
+    .dotxはpython-docxで開けないため、本文のコンテンツタイプをWord文書のものに書き換える
+    """
+    with open(template_file, 'rb') as f:
+        data = f.read()
+    with zipfile.ZipFile(io.BytesIO(data)) as source:
+        content_types = source.read('[Content_Types].xml')
+        if TEMPLATE_CONTENT_TYPE not in content_types:
+            return data
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as target:
+            for item in source.infolist():
+                content = source.read(item)
+                if item.filename == '[Content_Types].xml':
+                    content = content.replace(TEMPLATE_CONTENT_TYPE, DOCUMENT_CONTENT_TYPE)
+                target.writestr(item, content)
+    return output.getvalue()
+
+class DocxTemplate:
+    """スタイル・ページ設定済みの基本文書をバイト列で保持し、変換ごとに複製する
+
+    template_fileを指定した場合は、その文書（会社のテンプレートなど）のスタイル・ページ設定・
+    ヘッダー・フッターをそのまま使い、本文は削除する。描画で使うスタイルのうち、
+    テンプレートにないものだけを追加する
+    """
+
+    def __init__(self, template_file=None):
+        if template_file is None:
+            doc = Document()
+            setup_document_styles(doc)
+            setup_page(doc)
+        else:
+            doc = Document(io.BytesIO(read_template_file(template_file)))
+            body = doc.element.body
+            for child in list(body):
+                if child.tag != qn('w:sectPr'):
+                    body.remove(child)
+            add_custom_styles(doc)
+
+        self.style_ids = {
+            name: doc.styles[name].style_id if name in doc.styles else None
+            for name in USED_STYLES
+        }
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        self.data = buffer.getvalue()
+
+    def new_document(self):
+        """基本文書の複製"""
+        return Document(io.BytesIO(self.data))
+
+def load_template(template_file=None):
+    """基本文書を返す（プロセスごとに1回だけ作成し、テンプレートが更新された場合は作り直す）"""
+    if template_file is None:
+        if None not in _templates:
+            _templates[None] = (None, DocxTemplate())
+        return _templates[None][1]
+
+    path = os.path.abspath(template_file)
+    mtime = os.path.getmtime(path)
+    cached = _templates.get(path)
+    if cached is None or cached[0] != mtime:
+        _templates[path] = (mtime, DocxTemplate(path))
+    return _templates[path][1]
+
+def markdown_to_docx(md_file, docx_file):
+    """マークダウンファイルをWord文書に変換する"""
+    
+    # マークダウンファイルを読み込み、共通ドキュメントモデルに変換
+    document = load_document(md_file)
+    
+    render_docx(document, docx_file)
+    print(f"✓ Word文書が作成されました: {docx_file}")
+
+def render_docx(document, docx_file, explicit_fonts=False, template_file=None, font_file=None):
+    """ドキュメントモデルからWord文書を作成する
+
+    フォント名・サイズは段落・表・文字のスタイルから継承する（explicit_fontsの場合はランごとに設定する）
+    template_file（.docx・.dotx）を指定した場合は、そのスタイル・ページ設定を使う
+    日本語フォント（font_fileまたは font_subset.find_font で見つかるもの）がある場合は、本文の文字だけの
+    サブセットを埋め込み、本文・見出しのフォントにする
+    """
+    
+    # 埋め込むフォントがある場合は、ランごとにフォントを設定するときもそのフォントにする
+    font_file = find_font(font_file)
     
-    lines = content.split('\n')
-    i = 0
+    # スタイル・ページ設定済みの基本文書を複製
+    with span('docx.setup'):
+        template = load_template(template_file)
+        doc = template.new_document()
+        styles = DocxStyles(template.style_ids, explicit_fonts)
+        if font_file and explicit_fonts:
+            styles.font_name = font_family(font_file)
     
-    while i < len(lines):
-        line = lines[i].strip()
+    blocks = document.blocks
+    with span('docx.blocks', count=len(blocks)):
+        for block in blocks:
+            if isinstance(block, Table):
+                with span('docx.table', rows=len(block.rows)):
+                    add_block(doc, block, styles)
+            else:
+                add_block(doc, block, styles)
+    
+    if font_file:
+        with span('docx.font', file=font_file):
+            embed_font(doc, load_subset(font_file, set(''.join(doc.element.body.itertext()))))
+    
+    # 文書を保存
+    with span('docx.save', file=docx_file):
+        doc.save(docx_file)
+    return docx_file
+
+def obfuscate_font(data, font_key):
+    """埋め込むフォントの難読化（ECMA-376 Part 1 17.8.1）
+
+    先頭32バイトを、fontKeyのGUIDを逆順に並べた16バイトとXORする（もう一度行うと元に戻る）
+    """
+    key = bytes.fromhex(font_key.strip('{}').replace('-', ''))[::-1]
+    return bytes(b ^ key[i % 16] for i, b in enumerate(data[:32])) + data[32:]
+
+def font_table_part(doc):
+    """フォントテーブル（word/fontTable.xml）の部分（ない場合は作成する）"""
+    for rel in doc.part.rels.values():
+        if rel.reltype == RT.FONT_TABLE:
+            return rel.target_part
+    part = Part(PackURI('/word/fontTable.xml'), CT.WML_FONT_TABLE, EMPTY_FONT_TABLE.encode('utf-8'), doc.part.package)
+    doc.part.relate_to(part, RT.FONT_TABLE)
+    return part
+
+def embed_font(doc, font):
+    """サブセット化したフォント（font_subset.EmbeddedFont）を埋め込み、本文・見出しのスタイルのフォントにする
+
+    python-docxはフォントテーブルを扱わないため、XMLを直接書き換える
+    """
+    # 難読化のキーはフォントの内容から決め、同じ入力からは同じ文書を作成する
+    font_key = '{' + str(uuid.UUID(font.digest[:32])).upper() + '}'
+    table = font_table_part(doc)
+    package = doc.part.package
+    font_part = Part(package.next_partname('/word/fonts/font%d.odttf'), OBFUSCATED_FONT_CONTENT_TYPE,
+                     obfuscate_font(font.data, font_key), package)
+    r_id = table.relate_to(font_part, RT.FONT)
+
+    fonts = parse_xml(table.blob)
+    entry = next((f for f in fonts.findall(qn('w:font')) if f.get(qn('w:name')) == font.family), None)
+    if entry is None:
+        entry = OxmlElement('w:font')
+        entry.set(qn('w:name'), font.family)
+        for tag, value in (('w:charset', '80'), ('w:family', 'modern'), ('w:pitch', 'variable')):
+            child = OxmlElement(tag)
+            child.set(qn('w:val'), value)
+            entry.append(child)
+        fonts.append(entry)
+    for old in entry.findall(qn('w:embedRegular')):
+        entry.remove(old)
+    embed = OxmlElement('w:embedRegular')
+    embed.set(qn('r:id'), r_id)
+    embed.set(qn('w:fontKey'), font_key)
+    entry.append(embed)
+    table._blob = etree.tostring(fonts, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+    # 埋め込んだフォントを使う設定（スキーマの順序に合わせて挿入する）
+    settings = doc.settings.element
+    for tag in ('w:embedTrueTypeFonts', 'w:saveSubsetFonts'):
+        if settings.find(qn(tag)) is None:
+            before = {qn(name) for name in SETTINGS_ORDER[:SETTINGS_ORDER.index(tag)]}
+            position = next((i for i, child in enumerate(settings) if child.tag not in before), len(settings))
+            settings.insert(position, OxmlElement(tag))
+
+    # テーマのフォントの指定はフォント名より優先されるため削除する
+    for name in EMBEDDED_FONT_STYLES:
+        if name not in doc.styles:
+            continue
+        fonts_element = doc.styles[name].element.get_or_add_rPr().get_or_add_rFonts()
+        for attribute in ('w:asciiTheme', 'w:hAnsiTheme', 'w:eastAsiaTheme'):
+            fonts_element.attrib.pop(qn(attribute), None)
+        for attribute in ('w:ascii', 'w:hAnsi', 'w:eastAsia'):
+            fonts_element.set(qn(attribute), font.family)
+
+def add_runs(paragraph, runs, styles, size=Pt(10), bold=False):
+    """書式付きテキスト（TextRun）を段落に追加する
+
+    フォント名・サイズは段落のスタイルから継承し、コードは文字スタイルにする
+    （sizeはexplicit_fontsの場合だけ使う）
+    """
+    for run_data in runs:
+        if isinstance(run_data, LineBreak):
+            paragraph.add_run().add_break()
+            continue
         
-        if not line:
-            i += 1
+        # 外部リンクはハイパーリンクとして追加
+        if run_data.link and not run_data.link.startswith('#'):
+            add_hyperlink(paragraph, run_data.text, run_data.link)
             continue
         
-        # 見出し処理
-        if line.startswith('# '):
-            heading = doc.add_heading(line[2:], level=1)
-            heading.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        elif line.startswith('## '):
-            heading = doc.add_heading(line[3:], level=2)
-            heading.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        elif line.startswith('### '):
-            heading = doc.add_heading(line[4:], level=3)
-            heading.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        elif line.startswith('#### '):
-            heading = doc.add_heading(line[5:], level=4)
-            heading.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        run = paragraph.add_run(run_data.text)
+        if bold or run_data.bold:
+            run.bold = True
+        if run_data.italic:
+            run.italic = True
+        if styles.explicit_fonts:
+            run.font.name = 'Consolas' if run_data.code else styles.font_name
+            run.font.size = size
+        elif run_data.code:
+            run._r.style = styles.ids['Code Char']
+
+def add_list(doc, list_block, styles, depth=0):
+    """リスト（ネストを含む）を追加する"""
+    for item in list_block.items:
+        if list_block.ordered:
+            # Wordの自動番号は文書全体で連番になるため、番号は本文に含める
+            p = styles.add_paragraph(doc)
+            add_runs(p, [TextRun(f"{item.number}. ")] + item.runs, styles)
+        else:
+            p = styles.add_paragraph(doc, 'List Bullet' if depth == 0 else f'List Bullet {min(depth + 1, 3)}')
+            add_runs(p, item.runs, styles)
         
-        # リスト処理
-        elif line.startswith('- '):
-            p = doc.add_paragraph()
-            p.style = 'List Bullet'
-            # 太字とマークダウン記法を処理
-            text = line[2:]
-            text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # 太字マークダウンを除去
-            run = p.add_run(text)
-            run.font.name = 'Yu Gothic'
-            run.font.size = Pt(10)
+        for child in item.children:
+            add_list(doc, child, styles, depth + 1)
+
+def add_block(doc, block, styles):
+    """ドキュメントモデルの1ブロックをWord文書に追加する"""
+    
+    # 見出し処理
+    if isinstance(block, Heading):
+        if block.level <= 4:
+            heading = styles.add_paragraph(doc, f'Heading {block.level}')
+            heading.add_run(block.text)
+            heading.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        else:
+            p = styles.add_paragraph(doc)
+            add_runs(p, block.runs, styles, bold=True)
+    
+    # リスト処理
+    elif isinstance(block, ListBlock):
+        add_list(doc, block, styles)
+    
+    # テーブル処理
+    elif isinstance(block, Table):
+        if block.rows:
+            cols = max(len(row) for row in block.rows)
+            table = styles.apply_table(doc.add_table(rows=len(block.rows), cols=cols), 'Table Grid')
             
-            # 太字部分を再度処理
-            if '**' in line:
-                p.clear()
-                parts = re.split(r'(\*\*.*?\*\*)', line[2:])
-                for part in parts:
-                    if part.startswith('**') and part.endswith('**'):
-                        run = p.add_run(part[2:-2])
-                        run.bold = True
-                    else:
-                        run = p.add_run(part)
-                    run.font.name = 'Yu Gothic'
-                    run.font.size = Pt(10)
-        
-        # テーブル処理
-        elif line.startswith('|'):
-            table_data, next_i = parse_markdown_table(lines, i)
-            if table_data:
-                table = doc.add_table(rows=len(table_data), cols=len(table_data[0]))
-                table.style = 'Table Grid'
-                
-                for row_idx, row_data in enumerate(table_data):
-                    for col_idx, cell_data in enumerate(row_data):
-                        cell = table.cell(row_idx, col_idx)
-                        cell.text = cell_data
-                        
+            # table.cell()は呼ぶたびに全セルを列挙するため、行ごとにセルを取り出す
+            for row_idx, (row, row_data) in enumerate(zip(table.rows, block.rows)):
+                cells = row.cells
+                for col_idx, cell_runs in enumerate(row_data):
+                    paragraph = cells[col_idx].paragraphs[0]
+                    if styles.explicit_fonts:
                         # ヘッダー行の場合は太字
-                        if row_idx == 0:
-                            for paragraph in cell.paragraphs:
-                                for run in paragraph.runs:
-                                    run.bold = True
-                                    run.font.name = 'Yu Gothic'
-                                    run.font.size = Pt(9)
-                        else:
-                            for paragraph in cell.paragraphs:
-                                for run in paragraph.runs:
-                                    run.font.name = 'Yu Gothic'
-                                    run.font.size = Pt(9)
-                
-                i = next_i - 1
-        
-        # コードブロック処理
-        elif line.startswith('```'):
-            code_lines = []
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                code_lines.append(lines[i])
-                i += 1
-            
-            if code_lines:
-                p = doc.add_paragraph()
-                p.style = 'No Spacing'
-                run = p.add_run('\n'.join(code_lines))
+                        add_runs(paragraph, cell_runs, styles, size=Pt(9), bold=(row_idx == 0))
+                    else:
+                        styles.apply(paragraph, 'Table Header' if row_idx == 0 else 'Table Text')
+                        add_runs(paragraph, cell_runs, styles)
+    
+    # コードブロック処理
+    elif isinstance(block, CodeBlock):
+        if block.text:
+            if styles.explicit_fonts:
+                p = styles.add_paragraph(doc, 'No Spacing')
+                run = p.add_run(block.text)
                 run.font.name = 'Consolas'
                 run.font.size = Pt(9)
-                # 背景色を設定（薄いグレー）
                 p.paragraph_format.space_after = Pt(6)
                 p.paragraph_format.space_before = Pt(6)
-        
-        # 通常の段落
-        else:
-            if line:
-                p = doc.add_paragraph()
-                
-                # 太字とマークダウン記法を処理
-                if '**' in line:
-                    parts = re.split(r'(\*\*.*?\*\*)', line)
-                    for part in parts:
-                        if part.startswith('**') and part.endswith('**'):
-                            run = p.add_run(part[2:-2])
-                            run.bold = True
-                        else:
-                            run = p.add_run(part)
-                        run.font.name = 'Yu Gothic'
-                        run.font.size = Pt(10)
-                else:
-                    run = p.add_run(line)
-                    run.font.name = 'Yu Gothic'
-                    run.font.size = Pt(10)
-        
-        i += 1
+            else:
+                styles.add_paragraph(doc, 'Code Block').add_run(block.text)
     
-    # 文書を保存
-    doc.save(docx_file)
-    print(f"✓ Word文書が作成されました: {docx_file}")
+    # 引用
+    elif isinstance(block, Blockquote):
+        p = styles.add_paragraph(doc, 'Quote')
+        add_runs(p, block.runs, styles)
+    
+    # 通常の段落
+    elif isinstance(block, Paragraph):
+        p = styles.add_paragraph(doc)
+        add_runs(p, block.runs, styles)
+    
+    # 区切り線はWord文書では出力しない
 
 def main():
     """メイン関数"""
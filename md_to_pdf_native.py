@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Node.js・ブラウザを使わずにPDFを作成するスクリプト
+共通ドキュメントモデルを直接A4のページにレイアウトし、html_to_pdf.js と同じ
+ヘッダー・フッター（ページ番号）付きのPDFを書き出す
+日本語は埋め込み不要の標準CIDフォント（HeiseiKakuGo-W5）で表示する
+日本語フォント（font_subset.py の find_font）がある場合は、使った文字だけのサブセットを埋め込み、
+閲覧する環境のフォントに依存せずに同じ字形で表示する
+"""
+
+import os
+import re
+import sys
+import zlib
+from contextvars import ContextVar
+from urllib.parse import quote
+
+from font_subset import find_font, load_subset
+from instrumentation import span
+from skill_sheet_model import (
+    Blockquote, CodeBlock, Heading, HorizontalRule, LineBreak, ListBlock, Paragraph, Table, TextRun, load_document,
+)
+
+# A4（pt）と余白（html_to_pdf.js と同じ20mm）
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 20 * 72 / 25.4
+CONTENT_WIDTH = PAGE_WIDTH - MARGIN * 2
+CONTENT_BOTTOM = PAGE_HEIGHT - MARGIN
+
+# 日本語フォント（ASCIIは半角グリフに割り当てるエンコーディングを使い、幅を固定で計算できるようにする）
+FONT_NAME = 'HeiseiKakuGo-W5'
+FONT_ENCODING = 'UniJIS-UCS2-HW-H'
+
+# ヘッダー・フッター
+HEADER_TEXT = 'HM スキルシート'
+FOOTER_FORMAT = 'Page {page} of {total}'
+
+# 本文の文字サイズ・行の高さ（simple_md_to_pdf.py の印刷用CSSに合わせる）
+BODY_SIZE = 10
+TABLE_SIZE = 9
+CODE_SIZE = 9
+LINE_HEIGHT = 1.6
+
+# 色
+TEXT_COLOR = '#333333'
+STRONG_COLOR = '#2c3e50'
+LINK_COLOR = '#0000ee'
+MUTED_COLOR = '#666666'
+QUOTE_COLOR = '#555555'
+BORDER_COLOR = '#dddddd'
+
+# 見出しレベルごとの（文字サイズ, 色, 上余白, 下余白, 下線の太さ, 下線の色）
+HEADING_STYLES = {
+    1: (18, '#2c3e50', 22, 15, 1.5, '#3498db'),
+    2: (15, '#34495e', 19, 11, 0.75, '#bdc3c7'),
+    3: (12.5, '#7f8c8d', 15, 7.5, 0, None),
+    4: (11, TEXT_COLOR, 12, 6, 0, None),
+    5: (10, TEXT_COLOR, 12, 6, 0, None),
+    6: (10, MUTED_COLOR, 12, 6, 0, None),
+}
+
+# 折り返しの単位（英単語は後ろの空白ごと、それ以外は1文字ずつ）
+TOKEN_PATTERN = re.compile(r'[\x21-\x7e]+ *| +|.')
+
+# 行頭に置かない約物（前の行にぶら下げる）
+NO_BREAK_BEFORE = set('、。，．・：；？！）」』】〕｝〉》’”ー々ぁぃぅぇぉっゃゅょ')
+
+# 本文以外で描画する文字（リストの記号・番号、ページ番号）。埋め込むフォントのサブセットに含める
+LAYOUT_CHARACTERS = '・.0123456789 〓'
+
+# 埋め込むフォントの文字幅（文字 → 文字サイズ1あたりの幅）。描画中のPDFだけに適用する
+_font_widths = ContextVar('font_widths', default=None)
+
+def hex_color(color):
+    """「#rrggbb」を0〜1のRGBに変換"""
+    return tuple(int(color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+
+def number(value):
+    """PDFの数値表記"""
+    return f"{value:.2f}".rstrip('0').rstrip('.')
+
+def char_width(ch):
+    """1文字の幅（文字サイズ1あたり）"""
+    code = ord(ch)
+    if 0x20 <= code <= 0x7e or 0xff61 <= code <= 0xff9f:
+        return 0.5
+    return 1.0
+
+def text_width(text, size):
+    """文字列の幅（pt、フォントを埋め込む場合はそのフォントの幅）"""
+    widths = _font_widths.get()
+    if widths is None:
+        return sum(char_width(ch) for ch in text) * size
+    return sum(widths.get(ch) or char_width(ch) for ch in text) * size
+
+def normalize_text(text):
+    """PDFに書き込む文字列（タブは空白4つ、基本多言語面以外の文字は〓に置き換え）"""
+    return ''.join(ch if ord(ch) <= 0xffff else '〓' for ch in text.replace('\t', '    '))
+
+def encode_text(text):
+    """UCS-2の16進文字列に変換（normalize_text済みの文字列）"""
+    return '<' + text.encode('utf-16-be').hex().upper() + '>'
+
+def encode_info_text(text):
+    """文書情報用のUTF-16（BOM付き）16進文字列"""
+    return '<FEFF' + text.encode('utf-16-be').hex().upper() + '>'
+
+def wrap_runs(runs, width, size):
+    """書式付きテキストを指定幅で折り返し、行ごとの (文字列, TextRun) のリストを返す"""
+    lines = [[]]
+    line_width = 0
+    for run in runs:
+        if isinstance(run, LineBreak):
+            lines.append([])
+            line_width = 0
+            continue
+        for token in TOKEN_PATTERN.findall(run.text):
+            token_width = text_width(token, size)
+            if not lines[-1] and not token.strip():
+                continue
+            if lines[-1] and line_width + text_width(token.rstrip(), size) > width and token not in NO_BREAK_BEFORE:
+                lines.append([])
+                line_width = 0
+                if not token.strip():
+                    continue
+            # 1行に収まらない長い単語は文字単位で分割
+            while token_width > width and len(token) > 1:
+                split = 1
+                while split < len(token) and line_width + text_width(token[:split + 1], size) <= width:
+                    split += 1
+                lines[-1].append((token[:split], run))
+                lines.append([])
+                line_width = 0
+                token = token[split:]
+                token_width = text_width(token, size)
+            lines[-1].append((token, run))
+            line_width += token_width
+    return lines
+
+def wrap_code_line(line, width, size):
+    """コードの1行を文字単位で折り返す（行頭の空白は残す）"""
+    parts = ['']
+    for ch in line.replace('\t', '    '):
+        if parts[-1] and text_width(parts[-1] + ch, size) > width:
+            parts.append('')
+        parts[-1] += ch
+    return parts
+
+class PdfLayout:
+    """ブロックをページに配置し、ページごとの描画命令を作成する"""
+
+    def __init__(self):
+        self.pages = []
+        # 描画した文字（埋め込むフォントのサブセットに使う）
+        self.characters = set()
+        self.new_page()
+
+    def new_page(self):
+        self.page = {'ops': [], 'links': []}
+        self.pages.append(self.page)
+        self.y = MARGIN
+
+    @property
+    def at_top(self):
+        return self.y <= MARGIN + 0.01
+
+    def space(self, amount):
+        """縦の余白（ページ先頭では詰める）"""
+        if not self.at_top:
+            self.y = min(self.y + amount, CONTENT_BOTTOM)
+
+    def ensure(self, height):
+        """残りの高さが足りなければ改ページ"""
+        if self.y + height > CONTENT_BOTTOM and not self.at_top:
+            self.new_page()
+
+    def rect(self, x, top, width, height, fill=None, stroke=None, line_width=0.75):
+        ops = ['q']
+        if fill:
+            ops.append('%s %s %s rg' % tuple(number(c) for c in hex_color(fill)))
+        if stroke:
+            ops.append('%s %s %s RG %s w' % (*(number(c) for c in hex_color(stroke)), number(line_width)))
+        ops.append(f"{number(x)} {number(PAGE_HEIGHT - top - height)} {number(width)} {number(height)} re")
+        ops.append('B' if fill and stroke else ('f' if fill else 'S'))
+        ops.append('Q')
+        self.page['ops'].append(' '.join(ops))
+
+    def line(self, x1, y1, x2, y2, color, line_width=0.75):
+        r, g, b = (number(c) for c in hex_color(color))
+        self.page['ops'].append(
+            f"q {r} {g} {b} RG {number(line_width)} w {number(x1)} {number(PAGE_HEIGHT - y1)} m "
+            f"{number(x2)} {number(PAGE_HEIGHT - y2)} l S Q"
+        )
+
+    def text(self, x, baseline, text, size, color, bold=False, italic=False, page=None):
+        text = normalize_text(text)
+        self.characters.update(text)
+        r, g, b = (number(c) for c in hex_color(color))
+        ops = [f"q BT /F1 {number(size)} Tf {r} {g} {b} rg"]
+        if bold:
+            # 太字のフォントは使わない（埋め込む場合も標準の太さだけ）ため、太字は輪郭を重ねて表現する
+            ops.append(f"{r} {g} {b} RG 2 Tr {number(size * 0.03)} w")
+        skew = '0.21' if italic else '0'
+        ops.append(f"1 0 {skew} 1 {number(x)} {number(PAGE_HEIGHT - baseline)} Tm {encode_text(text)} Tj ET Q")
+        (page or self.page)['ops'].append(' '.join(ops))
+
+    def draw_line(self, tokens, x, top, size, color, bold=False, line_height=None):
+        """折り返した1行を描画"""
+        line_height = line_height or size * LINE_HEIGHT
+        baseline = top + line_height / 2 + size * 0.35
+        # 同じTextRunの連続したトークンはまとめて描画
+        segments = []
+        for token, run in tokens:
+            if segments and segments[-1][1] is run:
+                segments[-1][0] += token
+            else:
+                segments.append([token, run])
+        for text, run in segments:
+            width = text_width(text, size)
+            if run.code:
+                self.rect(x, baseline - size * 0.9, width, size * 1.2, fill='#f4f4f4')
+            run_color = LINK_COLOR if run.link else (STRONG_COLOR if run.bold and color == TEXT_COLOR else color)
+            self.text(x, baseline, text, size, run_color, bold or run.bold, run.italic)
+            if run.link:
+                trimmed = text_width(text.rstrip(), size)
+                self.line(x, baseline + size * 0.12, x + trimmed, baseline + size * 0.12, LINK_COLOR, size * 0.05)
+                if ':' in run.link:
+                    self.page['links'].append((x, top, trimmed, line_height, run.link))
+            x += width
+
+    def runs(self, runs, x, width, size, color=TEXT_COLOR, bold=False, line_height=None):
+        """書式付きテキストを折り返して描画（行単位で改ページ）"""
+        line_height = line_height or size * LINE_HEIGHT
+        for tokens in wrap_runs(runs, width, size):
+            self.ensure(line_height)
+            self.draw_line(tokens, x, self.y, size, color, bold, line_height)
+            self.y += line_height
+
+def layout_heading(layout, block):
+    size, color, margin_top, margin_bottom, border, border_color = HEADING_STYLES.get(block.level, HEADING_STYLES[6])
+    # 印刷時は「# 」見出しごとに改ページ（最初の見出しを除く）
+    if block.level == 1 and not layout.at_top:
+        layout.new_page()
+    layout.space(margin_top)
+    # 見出しだけがページ末尾に残らないよう、続く2行分の余裕を確保
+    lines = wrap_runs(block.runs, CONTENT_WIDTH, size)
+    layout.ensure(len(lines) * size * 1.3 + BODY_SIZE * LINE_HEIGHT * 2)
+    layout.runs(block.runs, MARGIN, CONTENT_WIDTH, size, color, bold=True, line_height=size * 1.3)
+    if border:
+        layout.y += size * 0.4
+        layout.line(MARGIN, layout.y, MARGIN + CONTENT_WIDTH, layout.y, border_color, border)
+    layout.y += margin_bottom
+
+def layout_list(layout, list_block, x, width, depth=0):
+    indent = BODY_SIZE * 1.5
+    for item in list_block.items:
+        marker = f"{item.number}." if list_block.ordered else '・'
+        layout.ensure(BODY_SIZE * LINE_HEIGHT)
+        marker_x = x + indent - text_width(marker, BODY_SIZE) - (2 if list_block.ordered else 0)
+        layout.draw_line([(marker, TextRun(marker))], marker_x, layout.y, BODY_SIZE, TEXT_COLOR)
+        layout.runs(item.runs, x + indent, width - indent, BODY_SIZE)
+        for child in item.children:
+            layout_list(layout, child, x + indent, width - indent, depth + 1)
+        layout.y += 2
+
+def table_column_widths(table, width, size, padding):
+    """列幅を決定（内容の幅に比例して配分し、表全体を本文幅に合わせる）"""
+    columns = max(len(row) for row in table.rows)
+    natural = [padding * 2 + size] * columns
+    for row in table.rows:
+        for i, cell in enumerate(row):
+            cell_width = max((text_width(''.join(t for t, _ in line), size) for line in wrap_runs(cell, 10 ** 6, size)), default=0)
+            natural[i] = max(natural[i], cell_width + padding * 2)
+    total = sum(natural)
+    # 狭い列が潰れないよう、本文幅の均等割りの半分を下限にする
+    minimum = width / columns / 2
+    widths = [max(w * width / total, minimum) for w in natural]
+    scale = width / sum(widths)
+    return [w * scale for w in widths]
+
+def layout_table(layout, table):
+    if not table.rows:
+        return
+    size = TABLE_SIZE
+    padding = 6
+    line_height = size * 1.5
+    widths = table_column_widths(table, CONTENT_WIDTH, size, padding)
+
+    def measure(row):
+        cells = [wrap_runs(cell, widths[i] - padding * 2, size) for i, cell in enumerate(row)]
+        return cells, max(len(lines) for lines in cells) * line_height + padding * 2
+
+    def draw_row(row, is_header):
+        cells, height = measure(row)
+        x = MARGIN
+        for i, width in enumerate(widths):
+            layout.rect(x, layout.y, width, height, fill='#f8f9fa' if is_header else None, stroke=BORDER_COLOR)
+            for n, tokens in enumerate(cells[i] if i < len(cells) else []):
+                layout.draw_line(tokens, x + padding, layout.y + padding + n * line_height, size, TEXT_COLOR, is_header, line_height)
+            x += width
+        layout.y += height
+
+    layout.space(11)
+    header_height = measure(table.header)[1]
+    layout.ensure(header_height + measure(table.body[0])[1] if table.body else header_height)
+    draw_row(table.header, True)
+    for row in table.body:
+        height = measure(row)[1]
+        if layout.y + height > CONTENT_BOTTOM:
+            # 改ページした場合はヘッダー行を繰り返す
+            layout.new_page()
+            draw_row(table.header, True)
+        draw_row(row, False)
+    layout.y += 11
+
+def layout_code(layout, block):
+    size = CODE_SIZE
+    padding = 7.5
+    line_height = size * 1.4
+    lines = []
+    for line in block.text.split('\n'):
+        lines.extend([(part, TextRun(part))] for part in wrap_code_line(line, CONTENT_WIDTH - padding * 2, size))
+
+    layout.space(BODY_SIZE)
+    while lines:
+        available = int((CONTENT_BOTTOM - layout.y - padding * 2) // line_height)
+        if available < 1 or (available < 2 < len(lines) and not layout.at_top):
+            layout.new_page()
+            continue
+        chunk, lines = lines[:available], lines[available:]
+        height = len(chunk) * line_height + padding * 2
+        layout.rect(MARGIN, layout.y, CONTENT_WIDTH, height, fill='#f8f8f8', stroke=BORDER_COLOR)
+        for n, tokens in enumerate(chunk):
+            layout.draw_line(tokens, MARGIN + padding, layout.y + padding + n * line_height, size, TEXT_COLOR, line_height=line_height)
+        layout.y += height
+        if lines:
+            layout.new_page()
+    layout.y += BODY_SIZE
+
+def layout_blockquote(layout, block):
+    layout.space(11)
+    top, page = layout.y, layout.page
+    layout.runs(block.runs, MARGIN + 14, CONTENT_WIDTH - 14, BODY_SIZE, QUOTE_COLOR)
+    if layout.page is page:
+        layout.line(MARGIN + 1.5, top, MARGIN + 1.5, layout.y, '#3498db', 3)
+    layout.y += 11
+
+def layout_block(layout, block):
+    """ドキュメントモデルの1ブロックを配置する"""
+    if isinstance(block, Heading):
+        layout_heading(layout, block)
+    elif isinstance(block, Paragraph):
+        layout.space(BODY_SIZE)
+        layout.runs(block.runs, MARGIN, CONTENT_WIDTH, BODY_SIZE)
+        layout.y += BODY_SIZE
+    elif isinstance(block, ListBlock):
+        layout.space(7.5)
+        layout_list(layout, block, MARGIN, CONTENT_WIDTH)
+        layout.y += 7.5
+    elif isinstance(block, Table):
+        layout_table(layout, block)
+    elif isinstance(block, CodeBlock):
+        layout_code(layout, block)
+    elif isinstance(block, Blockquote):
+        layout_blockquote(layout, block)
+    elif isinstance(block, HorizontalRule):
+        layout.space(8)
+        layout.line(MARGIN, layout.y, MARGIN + CONTENT_WIDTH, layout.y, BORDER_COLOR)
+        layout.y += 8
+
+def add_header_footer(layout):
+    """全ページにヘッダーと「Page n of N」のフッターを追加"""
+    total = len(layout.pages)
+    size = 7.5
+    for n, page in enumerate(layout.pages, 1):
+        footer = FOOTER_FORMAT.format(page=n, total=total)
+        layout.text((PAGE_WIDTH - text_width(HEADER_TEXT, size)) / 2, MARGIN / 2, HEADER_TEXT, size, MUTED_COLOR, page=page)
+        layout.text((PAGE_WIDTH - text_width(footer, size)) / 2, PAGE_HEIGHT - MARGIN / 2 + size, footer, size, MUTED_COLOR, page=page)
+
+def stream_object(data, entries=''):
+    """Flate圧縮したストリームのオブジェクト"""
+    stream = zlib.compress(data)
+    return f"<< /Length {len(stream)} /Filter /FlateDecode{entries} >>\nstream\n".encode('latin-1') + stream + b"\nendstream"
+
+def to_unicode_cmap(codes):
+    """文字コード（UCS-2）からUnicodeへの対応表（テキストのコピー・検索用のToUnicode CMap）"""
+    lines = [
+        "/CIDInit /ProcSet findresource begin", "12 dict begin", "begincmap",
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        "/CMapName /Adobe-Identity-UCS def", "/CMapType 2 def",
+        "1 begincodespacerange", "<0000> <FFFF>", "endcodespacerange",
+    ]
+    # bfcharは1つのまとまりに100件まで
+    for i in range(0, len(codes), 100):
+        chunk = codes[i:i + 100]
+        lines.append(f"{len(chunk)} beginbfchar")
+        lines.extend(f"<{code:04X}> <{code:04X}>" for code in chunk)
+        lines.append("endbfchar")
+    lines += ["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+    return '\n'.join(lines).encode('latin-1')
+
+def add_standard_font(add):
+    """埋め込みなしの標準CIDフォント（3〜5）"""
+    add(3, f"<< /Type /Font /Subtype /Type0 /BaseFont /{FONT_NAME}-{FONT_ENCODING} "
+           f"/Encoding /{FONT_ENCODING} /DescendantFonts [4 0 R] >>")
+    add(4, f"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /{FONT_NAME} "
+           "/CIDSystemInfo << /Registry (Adobe) /Ordering (Japan1) /Supplement 2 >> "
+           "/FontDescriptor 5 0 R /DW 1000 /W [231 389 500] >>")
+    add(5, f"<< /Type /FontDescriptor /FontName /{FONT_NAME} /Flags 4 /FontBBox [-92 -250 1010 922] "
+           "/ItalicAngle 0 /Ascent 752 /Descent -221 /CapHeight 737 /StemV 114 >>")
+
+def width_array(codes):
+    """CIDFontの幅（W）の配列（連続する文字コードは「先頭のコード [幅 …]」にまとめる）"""
+    items = []
+    for code in codes:
+        width = str(round(text_width(chr(code), 1000)))
+        if items and items[-1][0] + len(items[-1][1]) == code:
+            items[-1][1].append(width)
+        else:
+            items.append((code, [width]))
+    return '[' + ' '.join(f"{code} [{' '.join(widths)}]" for code, widths in items) + ']'
+
+def add_embedded_font(add, font, characters, next_id):
+    """サブセット化したTrueTypeフォント（3〜5と、next_id以降のフォント本体・CIDToGIDMap・ToUnicode）
+
+    文字コードは標準フォントと同じUCS-2のまま（Identity-HでCID＝文字コード）とし、
+    CIDToGIDMapでサブセットのグリフ番号に対応付ける。幅は配置の計算（text_width）と同じ値をWで指定する
+    """
+    file_id, map_id, unicode_id = next_id, next_id + 1, next_id + 2
+    name = f"{font.tag}+{re.sub(r'[^A-Za-z0-9_-]', '', font.postscript_name) or 'SkillSheetCJK'}"
+    codes = sorted(ord(ch) for ch in characters)
+
+    glyph_map = bytearray(2 * (codes[-1] + 1 if codes else 1))
+    for code in codes:
+        glyph_map[code * 2:code * 2 + 2] = font.glyph_ids.get(code, 0).to_bytes(2, 'big')
+
+    add(3, f"<< /Type /Font /Subtype /Type0 /BaseFont /{name} /Encoding /Identity-H "
+           f"/DescendantFonts [4 0 R] /ToUnicode {unicode_id} 0 R >>")
+    add(4, f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{name} "
+           "/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+           f"/FontDescriptor 5 0 R /DW 1000 /W {width_array(codes)} /CIDToGIDMap {map_id} 0 R >>")
+    add(5, f"<< /Type /FontDescriptor /FontName /{name} /Flags 4 /FontBBox [{' '.join(map(str, font.bbox))}] "
+           f"/ItalicAngle 0 /Ascent {font.ascent} /Descent {font.descent} /CapHeight {font.cap_height} "
+           f"/StemV 80 /FontFile2 {file_id} 0 R >>")
+    add(file_id, stream_object(font.data, f" /Length1 {len(font.data)}"))
+    add(map_id, stream_object(bytes(glyph_map)))
+    add(unicode_id, stream_object(to_unicode_cmap(codes)))
+    return next_id + 3
+
+def build_pdf(pages, title='', font=None, characters=()):
+    """ページごとの描画命令からPDFファイルのバイト列を作成
+
+    font（font_subset.EmbeddedFont）を指定した場合は、描画した文字（characters）のフォントとして埋め込む
+    """
+    objects = {}
+
+    def add(obj_id, body):
+        objects[obj_id] = body if isinstance(body, bytes) else body.encode('latin-1')
+
+    # 1: カタログ, 2: ページツリー, 3〜5: フォント, 6: 文書情報, 7以降: ページ（埋め込むフォントの本体などはページの後）
+    if font is None:
+        add_standard_font(add)
+    add(6, f"<< /Title {encode_info_text(title)} /Producer (md_to_pdf_native.py) >>")
+
+    page_ids = []
+    next_id = 7
+    for page in pages:
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        annots = []
+        for x, top, width, height, url in page['links']:
+            uri = quote(url, safe=":/?#[]@!$&'*+,;=%~-._").replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            add(next_id, f"<< /Type /Annot /Subtype /Link /Border [0 0 0] "
+                         f"/Rect [{number(x)} {number(PAGE_HEIGHT - top - height)} {number(x + width)} {number(PAGE_HEIGHT - top)}] "
+                         f"/A << /Type /Action /S /URI /URI ({uri}) >> >>")
+            annots.append(f"{next_id} 0 R")
+            next_id += 1
+
+        add(content_id, stream_object('\n'.join(page['ops']).encode('latin-1')))
+        annots_entry = f" /Annots [{' '.join(annots)}]" if annots else ''
+        add(page_id, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {number(PAGE_WIDTH)} {number(PAGE_HEIGHT)}] "
+                     f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R{annots_entry} >>")
+        page_ids.append(page_id)
+
+    if font is not None:
+        add_embedded_font(add, font, characters, next_id)
+
+    add(1, "<< /Type /Catalog /Pages 2 0 R >>")
+    add(2, f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>")
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(output)
+        output += f"{obj_id} 0 obj\n".encode('latin-1') + objects[obj_id] + b"\nendobj\n"
+    xref_offset = len(output)
+    size = max(objects) + 1
+    output += f"xref\n0 {size}\n0000000000 65535 f \n".encode('latin-1')
+    for obj_id in range(1, size):
+        output += f"{offsets[obj_id]:010d} 00000 n \n".encode('latin-1')
+    output += f"trailer\n<< /Size {size} /Root 1 0 R /Info 6 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode('latin-1')
+    return bytes(output)
+
+def render_pdf_native(document, pdf_file, font_file=None):
+    """ドキュメントモデルからPDFを作成する（ブラウザを使わない）"""
+    data = render_pdf_bytes(document, font_file)
+    with span('pdf.write', file=pdf_file):
+        with open(pdf_file, 'wb') as f:
+            f.write(data)
+    return pdf_file
+
+def render_pdf_bytes(document, font_file=None):
+    """ドキュメントモデルからPDFのバイト列を作成する
+
+    日本語フォント（font_fileまたは font_subset.find_font で見つかるもの）がある場合はサブセットを埋め込む
+    折り返しの位置はフォントの文字幅で決まるため、サブセットは配置の前に本文の文字から作成する
+    """
+    font = None
+    font_file = find_font(font_file)
+    if font_file:
+        characters = set(normalize_text(document.content + HEADER_TEXT + FOOTER_FORMAT + LAYOUT_CHARACTERS))
+        with span('pdf.font', file=font_file, characters=len(characters)):
+            font = load_subset(font_file, characters)
+
+    token = _font_widths.set(font and {chr(code): width / 1000 for code, width in font.advances.items()})
+    try:
+        blocks = document.blocks
+        with span('pdf.layout', blocks=len(blocks)) as layout_span:
+            layout = PdfLayout()
+            for block in blocks:
+                layout_block(layout, block)
+            add_header_footer(layout)
+            layout_span.set(pages=len(layout.pages))
+        if font and not layout.characters <= characters:
+            # 本文にない文字を描画した場合はグリフを追加する（幅は配置に使った標準の幅のまま）
+            font = load_subset(font_file, characters | layout.characters)
+        return build_pdf(layout.pages, document.title, font, layout.characters)
+    finally:
+        _font_widths.reset(token)
+
+def markdown_to_pdf_native(md_file, pdf_file):
+    """マークダウンファイルをPDFに変換する"""
+    render_pdf_native(load_document(md_file), pdf_file)
+    print(f"✓ PDFファイルが作成されました: {pdf_file}")
+    return pdf_file
+
+def main():
+    """メイン関数"""
+    if len(sys.argv) == 3:
+        md_file, pdf_file = sys.argv[1], sys.argv[2]
+    else:
+        md_file = "HM_スキルシート.md"
+        pdf_file = "HM_スキルシート.pdf"
+
+    if not os.path.exists(md_file):
+        print(f"✗ ファイルが見つかりません: {md_file}")
+        return
+
+    try:
+        markdown_to_pdf_native(md_file, pdf_file)
+    except Exception as e:
+        print(f"✗ エラー: {md_file} の変換に失敗しました - {e}")
+
+if __name__ == "__main__":
+    main()
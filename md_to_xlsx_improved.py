@@ -5,291 +5,379 @@
 すべてのセクションを含む包括的なExcelファイルを生成
 """
 
-import pandas as pd
 import re
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.styles.differential import DifferentialStyle
-from openpyxl.formatting.rule import Rule
 import os
 
-def parse_markdown_to_excel(md_file_path, excel_file_path):
-    """マークダウンファイルを解析してExcelファイルを作成"""
+from instrumentation import span
+from skill_sheet_model import load_document
+
+# 見出し行（# 〜 ####）
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*$')
+
+# 見出し先頭の絵文字などの装飾記号
+HEADING_DECORATION_PATTERN = re.compile(r'^[^\w（(]+')
+
+# プロジェクトの見出し（「N. 会社名（期間）」、期間は末尾の括弧）
+PROJECT_TITLE_PATTERN = re.compile(r'(\d+)\.\s*(.+)（(.+?)）$')
+
+# 見出し直下の「**業種：** 〜 | **雇用形態：** 〜」の行
+PROJECT_INFO_PATTERN = re.compile(r'\*\*業種：\*\*\s*(.*?)\s*\|\s*\*\*雇用形態：\*\*\s*(.*?)\s*$', re.MULTILINE)
+
+# 強み・特徴の番号付きリスト（「1. **見出し**: 内容」）
+STRENGTH_PATTERN = re.compile(r'\d+\.\s+\*\*(.*?)\*\*:\s*(.*)')
+
+def parse_markdown_to_excel(md_file_path, excel_file_path, sheets=None, streaming=False):
+    """マークダウンファイルを解析してExcelファイルを作成
+
+    sheets にシート名のリストを渡すと、そのシートの抽出・作成のみを行う
+    streaming=True の場合はwrite_onlyのワークシートを使い、行を生成順に
+    シリアライズするため、行数が増えてもメモリ使用量が増えない
+    """
     
-    # マークダウンファイルを読み込み
-    with open(md_file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
+    # マークダウンファイルを読み込み、共通ドキュメントモデルに変換
+    document = load_document(md_file_path)
+    
+    render_workbook(document, excel_file_path, sheets, streaming)
+    print(f"改良版Excelファイルが作成されました: {excel_file_path}")
+
+def render_workbook(document, excel_file_path, sheets=None, streaming=False, workers=None):
+    """ドキュメントモデルからExcelファイルを作成
+
+    workersを指定した場合は、シートごとのXMLをその数のワーカープロセスで並列に作成する（parallel_workbook.py）
+    """
+    if workers:
+        from parallel_workbook import render_workbook_parallel
+        return render_workbook_parallel(document, excel_file_path, sheets, workers=workers)
+    
+    # 作成するシートを決定
+    builders = select_sheet_builders(sheets)
     
     # Excelワークブックを作成
-    wb = Workbook()
+    wb = new_workbook(document, streaming)
     
-    # 各シートを作成
-    create_basic_info_sheet(wb, content)
-    create_specialty_areas_sheet(wb, content)
-    create_technical_skills_sheet(wb, content)
-    create_self_pr_sheet(wb, content)
-    create_project_experience_sheet(wb, content)
-    create_responsibility_matrix_sheet(wb, content)
-    create_strengths_sheet(wb, content)
+    # 各シートを作成（レコードはドキュメントが抽出してキャッシュする）
+    for name, builder in builders.items():
+        with span('xlsx.sheet', sheet=name):
+            builder(wb, document)
     
     # デフォルトシートを削除
     if 'Sheet' in wb.sheetnames:
         wb.remove(wb['Sheet'])
     
     # Excelファイルを保存
-    wb.save(excel_file_path)
-    print(f"改良版Excelファイルが作成されました: {excel_file_path}")
+    with span('xlsx.save', file=excel_file_path):
+        wb.save(excel_file_path)
+    return excel_file_path
 
-def create_basic_info_sheet(wb, content):
-    """基本情報シートを作成"""
-    ws = wb.create_sheet(title="基本情報")
+def new_workbook(document, streaming=False):
+    """ヘッダーのスタイルと文書のプロパティを設定した空のワークブックを作成"""
+    # openpyxlは読み込みに時間がかかるため、Excelを作成するときだけインポートする
+    from openpyxl import Workbook
+    from openpyxl.packaging.custom import StringProperty
+    
+    wb = Workbook(write_only=streaming)
+    register_header_style(wb)
+    
+    # 表題と更新日はどのシートにも含まれないため、文書のプロパティに保存する（xlsx_to_md.py で復元する）
+    wb.properties.title = document.title
+    if document.updated:
+        wb.custom_doc_props.append(StringProperty(name=UPDATED_PROPERTY, value=document.updated))
+    return wb
+
+def select_sheet_builders(sheets=None):
+    """シート名のリストから作成関数を選択（Noneの場合はすべて）"""
+    if sheets is None:
+        return dict(SHEET_BUILDERS)
     
-    # ヘッダースタイル
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    unknown = [name for name in sheets if name not in SHEET_BUILDERS]
+    if unknown:
+        raise ValueError(f"不明なシート名です: {', '.join(unknown)}")
     
-    # 基本情報を抽出
-    basic_info = extract_basic_info(content)
+    # ワークブック内のシート順は常に既定の順序に揃える
+    return {name: builder for name, builder in SHEET_BUILDERS.items() if name in sheets}
+
+HEADER_STYLE_NAME = "スキルシート見出し"
+
+# 更新日を保存するユーザー定義プロパティの名前
+UPDATED_PROPERTY = "更新日"
+
+def register_header_style(wb):
+    """ヘッダー用の名前付きスタイルをワークブックに登録（全シートで共有）"""
+    from openpyxl.styles import Font, NamedStyle, PatternFill
+    
+    if HEADER_STYLE_NAME in wb.style_names:
+        return
+    header_style = NamedStyle(name=HEADER_STYLE_NAME)
+    header_style.font = Font(bold=True, color="FFFFFF")
+    header_style.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    wb.add_named_style(header_style)
+
+def write_sheet(wb, title, headers, rows, column_widths):
+    """シートを作成し、ヘッダー行とデータ行を書き込む
+
+    write_onlyのワークブックでは、rowsから取り出した行をその場でシリアライズする
+    """
+    ws = create_sheet(wb, title, headers, column_widths)
     
     # データを追加
-    ws['A1'] = "項目"
-    ws['B1'] = "内容"
-    ws['A1'].font = header_font
-    ws['A1'].fill = header_fill
-    ws['B1'].font = header_font
-    ws['B1'].fill = header_fill
-    
-    row = 2
-    for key, value in basic_info.items():
-        ws[f'A{row}'] = key
-        ws[f'B{row}'] = value
-        row += 1
-    
-    # 列幅を調整
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 40
-
-def create_specialty_areas_sheet(wb, content):
-    """得意分野シートを作成"""
-    ws = wb.create_sheet(title="得意分野")
+    for row in rows:
+        ws.append(row)
     
-    # ヘッダースタイル
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    return ws
+
+def create_sheet(wb, title, headers, column_widths, freeze_panes=None):
+    """シートを作成し、列幅とヘッダー行を設定する（データ行は呼び出し側で追加する）
+
+    freeze_panesにはスクロールしても表示したままにする範囲の右下のセル（'A2'など）を指定する
+    """
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
     
-    # 得意分野を抽出
-    specialty_data = extract_specialty_areas(content)
+    ws = wb.create_sheet(title=title)
     
-    # データを追加
-    ws['A1'] = "カテゴリ"
-    ws['B1'] = "内容"
-    ws['A1'].font = header_font
-    ws['A1'].fill = header_fill
-    ws['B1'].font = header_font
-    ws['B1'].fill = header_fill
-    
-    row = 2
-    for category, items in specialty_data.items():
-        if isinstance(items, list):
-            for item in items:
-                ws[f'A{row}'] = category
-                ws[f'B{row}'] = item
-                row += 1
+    # ウィンドウ枠の固定（write_onlyでは行の書き込み前に設定する必要がある）
+    if freeze_panes:
+        ws.freeze_panes = freeze_panes
+    
+    # 列幅を調整（write_onlyでは行の書き込み前に設定する必要がある）
+    for col, width in enumerate(column_widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    
+    # ヘッダーを設定
+    if headers:
+        if wb.write_only:
+            header_cells = []
+            for header in headers:
+                cell = WriteOnlyCell(ws, value=header)
+                cell.style = HEADER_STYLE_NAME
+                header_cells.append(cell)
+            ws.append(header_cells)
         else:
-            ws[f'A{row}'] = category
-            ws[f'B{row}'] = items
-            row += 1
+            ws.append(headers)
+            for cell in ws[1]:
+                cell.style = HEADER_STYLE_NAME
     
-    # 列幅を調整
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 50
+    return ws
 
-def create_technical_skills_sheet(wb, content):
-    """技術スキルシートを作成"""
-    ws = wb.create_sheet(title="技術スキル")
+def create_basic_info_sheet(wb, document):
+    """基本情報シートを作成"""
+    basic_info = document.basic_info
     
-    # ヘッダースタイル
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    rows = ([key, value] for key, value in basic_info.items())
+    write_sheet(wb, "基本情報", ["項目", "内容"], rows, [20, 40])
+
+def create_specialty_areas_sheet(wb, document):
+    """得意分野シートを作成"""
+    specialty_data = document.specialty_areas
     
-    # 技術スキルを抽出
-    skills = extract_technical_skills(content)
+    def rows():
+        for category, items in specialty_data.items():
+            if isinstance(items, list):
+                for item in items:
+                    yield [category, item]
+            else:
+                yield [category, items]
     
-    # データを追加
-    ws['A1'] = "カテゴリ"
-    ws['B1'] = "技術・言語"
-    ws['C1'] = "経験年数"
-    
-    for col in ['A1', 'B1', 'C1']:
-        ws[col].font = header_font
-        ws[col].fill = header_fill
-    
-    row = 2
-    for category, items in skills.items():
-        for item, years in items.items():
-            ws[f'A{row}'] = category
-            ws[f'B{row}'] = item
-            ws[f'C{row}'] = years
-            row += 1
-    
-    # 列幅を調整
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 25
-    ws.column_dimensions['C'].width = 15
-
-def create_self_pr_sheet(wb, content):
+    write_sheet(wb, "得意分野", ["カテゴリ", "内容"], rows(), [20, 50])
+
+def create_technical_skills_sheet(wb, document):
+    """技術スキルシートを作成
+
+    記載された経験年数の隣に、プロジェクト経験の期間から計算した実績（skill_experience.py）を並べる
+    """
+    from skill_experience import computed_months, declared_months, months_text
+    
+    skills = document.technical_skills
+    months = computed_months(document)
+    
+    rows = (
+        [category, item, years, months_text(declared_months(months, item))]
+        for category, items in skills.items()
+        for item, years in items.items()
+    )
+    write_sheet(wb, "技術スキル", ["カテゴリ", "技術・言語", "経験年数", "経験年数（実績）"], rows, [20, 25, 15, 18])
+
+def create_self_pr_sheet(wb, document):
     """自己PR・備考シートを作成"""
-    ws = wb.create_sheet(title="自己PR・備考")
+    self_pr_items = document.self_pr
     
-    # ヘッダースタイル
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    
-    # 自己PRを抽出
-    self_pr_items = extract_self_pr(content)
-    
-    # データを追加
-    ws['A1'] = "No"
-    ws['B1'] = "自己PR・備考"
-    ws['A1'].font = header_font
-    ws['A1'].fill = header_fill
-    ws['B1'].font = header_font
-    ws['B1'].fill = header_fill
-    
-    row = 2
-    for i, item in enumerate(self_pr_items, 1):
-        ws[f'A{row}'] = i
-        ws[f'B{row}'] = item
-        row += 1
-    
-    # 列幅を調整
-    ws.column_dimensions['A'].width = 8
-    ws.column_dimensions['B'].width = 80
-
-def create_project_experience_sheet(wb, content):
+    rows = ([i, item] for i, item in enumerate(self_pr_items, 1))
+    write_sheet(wb, "自己PR・備考", ["No", "自己PR・備考"], rows, [8, 80])
+
+def create_project_experience_sheet(wb, document):
     """プロジェクト経験シートを作成"""
-    ws = wb.create_sheet(title="プロジェクト経験")
-    
-    # ヘッダースタイル
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    
-    # プロジェクト経験を抽出
-    projects = extract_project_experience(content)
-    
-    # ヘッダーを設定
     headers = ["No", "会社名", "期間", "業種", "雇用形態", "チーム規模", "主要技術", "プロジェクト概要", "主な業務内容", "習得スキル", "成果・実績"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-    
-    # データを追加
-    for row, project in enumerate(projects, 2):
-        ws.cell(row=row, column=1, value=project.get('no', ''))
-        ws.cell(row=row, column=2, value=project.get('company', ''))
-        ws.cell(row=row, column=3, value=project.get('period', ''))
-        ws.cell(row=row, column=4, value=project.get('industry', ''))
-        ws.cell(row=row, column=5, value=project.get('employment', ''))
-        ws.cell(row=row, column=6, value=project.get('team_size', ''))
-        ws.cell(row=row, column=7, value=project.get('technologies', ''))
-        ws.cell(row=row, column=8, value=project.get('overview', ''))
-        ws.cell(row=row, column=9, value=project.get('duties', ''))
-        ws.cell(row=row, column=10, value=project.get('skills', ''))
-        ws.cell(row=row, column=11, value=project.get('achievements', ''))
-    
-    # 列幅を調整
+    keys = ['no', 'company', 'period', 'industry', 'employment', 'team_size', 'technologies', 'overview', 'duties', 'skills', 'achievements']
     column_widths = [5, 20, 20, 10, 12, 15, 30, 40, 40, 40, 40]
-    for col, width in enumerate(column_widths, 1):
-        ws.column_dimensions[chr(64 + col)].width = width
+    
+    # プロジェクト経験を1件ずつ抽出しながら書き込む
+    rows = (
+        [project.get(key, '') for key in keys]
+        for project in document.iter_projects()
+    )
+    write_sheet(wb, "プロジェクト経験", headers, rows, column_widths)
 
-def create_responsibility_matrix_sheet(wb, content):
+def create_responsibility_matrix_sheet(wb, document):
     """担当領域シートを作成"""
-    ws = wb.create_sheet(title="担当領域")
-    
-    # ヘッダースタイル
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    
-    # 担当領域マトリックスを抽出
-    matrix_data = extract_responsibility_matrix(content)
+    # 担当領域マトリックス（pandasを使わずにヘッダーと行のまま書き込む）
+    matrix = document.responsibility_rows
     
-    if matrix_data is not None and not matrix_data.empty:
-        # DataFrameからExcelに変換
-        for r in dataframe_to_rows(matrix_data, index=False, header=True):
-            ws.append(r)
-        
-        # ヘッダーにスタイルを適用
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-        
-        # 列幅を調整
-        ws.column_dimensions['A'].width = 35
-        for col in range(2, len(matrix_data.columns) + 1):
-            ws.column_dimensions[chr(64 + col)].width = 18
+    if matrix is not None:
+        headers, rows = matrix
+        write_sheet(wb, "担当領域", headers, rows, [35] + [18] * (len(headers) - 1))
+    else:
+        write_sheet(wb, "担当領域", [], [], [])
 
-def create_strengths_sheet(wb, content):
+def create_strengths_sheet(wb, document):
     """強み・特徴シートを作成"""
-    ws = wb.create_sheet(title="強み・特徴")
-    
-    # ヘッダースタイル
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    strengths = document.strengths
     
-    # 強み・特徴を抽出
-    strengths = extract_strengths(content)
+    rows = ([i, strength] for i, strength in enumerate(strengths, 1))
+    write_sheet(wb, "強み・特徴", ["No", "強み・特徴"], rows, [8, 80])
+
+# シート名と作成関数の対応（ワークブック内の並び順）
+SHEET_BUILDERS = {
+    "基本情報": create_basic_info_sheet,
+    "得意分野": create_specialty_areas_sheet,
+    "技術スキル": create_technical_skills_sheet,
+    "自己PR・備考": create_self_pr_sheet,
+    "プロジェクト経験": create_project_experience_sheet,
+    "担当領域": create_responsibility_matrix_sheet,
+    "強み・特徴": create_strengths_sheet,
+}
+
+def normalize_heading(title):
+    """見出しテキストから先頭の絵文字などの装飾を取り除く"""
+    return HEADING_DECORATION_PATTERN.sub('', title).strip()
+
+def build_section_index(content):
+    """見出し（## 〜 ####）ごとの範囲を1パスで索引化する
+
+    各セクションは次のキーを持つ辞書:
+      level      見出しレベル（2〜4）
+      title      装飾を除いた見出しテキスト
+      start      見出し行の開始位置
+      body_start 本文の開始位置（見出し行の直後）
+      end        次の同レベル以上の見出しの直前
+      children   下位レベルのセクション
+    戻り値はトップレベルのセクションのリスト
+    """
+    roots = []
+    stack = []
+    in_code_block = False
+    pos = 0
+    
+    for line in content.splitlines(keepends=True):
+        line_start = pos
+        pos += len(line)
+        
+        # コードブロック内の「#」は見出しとして扱わない
+        if line.lstrip().startswith('```'):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            continue
+        
+        heading_match = HEADING_PATTERN.match(line)
+        if not heading_match:
+            continue
+        level = len(heading_match.group(1))
+        
+        # 同レベル以上の見出しが現れたら、開いているセクションを閉じる
+        while stack and stack[-1]['level'] >= level:
+            stack.pop()['end'] = line_start
+        
+        # 「#」（文書タイトル）と「#####」以下は索引に含めない
+        if level < 2 or level > 4:
+            continue
+        
+        section = {
+            'level': level,
+            'title': normalize_heading(heading_match.group(2)),
+            'start': line_start,
+            'body_start': pos,
+            'end': len(content),
+            'children': [],
+        }
+        if stack:
+            stack[-1]['children'].append(section)
+        else:
+            roots.append(section)
+        stack.append(section)
     
-    # データを追加
-    ws['A1'] = "No"
-    ws['B1'] = "強み・特徴"
-    ws['A1'].font = header_font
-    ws['A1'].fill = header_fill
-    ws['B1'].font = header_font
-    ws['B1'].fill = header_fill
-    
-    row = 2
-    for i, strength in enumerate(strengths, 1):
-        ws[f'A{row}'] = i
-        ws[f'B{row}'] = strength
-        row += 1
-    
-    # 列幅を調整
-    ws.column_dimensions['A'].width = 8
-    ws.column_dimensions['B'].width = 80
-
-def extract_basic_info(content):
+    return roots
+
+def find_section(sections, title):
+    """索引からタイトルが一致（前方一致）する最初のセクションを探す"""
+    for section in sections:
+        if section['title'].startswith(title):
+            return section
+        found = find_section(section['children'], title)
+        if found:
+            return found
+    return None
+
+def section_text(content, section, include_children=True):
+    """セクション本文を取り出す（末尾の区切り線「---」は除く）"""
+    if section is None:
+        return ''
+    end = section['end']
+    if not include_children and section['children']:
+        end = section['children'][0]['start']
+    text = content[section['body_start']:end].strip()
+    while text.endswith('---'):
+        text = text[:-3].rstrip()
+    return text
+
+def first_table_lines(text):
+    """テキスト内の最初のテーブルの行を取り出す"""
+    table_lines = []
+    for line in text.split('\n'):
+        if line.strip().startswith('|'):
+            table_lines.append(line)
+        elif table_lines:
+            break
+    return table_lines
+
+def list_items(text):
+    """トップレベルのリスト項目（「- 」始まり）を取り出す"""
+    items = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if line.startswith('- ') and not line.startswith('  -'):
+            items.append(line[2:])
+    return items
+
+def extract_basic_info(content, index=None):
     """基本情報を抽出"""
     basic_info = {}
+    if index is None:
+        index = build_section_index(content)
     
     # 基本情報テーブルを抽出
-    table_match = re.search(r'## 📋 基本情報.*?\n((?:\|.*?\|.*?\n)+)', content, re.DOTALL)
-    if table_match:
-        table_content = table_match.group(1)
-        for line in table_content.split('\n'):
-            if '|' in line and '---' not in line and '項目' not in line:
-                parts = [part.strip() for part in line.split('|') if part.strip()]
-                if len(parts) >= 2:
-                    key = parts[0].replace('**', '')
-                    value = parts[1].replace('**', '')
-                    basic_info[key] = value
+    section = find_section(index, '基本情報')
+    for line in first_table_lines(section_text(content, section)):
+        if '|' in line and '---' not in line and '項目' not in line:
+            parts = [part.strip() for part in line.split('|') if part.strip()]
+            if len(parts) >= 2:
+                key = parts[0].replace('**', '')
+                value = parts[1].replace('**', '')
+                basic_info[key] = value
     
     return basic_info
 
-def extract_specialty_areas(content):
+def extract_specialty_areas(content, index=None):
     """得意分野を抽出"""
     specialty_data = {}
+    if index is None:
+        index = build_section_index(content)
     
     # 得意分野セクションを抽出
-    specialty_match = re.search(r'## 🎯 得意分野(.*?)(?=## |$)', content, re.DOTALL)
-    if specialty_match:
-        specialty_content = specialty_match.group(1)
-        
+    section = find_section(index, '得意分野')
+    if section:
         # 得意分野リストを抽出（改良版）
         areas = []
-        lines = specialty_content.split('\n')
-        for line in lines:
+        for line in section_text(content, section, include_children=False).split('\n'):
             line = line.strip()
             if line.startswith('- **') and line.endswith('**'):
                 area = line.replace('- **', '').replace('**', '')
@@ -298,22 +386,20 @@ def extract_specialty_areas(content):
             specialty_data['得意分野'] = areas
         
         # 得意言語を抽出
-        languages_match = re.search(r'### 得意言語(.*?)(?=### |$)', specialty_content, re.DOTALL)
-        if languages_match:
-            lang_text = languages_match.group(1)
-            languages = re.findall(r'- (.+)', lang_text)
-            specialty_data['得意言語'] = languages
+        languages_section = find_section(section['children'], '得意言語')
+        if languages_section:
+            lang_text = section_text(content, languages_section)
+            specialty_data['得意言語'] = re.findall(r'- (.+)', lang_text)
         
         # 得意業務を抽出
-        duties_match = re.search(r'### 得意業務(.*?)(?=### |$)', specialty_content, re.DOTALL)
-        if duties_match:
-            duties_text = duties_match.group(1)
-            duties = re.findall(r'- (.+)', duties_text)
-            specialty_data['得意業務'] = duties
+        duties_section = find_section(section['children'], '得意業務')
+        if duties_section:
+            duties_text = section_text(content, duties_section)
+            specialty_data['得意業務'] = re.findall(r'- (.+)', duties_text)
     
     return specialty_data
 
-def extract_technical_skills(content):
+def extract_technical_skills(content, index=None):
     """技術スキルを抽出"""
     skills = {
         "開発言語": {},
@@ -321,67 +407,95 @@ def extract_technical_skills(content):
         "データベース": {},
         "サーバー・OS": {}
     }
+    if index is None:
+        index = build_section_index(content)
     
-    # 各カテゴリのテーブルを抽出
-    patterns = {
-        "開発言語": r'### 開発言語.*?\n((?:\|.*?\|.*?\n)+)',
-        "フレームワーク": r'### フレームワーク.*?\n((?:\|.*?\|.*?\n)+)',
-        "データベース": r'### データベース.*?\n((?:\|.*?\|.*?\n)+)',
-        "サーバー・OS": r'### サーバー・OS.*?\n((?:\|.*?\|.*?\n)+)'
-    }
+    # 技術スキルセクション配下を優先し、なければ文書全体から探す
+    parent = find_section(index, '技術スキル')
+    scope = parent['children'] if parent else index
     
-    for category, pattern in patterns.items():
-        match = re.search(pattern, content, re.DOTALL)
-        if match:
-            table_content = match.group(1)
-            for line in table_content.split('\n'):
-                if '|' in line and '---' not in line and '経験年数' not in line:
-                    parts = [part.strip() for part in line.split('|') if part.strip()]
-                    if len(parts) >= 2:
-                        tech = parts[0]
-                        years = parts[1]
-                        skills[category][tech] = years
+    # 技術スキルセクション配下のその他のカテゴリ（「### その他」など）も抽出する
+    if parent:
+        for child in parent['children']:
+            skills.setdefault(child['title'], {})
+    
+    # 各カテゴリのテーブルを抽出
+    for category in skills:
+        section = find_section(scope, category)
+        for line in first_table_lines(section_text(content, section)):
+            if '|' in line and '---' not in line and '経験年数' not in line:
+                parts = [part.strip() for part in line.split('|') if part.strip()]
+                if len(parts) >= 2:
+                    tech = parts[0]
+                    years = parts[1]
+                    skills[category][tech] = years
     
     return skills
 
-def extract_self_pr(content):
+def extract_self_pr(content, index=None):
     """自己PR・備考を抽出"""
-    self_pr_items = []
-    
-    # 自己PR・備考セクションを抽出
-    pr_match = re.search(r'## 🌟 自己PR・備考(.*?)(?=## |$)', content, re.DOTALL)
-    if pr_match:
-        pr_content = pr_match.group(1)
-        # リスト項目を抽出
-        items = re.findall(r'- (.+)', pr_content)
-        self_pr_items = items
+    if index is None:
+        index = build_section_index(content)
     
-    return self_pr_items
+    # 自己PR・備考セクションのリスト項目を抽出
+    section = find_section(index, '自己PR・備考')
+    return re.findall(r'- (.+)', section_text(content, section))
 
-def extract_project_experience(content):
+def extract_project_experience(content, index=None):
     """プロジェクト経験を抽出"""
-    projects = []
-    
-    # プロジェクトセクション全体を抽出
-    project_section_match = re.search(r'## 📈 職歴・プロジェクト経験（時系列順）(.*?)(?=## 📊 担当領域|$)', content, re.DOTALL)
-    if not project_section_match:
-        return projects
-    
-    project_section_content = project_section_match.group(1)
+    return list(iter_project_experience(content, index))
+
+def extract_technologies(content, section):
+    """「#### 使用技術」の「- **言語・FW：** Python, Flask」の行を「言語・FW： Python, Flask | …」にまとめる"""
+    tech_lines = []
+    for line in section_text(content, section).split('\n'):
+        line = line.strip()
+        if line.startswith('- **') and '：**' in line:
+            # - **言語・FW：** Python, Flask, React.js の形式
+            tech_line = line.replace('- **', '').replace('**', '')
+            tech_lines.append(tech_line)
+    return ' | '.join(tech_lines)
+
+def iter_project_periods(content, index=None):
+    """プロジェクト経験の期間と使用技術だけを1件ずつ抽出するジェネレーター（経験年数の計算用）
+
+    見出しと「#### 使用技術」だけを読み、概要・業務内容などの他の小見出しは読まない
+    """
+    if index is None:
+        index = build_section_index(content)
     
-    # プロジェクトを区切る---で分割
-    project_sections = re.split(r'\n---\n', project_section_content)
+    project_section = find_section(index, '職歴・プロジェクト経験')
+    if not project_section:
+        return
     
-    for section in project_sections:
-        section = section.strip()
-        if not section:
+    for section in project_section['children']:
+        title_match = PROJECT_TITLE_PATTERN.match(section['title'])
+        if not title_match:
             continue
-            
-        # プロジェクトタイトルを抽出
-        title_match = re.search(r'### (\d+)\. (.+?)（(.+?)）', section)
+        technologies = ''
+        for child in section['children']:
+            if child['title'] == '使用技術':
+                technologies = extract_technologies(content, child)
+                break
+        yield {'period': title_match.group(3), 'technologies': technologies}
+
+def iter_project_experience(content, index=None):
+    """プロジェクト経験を1件ずつ抽出するジェネレーター"""
+    if index is None:
+        index = build_section_index(content)
+    
+    # プロジェクトセクション全体を抽出
+    project_section = find_section(index, '職歴・プロジェクト経験')
+    if not project_section:
+        return
+    
+    # 「### N. 会社名（期間）」ごとにプロジェクトを処理
+    for section in project_section['children']:
+        # プロジェクトタイトルを抽出（期間は末尾の括弧）
+        title_match = PROJECT_TITLE_PATTERN.match(section['title'])
         if not title_match:
             continue
-            
+        
         project = {
             'no': title_match.group(1),
             'company': title_match.group(2),
@@ -396,58 +510,54 @@ def extract_project_experience(content):
             'achievements': ''
         }
         
-        # 業種、雇用形態、チーム規模を抽出
-        info_match = re.search(r'\*\*期間：\*\*.*?\|\s*\*\*業種：\*\*\s*(.+?)\s*\|\s*\*\*雇用形態：\*\*\s*(.+?)\s*\n\*\*チーム規模：\*\*\s*(.+)', section)
+        # 見出し直下の概要行から業種、雇用形態、チーム規模を抽出
+        summary = section_text(content, section, include_children=False)
+        info_match = PROJECT_INFO_PATTERN.search(summary)
         if info_match:
             project['industry'] = info_match.group(1).strip()
             project['employment'] = info_match.group(2).strip()
-            project['team_size'] = info_match.group(3).strip()
+        else:
+            employment_match = re.search(r'\*\*雇用形態：\*\*\s*(.+?)\s*$', summary, re.MULTILINE)
+            if employment_match:
+                project['employment'] = employment_match.group(1).strip()
+        team_match = re.search(r'\*\*チーム規模：\*\*\s*(.+)', summary)
+        if team_match:
+            project['team_size'] = team_match.group(1).strip()
+        
+        subsections = {child['title']: child for child in section['children']}
         
         # 使用技術を抽出
-        tech_match = re.search(r'#### 使用技術\n(.*?)(?=#### |$)', section, re.DOTALL)
-        if tech_match:
-            tech_content = tech_match.group(1).strip()
-            tech_lines = []
-            for line in tech_content.split('\n'):
-                line = line.strip()
-                if line.startswith('- **') and '：**' in line:
-                    # - **言語・FW：** Python, Flask, React.js の形式
-                    tech_line = line.replace('- **', '').replace('**', '')
-                    tech_lines.append(tech_line)
-            project['technologies'] = ' | '.join(tech_lines)
+        if '使用技術' in subsections:
+            project['technologies'] = extract_technologies(content, subsections['使用技術'])
         
         # プロジェクト概要を抽出
-        overview_match = re.search(r'#### プロジェクト概要\n(.*?)(?=#### |$)', section, re.DOTALL)
-        if overview_match:
-            overview_content = overview_match.group(1).strip()
+        if 'プロジェクト概要' in subsections:
+            overview_content = section_text(content, subsections['プロジェクト概要'])
             # 複数行を1つの文章に統合
-            overview_content = re.sub(r'\n+', ' ', overview_content)
-            project['overview'] = overview_content
+            project['overview'] = re.sub(r'\n+', ' ', overview_content)
         
         # 主な業務内容を抽出
-        duties_match = re.search(r'#### 主な業務内容\n(.*?)(?=#### |$)', section, re.DOTALL)
-        if duties_match:
-            duties_content = duties_match.group(1).strip()
+        if '主な業務内容' in subsections:
             duties_items = []
-            lines = duties_content.split('\n')
             current_item = ""
             
-            for line in lines:
+            for line in section_text(content, subsections['主な業務内容']).split('\n'):
+                if line.startswith('  - '):
+                    # サブ項目
+                    if current_item:
+                        current_item += " " + line.strip().replace('- ', '', 1)
+                    continue
                 line = line.strip()
                 if line.startswith('- **') and line.endswith('**'):
                     # - **業務内容** の形式
                     if current_item:
                         duties_items.append(current_item.strip())
                     current_item = line.replace('- **', '').replace('**', '')
-                elif line.startswith('  - '):
-                    # サブ項目
-                    if current_item:
-                        current_item += " " + line.replace('  - ', '')
-                elif line.startswith('- ') and not line.startswith('  -'):
+                elif line.startswith('- '):
                     # 通常のリスト項目
                     if current_item:
                         duties_items.append(current_item.strip())
-                    current_item = line.replace('- ', '')
+                    current_item = line[2:]
                 elif line and not line.startswith('-') and current_item:
                     # 継続行
                     current_item += " " + line
@@ -458,42 +568,35 @@ def extract_project_experience(content):
             project['duties'] = ' | '.join(duties_items)
         
         # 習得スキルを抽出
-        skills_match = re.search(r'#### 習得スキル\n(.*?)(?=#### |$)', section, re.DOTALL)
-        if skills_match:
-            skills_content = skills_match.group(1).strip()
-            skills_items = []
-            for line in skills_content.split('\n'):
-                line = line.strip()
-                if line.startswith('- ') and not line.startswith('  -'):
-                    skill = line.replace('- ', '')
-                    skills_items.append(skill)
-            project['skills'] = ' | '.join(skills_items)
+        if '習得スキル' in subsections:
+            project['skills'] = ' | '.join(list_items(section_text(content, subsections['習得スキル'])))
         
         # 成果・実績を抽出
-        achievements_match = re.search(r'#### 成果・実績\n(.*?)(?=#### |$)', section, re.DOTALL)
-        if achievements_match:
-            achievements_content = achievements_match.group(1).strip()
-            achievements_items = []
-            for line in achievements_content.split('\n'):
-                line = line.strip()
-                if line.startswith('- ') and not line.startswith('  -'):
-                    achievement = line.replace('- ', '')
-                    achievements_items.append(achievement)
-            project['achievements'] = ' | '.join(achievements_items)
+        if '成果・実績' in subsections:
+            project['achievements'] = ' | '.join(list_items(section_text(content, subsections['成果・実績'])))
         
-        projects.append(project)
-    
-    return projects
+        yield project
 
-def extract_responsibility_matrix(content):
-    """担当領域マトリックスを抽出"""
-    # 担当領域テーブルを探す
-    matrix_match = re.search(r'## 📊 担当領域.*?\n((?:\|.*?\|.*?\n)+)', content, re.DOTALL)
-    if not matrix_match:
+def extract_responsibility_matrix(content, index=None):
+    """担当領域マトリックスをDataFrameとして抽出"""
+    matrix = extract_responsibility_rows(content, index)
+    if matrix is None:
         return None
     
-    table_content = matrix_match.group(1)
-    lines = [line.strip() for line in table_content.split('\n') if line.strip() and '---' not in line]
+    # pandasはDataFrameが必要な場合だけインポートする
+    import pandas as pd
+    headers, data_rows = matrix
+    return pd.DataFrame(data_rows, columns=headers)
+
+def extract_responsibility_rows(content, index=None):
+    """担当領域マトリックスを (ヘッダー, 行のリスト) として抽出"""
+    if index is None:
+        index = build_section_index(content)
+    
+    # 担当領域テーブルを探す
+    section = find_section(index, '担当領域')
+    table_lines = first_table_lines(section_text(content, section))
+    lines = [line.strip() for line in table_lines if line.strip() and '---' not in line]
     
     if len(lines) < 2:
         return None
@@ -513,22 +616,19 @@ def extract_responsibility_matrix(content):
     if not data_rows:
         return None
     
-    # DataFrameを作成
-    df = pd.DataFrame(data_rows, columns=headers)
-    return df
+    return headers, data_rows
 
-def extract_strengths(content):
+def extract_strengths(content, index=None):
     """強み・特徴を抽出"""
     strengths = []
-    
-    # 強み・特徴セクションを抽出
-    strengths_match = re.search(r'## 🎯 強み・特徴(.*?)(?=## |$)', content, re.DOTALL)
-    if strengths_match:
-        strengths_content = strengths_match.group(1)
-        # 番号付きリストを抽出
-        items = re.findall(r'\d+\.\s+\*\*(.*?)\*\*:\s*(.*)', strengths_content)
-        for item in items:
-            strengths.append(f"{item[0]}: {item[1]}")
+    if index is None:
+        index = build_section_index(content)
+    
+    # 強み・特徴セクションの番号付きリストを抽出
+    section = find_section(index, '強み・特徴')
+    items = STRENGTH_PATTERN.findall(section_text(content, section))
+    for item in items:
+        strengths.append(f"{item[0]}: {item[1]}")
     
     return strengths
 
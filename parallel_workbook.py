@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excelファイルのシートを複数のプロセスで並列に作成するモジュール
+openpyxlのワークブックはプロセス間で共有できないため、シートごとにワーカーで
+1シートだけのワークブックを作成してワークシートのXMLを取り出し、メインのプロセスで1つのxlsxにまとめる
+
+- ワーカー: md_to_xlsx_improved.py の作成関数（SHEET_BUILDERS）でシートを作成し、XMLを返す
+- メイン: シート名・スタイル・文書のプロパティだけを持つ空のワークブック（骨組み）をopenpyxlで保存し、
+  各ワークシートの部分をワーカーのXMLに置き換える
+
+文字列はセル内（inlineStr）に書き込まれるため共有文字列表の統合は不要で、
+スタイルは骨組みとワーカーで同じ順序で登録してセルの書式番号を揃える。
+出力はwrite_only（--streaming）で作成したファイルと文書のプロパティの日時以外同じになる
+
+大きなスキルシート（プロジェクト経験・担当領域の行が多いもの）向け。小さなファイルではプロセスの起動のほうが長い
+
+使い方:
+    python skillsheet.py xlsx HM_スキルシート.md --parallel 4
+
+    # Pythonから
+    render_workbook_parallel(document, 'HM_スキルシート.xlsx', workers=4)
+"""
+
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+
+from instrumentation import init_worker, span, worker_config
+from md_to_xlsx_improved import (
+    HEADER_STYLE_NAME, SHEET_BUILDERS, new_workbook, register_header_style, select_sheet_builders,
+)
+from skill_sheet_model import RecordSkillSheet
+
+# 行数がスキルシートの大きさに比例するシート（それぞれ別のワーカーで作成し、他のシートは1つのワーカーでまとめて作成する）
+LARGE_SHEETS = ["プロジェクト経験", "担当領域"]
+
+def register_header_cell_style(wb):
+    """ヘッダーのセルの書式をワークブックに登録する
+
+    セルの書式番号は最初に使われた順に振られるため、骨組みとワーカーで先に同じ順序で登録し、
+    どのシートを作成したワークブックでもヘッダーの書式番号を同じにする
+    """
+    wb._cell_styles.add(copy(wb._named_styles[HEADER_STYLE_NAME].as_tuple()))
+
+def render_sheet_xml(document, name):
+    """1シートだけのワークブックを作成し、ワークシートのXMLを返す（ワーカーで実行する）"""
+    from openpyxl import Workbook
+
+    with span('xlsx.sheet', sheet=name):
+        # 文書のプロパティは骨組みに設定するため、ワーカーでは作成しない
+        wb = Workbook(write_only=True)
+        register_header_style(wb)
+        register_header_cell_style(wb)
+        SHEET_BUILDERS[name](wb, document)
+
+        # write_onlyのシートは行を一時ファイルに書き込んでいるため、ワークブックを保存（圧縮）せずに
+        # シートを閉じて一時ファイルのXMLを読む（openpyxlの保存処理と同じ手順）
+        ws = wb.worksheets[0]
+        ws.close()
+        try:
+            with open(ws._writer.out, 'rb') as f:
+                return f.read()
+        finally:
+            ws._writer.cleanup()
+
+def render_sheets_xml(document, names):
+    """複数のシートのXMLを順に作成する（ワーカーに渡すドキュメントの受け渡しを1回にする）"""
+    return [render_sheet_xml(document, name) for name in names]
+
+def plan_tasks(names):
+    """ワーカーに渡すシート名のまとまり（大きなシートは1つずつ、残りはまとめて1つ）"""
+    tasks = [[name] for name in names if name in LARGE_SHEETS]
+    rest = [name for name in names if name not in LARGE_SHEETS]
+    return tasks + [rest] if rest else tasks
+
+def render_skeleton(document, names):
+    """シート名・スタイル・文書のプロパティを持つ空のワークブックを保存し、(xlsxのバイト列, シートの部分名のリスト) を返す"""
+    wb = new_workbook(document, streaming=True)
+    register_header_cell_style(wb)
+    worksheets = [wb.create_sheet(title=name) for name in names]
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue(), [ws.path.lstrip('/') for ws in worksheets]
+
+def assemble(skeleton, parts, excel_file_path):
+    """骨組みのxlsxのワークシートの部分を置き換えて保存する（他の部分はそのまま写す）"""
+    with zipfile.ZipFile(io.BytesIO(skeleton)) as source, \
+            zipfile.ZipFile(excel_file_path, 'w', zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            data = parts.get(info.filename)
+            target.writestr(info, data if data is not None else source.read(info))
+
+def render_workbook_parallel(document, excel_file_path, sheets=None, workers=None, executor=None):
+    """シートのXMLをプロセスプールで並列に作成し、1つのExcelファイルにまとめる
+
+    executorを指定した場合はそのプロセスプールを使う（複数のファイルで使い回す場合）
+    """
+    names = list(select_sheet_builders(sheets))
+    tasks = plan_tasks(names)
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(tasks)),
+                                       initializer=init_worker, initargs=(worker_config(),))
+    try:
+        # 見出し索引は先に作成してドキュメントと一緒に渡し、ワーカーごとに作り直さない（抽出は各ワーカーで行う）
+        if not isinstance(document, RecordSkillSheet):
+            document.index
+        futures = [executor.submit(render_sheets_xml, document, task) for task in tasks]
+        skeleton, paths = render_skeleton(document, names)
+        xml = {name: data for task, future in zip(tasks, futures) for name, data in zip(task, future.result())}
+        parts = {path: xml[name] for path, name in zip(paths, names)}
+    finally:
+        if owns_executor:
+            executor.shutdown()
+
+    with span('xlsx.save', file=excel_file_path):
+        assemble(skeleton, parts, excel_file_path)
+    return excel_file_path
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常駐するPDF描画ワーカー
+html_to_pdf.js を --serve モードで1回だけ起動し、ブラウザとページを使い回して
+複数のHTMLを順にPDFへ変換する（ファイルごとのブラウザ起動を避ける）
+"""
+
+import base64
+import itertools
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import Future
+
+# HTMLからPDFを生成するNode.jsスクリプト
+HTML_TO_PDF_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'html_to_pdf.js')
+
+# 同時に描画するページ数の既定値
+DEFAULT_PAGES = 4
+
+class PdfRenderWorker:
+    """html_to_pdf.js の常駐プロセスにジョブを送り、結果をFutureで受け取る"""
+
+    def __init__(self, pages=DEFAULT_PAGES, startup_timeout=60):
+        self.pages = pages
+        self._ids = itertools.count(1)
+        self._pending = {}
+        # _pendingの操作用と、ワーカーの標準入力への書き込み用（書き込み中も結果を読み取れるよう分ける）
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._started = False
+        self._stderr = []
+
+        self._process = subprocess.Popen(
+            ['node', HTML_TO_PDF_SCRIPT, '--serve', '--pages', str(pages)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8', bufsize=1,
+        )
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+        # ブラウザの起動を待つ（起動に失敗した場合はここでエラーにする）
+        self._ready.wait(startup_timeout)
+        if not self._started:
+            self.close()
+            raise RuntimeError(f"PDF描画ワーカーを起動できませんでした: {self._error_detail()}")
+
+    def _error_detail(self):
+        # Node.jsのスタックトレースからエラーメッセージの行を取り出す
+        messages = [line.strip() for line in self._stderr if 'Error' in line]
+        if messages:
+            return messages[0]
+        return f"終了コード {self._process.poll()}"
+
+    def _read_stderr(self):
+        for line in self._process.stderr:
+            self._stderr.append(line)
+
+    def _read_results(self):
+        """ワーカーの標準出力を1行ずつ読み、対応するFutureに結果を設定"""
+        for line in self._process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get('ready'):
+                self._started = True
+                self._ready.set()
+                continue
+
+            with self._lock:
+                future = self._pending.pop(message.get('id'), None)
+            if future is None:
+                continue
+            if not message.get('ok'):
+                future.set_exception(RuntimeError(f"PDFへの変換に失敗しました: {message.get('error')}"))
+            elif 'data' in message:
+                future.set_result(base64.b64decode(message['data']))
+            else:
+                future.set_result(message['output'])
+
+        # プロセスが終了したら未完了のジョブをすべて失敗させる
+        self._ready.set()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError(f"PDF描画ワーカーが終了しました: {self._error_detail()}"))
+
+    def render(self, html, pdf_file=None):
+        """HTML文字列をPDFに変換するジョブを送信する
+
+        pdf_fileを指定した場合は出力の絶対パス、省略した場合はPDFのバイト列を結果とするFutureを返す
+        """
+        future = Future()
+        job_id = next(self._ids)
+        job = {'id': job_id, 'html': html}
+        if pdf_file:
+            job['output'] = os.path.abspath(pdf_file)
+
+        with self._lock:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"PDF描画ワーカーが終了しました: {self._error_detail()}")
+            self._pending[job_id] = future
+
+        # 大きなHTMLはパイプがいっぱいになると書き込みで待つため、結果の読み取りが使う_lockの外で書き込む
+        # （ジョブの行が混ざらないよう、書き込みどうしは_write_lockで順番にする）
+        line = json.dumps(job, ensure_ascii=False) + '\n'
+        try:
+            with self._write_lock:
+                self._process.stdin.write(line)
+                self._process.stdin.flush()
+        except (OSError, ValueError):
+            with self._lock:
+                self._pending.pop(job_id, None)
+            raise RuntimeError(f"PDF描画ワーカーが終了しました: {self._error_detail()}")
+
+        return future
+
+    def close(self):
+        """受付を終了し、実行中のジョブが完了するのを待ってからワーカーを停止"""
+        with self._write_lock:
+            if self._process.stdin and not self._process.stdin.closed:
+                try:
+                    self._process.stdin.close()
+                except OSError:
+                    pass
+        try:
+            self._process.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._reader.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
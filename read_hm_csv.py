@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+グリッド形式のスキルシートCSV（HM.csv）を読み込むスクリプト
+表計算ソフトから書き出したCSVで、各項目の位置はセル（列・行）で決まっている
+下記の座標表に従ってCSVを1行ずつ読み進め、md_to_xlsx_improved.py の抽出関数と同じ形式のレコードを作成する
+pandasは使わず、座標表にあるセルの値だけを保持するため、行数が多くてもメモリ使用量はほぼ一定
+
+作成したドキュメントはマークダウンから読み込んだものと同じように
+render_workbook・render_docx などの変換関数にそのまま渡せる
+
+使い方:
+    python read_hm_csv.py HM.csv                # HM.md を作成
+    python skillsheet.py xlsx HM.csv            # CSVから直接Excelを作成
+"""
+
+import argparse
+import csv
+import os
+import re
+
+from instrumentation import span
+from skill_sheet_model import RecordSkillSheet
+
+# 固定位置の項目（セル番地）
+FIXED_CELLS = {
+    'title': 'B1',
+    'updated': 'AE2',
+    'furigana': 'F3',
+    'gender': 'U3',
+    'age': 'Y3',
+    'education': 'AC3',
+    'name': 'F4',
+    'github': 'F5',
+    'portfolio': 'U5',
+    'station': 'AC5',
+    'areas': 'F7',
+    'languages': 'Y7',
+    'duties': 'F8',
+    'self_pr': 'F9',
+}
+
+# 基本情報の項目名と FIXED_CELLS のキー（氏名はフリガナと合わせて作成する）
+BASIC_INFO_FIELDS = [
+    ("性別", 'gender'),
+    ("年齢", 'age'),
+    ("最終学歴", 'education'),
+    ("最寄り駅", 'station'),
+    ("GitHub ID", 'github'),
+    ("ポートフォリオ", 'portfolio'),
+]
+
+# 技術スキル表の見出し行（B列の値）と、カテゴリごとの（名前の列, 経験年数の列）
+SKILL_HEADER = ('B', '実務開発経験')
+SKILL_COLUMNS = [
+    ("開発言語", 'G', 'J'),
+    ("開発言語", 'L', 'O'),
+    ("フレームワーク", 'R', 'U'),
+    ("データベース", 'X', 'AA'),
+    ("サーバー・OS", 'AD', 'AG'),
+    ("その他", 'AJ', 'AM'),
+]
+
+# プロジェクト表の見出し行（2行構成で、工程名は項番の行にある）
+# 客先常駐・自社開発など、表が複数ある場合は表ごとに項番が振り直される
+PHASE_HEADER = ('B', '項番')
+PROJECT_HEADERS = [('G', '会社名 / プロダクト名'), PHASE_HEADER]
+
+# プロジェクトの1行目（B列に項番がある行）の列
+PROJECT_COLUMNS = {
+    'no': 'B',
+    'industry': 'G',
+    'company': 'I',
+    'employment': 'W',
+    'team_size': 'Y',
+    'languages': 'AA',
+    'databases': 'AC',
+    'servers': 'AE',
+    'tools': 'AG',
+}
+
+# 1行目からの相対位置（行, 列）にある項目
+PROJECT_BLOCK_CELLS = {
+    'start': (1, 'C'),
+    'service': (1, 'I'),
+    'detail': (3, 'I'),
+    'end': (6, 'C'),
+}
+
+# 担当領域（工程ごとに「●」が入る列。工程名は見出し行から読む）
+PHASE_COLUMNS = ['AI', 'AJ', 'AK', 'AL', 'AM', 'AN']
+
+# 使用技術のラベルと PROJECT_COLUMNS のキー
+TECHNOLOGY_FIELDS = [
+    ("言語・FW", 'languages'),
+    ("DB", 'databases'),
+    ("インフラ", 'servers'),
+    ("ツール", 'tools'),
+]
+
+# 業務内容のセル内の「＜見出し＞」とレコードのキー
+DETAIL_SECTIONS = {
+    "プロジェクトの概要": 'overview',
+    "状況": 'overview',
+    "担当業務など": 'duties',
+    "業務内容": 'duties',
+    "習得スキル": 'skills',
+    "打ち手・実績": 'achievements',
+    "自己評価": 'achievements',
+}
+
+# セル内の「＜見出し＞」
+DETAIL_HEADING_PATTERN = re.compile(r'^＜(.+?)＞$')
+
+# セル内のリスト記号（「--」はサブ項目）
+ITEM_MARKER_PATTERN = re.compile(r'^(--|-|・|●|⚫︎|⚫)\s*')
+
+def column_index(column):
+    """列名（A, B, …, AA）を0始まりの番号に変換"""
+    index = 0
+    for char in column:
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+def cell_position(ref):
+    """セル番地（F3）を (行番号, 列番号) に変換（行は1始まり、列は0始まり）"""
+    match = re.match(r'^([A-Z]+)(\d+)$', ref)
+    return int(match.group(2)), column_index(match.group(1))
+
+def cell_value(row, column):
+    """行から列の値を取り出す（全角空白は半角にする）"""
+    index = column_index(column)
+    if index >= len(row):
+        return ''
+    return row[index].replace('　', ' ').strip()
+
+def flatten(value, separator=' '):
+    """セル内の改行を除いて1行にする"""
+    return separator.join(line.strip() for line in value.split('\n') if line.strip())
+
+def split_values(value):
+    """カンマ・読点・改行区切りの値をリストにする"""
+    return [item.strip() for item in re.split(r'[,、\n]', value) if item.strip()]
+
+def cell_items(value):
+    """セル内のリスト（「- 」「・」「●」始まりの行）を項目のリストにする
+
+    サブ項目（「-- 」始まり）は直前の項目に空白区切りで、記号のない行は直前の項目にそのまま続ける
+    """
+    items = []
+    for line in value.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        match = ITEM_MARKER_PATTERN.match(line)
+        text = line[match.end():].strip() if match else line
+        if match and match.group(1) != '--' or not items:
+            items.append(text)
+        elif match:
+            items[-1] += ' ' + text
+        else:
+            items[-1] += text
+    return items
+
+def parse_detail(value):
+    """業務内容のセルを「＜見出し＞」ごとに分け、レコードのキーごとの項目リストにする"""
+    sections = {}
+    key = None
+    lines = []
+
+    def flush():
+        if key is not None:
+            sections.setdefault(key, []).extend(cell_items('\n'.join(lines)))
+
+    for line in value.split('\n'):
+        heading = DETAIL_HEADING_PATTERN.match(line.strip())
+        if heading:
+            flush()
+            key = DETAIL_SECTIONS.get(heading.group(1))
+            lines = []
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+def parse_team_size(value):
+    """「＜全体＞15名＜チーム＞2~3名」を「全体15名、チーム2~3名」にする"""
+    parts = re.findall(r'＜(.+?)＞\s*([^＜]*)', value)
+    if not parts:
+        return flatten(value)
+    return '、'.join(f"{label}{flatten(text, '')}" for label, text in parts if text.strip())
+
+def parse_service(value):
+    """「＜サービス＞」の後のサービス名（＜＞で囲まれている場合は外す）"""
+    text = flatten(value.replace('＜サービス＞', ''), '')
+    if text.startswith('＜') and text.endswith('＞'):
+        text = text[1:-1]
+    return text
+
+def build_project(no, cells, phases):
+    """プロジェクトのセルの値からレコードと担当領域の行を作成"""
+    company = flatten(cells.get('company', ''), '')
+    service = parse_service(cells.get('service', ''))
+    if service:
+        company = f"{company} - {service}" if company else service
+    start, end = cells.get('start', ''), cells.get('end', '')
+    period = f"{start}〜{end}" if start or end else ''
+
+    technologies = []
+    for label, key in TECHNOLOGY_FIELDS:
+        values = split_values(cells.get(key, ''))
+        if values:
+            technologies.append(f"{label}： {', '.join(values)}")
+
+    detail = parse_detail(cells.get('detail', ''))
+    project = {
+        'no': str(no),
+        'company': company,
+        'period': period,
+        'industry': flatten(cells.get('industry', '')),
+        'employment': flatten(cells.get('employment', ''), ''),
+        'team_size': parse_team_size(cells.get('team_size', '')),
+        'technologies': ' | '.join(technologies),
+        'overview': ' '.join(detail.get('overview', [])),
+        'duties': ' | '.join(detail.get('duties', [])),
+        'skills': ' | '.join(detail.get('skills', [])),
+        'achievements': ' | '.join(detail.get('achievements', [])),
+    }
+    marks = ['●' if cells.get(column) else '-' for column in PHASE_COLUMNS[:len(phases)]]
+    return project, [company] + marks
+
+def parse_hm_rows(rows):
+    """CSVの行のイテレーターからレコードの辞書を作成
+
+    固定位置の項目は座標表のセルだけを取り出し、技術スキル・プロジェクトは
+    見出し行を目印に1行ずつ読み進める（プロジェクトは項番のある行から次の項番までを1件とする）
+    """
+    fixed_positions = {cell_position(ref): key for key, ref in FIXED_CELLS.items()}
+    fixed = {}
+    skills = {}
+    projects = []
+    responsibility = []
+    phases = []
+    state = None
+    block = None
+
+    def finish_block():
+        if block is not None:
+            project, marks = build_project(len(projects) + 1, block['cells'], phases)
+            projects.append(project)
+            responsibility.append(marks)
+
+    for row_number, row in enumerate(rows, 1):
+        for column in range(len(row)):
+            key = fixed_positions.get((row_number, column))
+            if key is not None:
+                fixed[key] = row[column].replace('　', ' ').strip()
+
+        label = cell_value(row, SKILL_HEADER[0])
+        if label == SKILL_HEADER[1]:
+            state = 'skills'
+            continue
+        if any(cell_value(row, column) == value for column, value in PROJECT_HEADERS):
+            finish_block()
+            block = None
+            state = 'projects'
+            if cell_value(row, PHASE_HEADER[0]) == PHASE_HEADER[1]:
+                phases = [re.sub(r'\s+', '', cell_value(row, column)) for column in PHASE_COLUMNS]
+                phases = [phase for phase in phases if phase]
+            continue
+
+        if state == 'skills':
+            for category, name_column, years_column in SKILL_COLUMNS:
+                name = cell_value(row, name_column)
+                if name:
+                    skills.setdefault(category, {})[name] = cell_value(row, years_column)
+        elif state == 'projects':
+            if cell_value(row, PROJECT_COLUMNS['no']).isdigit():
+                finish_block()
+                block = {'start': row_number, 'cells': {}}
+                for key, column in PROJECT_COLUMNS.items():
+                    block['cells'][key] = cell_value(row, column)
+                for column in PHASE_COLUMNS:
+                    block['cells'][column] = cell_value(row, column)
+            elif block is not None:
+                offset = row_number - block['start']
+                for key, (row_offset, column) in PROJECT_BLOCK_CELLS.items():
+                    if row_offset == offset:
+                        block['cells'][key] = cell_value(row, column)
+    finish_block()
+
+    return build_records(fixed, skills, projects, phases, responsibility)
+
+def build_records(fixed, skills, projects, phases, responsibility):
+    """読み取った値を抽出関数と同じ形式のレコードにまとめる"""
+    name = fixed.get('name', '')
+    furigana = fixed.get('furigana', '')
+    basic_info = {"氏名": f"{name}（{furigana}）" if furigana else name}
+    for label, key in BASIC_INFO_FIELDS:
+        basic_info[label] = fixed.get(key) or '-'
+
+    specialty_areas = {}
+    for label, key, parse in [
+        ("得意分野", 'areas', cell_items),
+        ("得意言語", 'languages', split_values),
+        ("得意業務", 'duties', cell_items),
+    ]:
+        if fixed.get(key):
+            specialty_areas[label] = parse(fixed[key])
+
+    technical_skills = {category: {} for category in ("開発言語", "フレームワーク", "データベース", "サーバー・OS")}
+    technical_skills.update(skills)
+
+    title = fixed.get('title', '')
+    updated = re.sub(r'^更新日[：:]', '', fixed.get('updated', '')).replace(' ', '')
+    return {
+        'title': f"{name} {title}".strip(),
+        'updated': updated,
+        'basic_info': basic_info,
+        'specialty_areas': specialty_areas,
+        'technical_skills': technical_skills,
+        'self_pr': cell_items(fixed.get('self_pr', '')),
+        'project_experience': projects,
+        'responsibility_rows': (["プロジェクト"] + phases, responsibility) if responsibility else None,
+        'strengths': [],
+    }
+
+def read_hm_csv(csv_file, encoding='utf-8-sig'):
+    """CSVファイルを読み込んでレコードの辞書を返す"""
+    with span('read', file=csv_file):
+        with open(csv_file, 'r', encoding=encoding, newline='') as f:
+            return parse_hm_rows(csv.reader(f))
+
+def load_hm_csv(csv_file, encoding='utf-8-sig'):
+    """CSVファイルからドキュメントを作成"""
+    return RecordSkillSheet(read_hm_csv(csv_file, encoding), csv_file)
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="グリッド形式のスキルシートCSVをマークダウンに変換します")
+    parser.add_argument('input', nargs='?', default='HM.csv', help="CSVファイル（既定: HM.csv）")
+    parser.add_argument('-o', '--output', help="出力ファイル（既定: 入力ファイルと同じ場所の .md）")
+    parser.add_argument('--encoding', default='utf-8-sig', help="CSVの文字コード（既定: utf-8-sig）")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"✗ ファイルが見つかりません: {args.input}")
+        return 1
+
+    output = args.output or os.path.splitext(args.input)[0] + '.md'
+    document = load_hm_csv(args.input, args.encoding)
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(document.content)
+    print(f"✓ {args.input} → {output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
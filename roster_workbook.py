@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数のスキルシートを1つのExcelファイル（要員一覧）にまとめるスクリプト
+マークダウン・グリッド形式のCSV・Excelのスキルシートを1件ずつ読み込み、write_onlyのシートに書き込む
+
+- サマリー: 1人1行（氏名・更新日・プロジェクト数・技術スキル数・得意分野）
+- プロジェクト一覧: 1人・1プロジェクトごとに1行
+- スキルマトリクス: 技術ごとに1行、担当者ごとに1列（経験年数）
+- 経験年数（実績）: スキルマトリクスと同じ行・列に、プロジェクトの期間から計算した経験年数（skill_experience.py）
+
+サマリーとプロジェクト一覧はスキルシートを読みながら書き込み、読み終えたスキルシートは破棄する
+スキルマトリクスは全員を読み終えるまで書き込めないため、(技術, 担当者, 経験年数) だけを
+一時的なSQLiteデータベース（ディスク上）に入れておき、最後に技術ごとに1行ずつ書き込む
+そのため、数千人分をまとめてもメモリ使用量は人数にほとんど比例しない
+経験年数（実績）はプロジェクトの期間を整数の配列だけで持っておき、最後に全員分をNumPyでまとめて計算する
+
+使い方:
+    python roster_workbook.py skillsheets/ -o 要員一覧.xlsx
+    python roster_workbook.py skillsheets/ -r --csv --xlsx -o 要員一覧.xlsx
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from instrumentation import span
+from md_to_xlsx_improved import create_sheet, register_header_style
+from skill_experience import ExperienceAggregator, months_value
+from skill_index import normalize_term, open_sheet, parse_years
+
+DEFAULT_OUTPUT = '要員一覧.xlsx'
+
+# サマリーシートの列
+SUMMARY_HEADERS = ["氏名", "ファイル", "更新日", "プロジェクト数", "技術スキル数", "得意分野"]
+SUMMARY_WIDTHS = [20, 40, 15, 14, 14, 60]
+
+# プロジェクト一覧シートの列とレコードのキー（プロジェクト経験シートに氏名を加えたもの）
+PROJECT_HEADERS = ["氏名", "No", "会社名", "期間", "業種", "雇用形態", "チーム規模", "主要技術", "プロジェクト概要", "主な業務内容", "習得スキル", "成果・実績"]
+PROJECT_KEYS = ['no', 'company', 'period', 'industry', 'employment', 'team_size', 'technologies', 'overview', 'duties', 'skills', 'achievements']
+PROJECT_WIDTHS = [20, 5, 20, 20, 10, 12, 15, 30, 40, 40, 40, 40]
+
+# スキルマトリクスの担当者より前の列
+MATRIX_HEADERS = ["技術", "カテゴリ", "人数"]
+MATRIX_WIDTHS = [25, 15, 8]
+
+# Excelの最大列数（スキルマトリクスは担当者ごとに1列使う）
+MAX_COLUMNS = 16384
+
+SKILL_SCHEMA = """
+CREATE TABLE technologies (
+    term TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE TABLE skills (
+    term TEXT NOT NULL,
+    engineer INTEGER NOT NULL,
+    years TEXT NOT NULL,
+    PRIMARY KEY (term, engineer)
+);
+"""
+
+def engineer_name(document, path):
+    """担当者の表示名（基本情報の氏名、ない場合はファイル名）"""
+    name = str(document.basic_info.get("氏名", '')).strip()
+    return name if name and name != '-' else os.path.splitext(os.path.basename(path))[0]
+
+def years_value(text):
+    """経験年数のセルの値（年数として読めれば数値にして、Excelで並べ替え・集計できるようにする）"""
+    years = parse_years(text)
+    if years is None:
+        return text
+    return int(years) if years.is_integer() else round(years, 1)
+
+class RosterWorkbook:
+    """要員一覧のワークブックにスキルシートを1件ずつ追加する"""
+
+    def __init__(self):
+        self.wb = None
+        self.engineers = []
+        self.names = set()
+        self.project_count = 0
+        self.skills = sqlite3.connect('')
+        self.skills.executescript(SKILL_SCHEMA)
+        self.experience = ExperienceAggregator()
+
+    def open(self):
+        """ワークブックを作成する（1件目のスキルシートを追加するときに作成する）"""
+        from openpyxl import Workbook
+
+        self.wb = Workbook(write_only=True)
+        register_header_style(self.wb)
+        self.wb.properties.title = "要員一覧"
+
+        # 書き込む順にシートを作成する（write_onlyのシートは交互に追記できる）
+        self.summary = create_sheet(self.wb, "サマリー", SUMMARY_HEADERS, SUMMARY_WIDTHS, freeze_panes='B2')
+        self.projects = create_sheet(self.wb, "プロジェクト一覧", PROJECT_HEADERS, PROJECT_WIDTHS, freeze_panes='B2')
+
+    def add(self, document, path):
+        """1人分のスキルシートをサマリー・プロジェクト一覧に書き込み、技術スキルを記録する"""
+        name = self.unique_name(engineer_name(document, path), path)
+        engineer = len(self.engineers)
+
+        # 1人分を読み終えてから書き込む（読み込みの途中で失敗したスキルシートの行を残さない）
+        records = list(document.iter_projects())
+        projects = [[name] + [record.get(key, '') for key in PROJECT_KEYS] for record in records]
+        skills = [
+            (normalize_term(technology), technology, category, str(years))
+            for category, items in document.technical_skills.items()
+            for technology, years in items.items()
+            if normalize_term(technology)
+        ]
+        specialty = '、'.join(document.specialty_areas.get('得意分野', []))
+        updated = document.updated
+
+        if self.wb is None:
+            self.open()
+        for row in projects:
+            self.projects.append(row)
+        skill_count = 0
+        for term, technology, category, years in skills:
+            self.skills.execute('INSERT OR IGNORE INTO technologies VALUES (?, ?, ?)', (term, technology, category))
+            skill_count += self.skills.execute('INSERT OR IGNORE INTO skills VALUES (?, ?, ?)',
+                                               (term, engineer, years)).rowcount
+        self.summary.append([name, path, updated, len(projects), skill_count, specialty])
+
+        self.engineers.append(name)
+        self.names.add(name)
+        self.project_count += len(projects)
+        self.experience.add(records)
+
+    def unique_name(self, name, path):
+        """スキルマトリクスの列見出しが重複しないよう、同名の場合はファイル名（さらに重複する場合はパス）を付ける"""
+        for candidate in (name, f"{name}（{os.path.splitext(os.path.basename(path))[0]}）", f"{name}（{path}）"):
+            if candidate not in self.names:
+                return candidate
+        return f"{name}（{len(self.engineers) + 1}）"
+
+    def write_matrix(self):
+        """スキルマトリクス（人数の多い技術から順に、技術ごとに1行）を書き込み、(索引語, 技術名, カテゴリ, 人数) のリストを返す"""
+        if len(MATRIX_HEADERS) + len(self.engineers) > MAX_COLUMNS:
+            raise ValueError(f"スキルマトリクスの列数がExcelの上限を超えます（{len(self.engineers)}人）")
+
+        ws = create_sheet(self.wb, "スキルマトリクス", MATRIX_HEADERS + self.engineers,
+                          MATRIX_WIDTHS + [12] * len(self.engineers), freeze_panes='D2')
+        technologies = self.skills.execute("""
+            SELECT t.term, t.label, t.category, COUNT(*) AS engineers
+            FROM technologies t JOIN skills s ON s.term = t.term
+            GROUP BY t.term
+            ORDER BY engineers DESC, t.label
+        """).fetchall()
+        for term, label, category, count in technologies:
+            row = [None] * len(self.engineers)
+            for engineer, years in self.skills.execute(
+                    'SELECT engineer, years FROM skills WHERE term = ?', (term,)):
+                row[engineer] = years_value(years)
+            ws.append([label, category, count] + row)
+        return technologies
+
+    def write_experience(self, technologies):
+        """経験年数（実績）シート（スキルマトリクスと同じ行・列、プロジェクトに出てこない場合は空欄）を書き込む"""
+        ws = create_sheet(self.wb, "経験年数（実績）", MATRIX_HEADERS + self.engineers,
+                          MATRIX_WIDTHS + [12] * len(self.engineers), freeze_panes='D2')
+        labels = [label for _, label, _, _ in technologies]
+        for (_, label, category, _), months in zip(technologies, self.experience.iter_rows(labels)):
+            row = [months_value(count) if count else None for count in months.tolist()]
+            ws.append([label, category, int((months > 0).sum())] + row)
+
+    def save(self, output):
+        """サマリーの合計行・スキルマトリクスを書き込んで保存する"""
+        self.summary.append([])
+        self.summary.append([f"合計 {len(self.engineers)}人", None, None, self.project_count])
+        with span('roster.matrix', engineers=len(self.engineers)) as matrix_span:
+            technologies = self.write_matrix()
+            matrix_span.set(technologies=len(technologies))
+        with span('roster.experience', engineers=len(self.engineers)):
+            self.write_experience(technologies)
+        self.skills.close()
+        with span('xlsx.save', file=output):
+            self.wb.save(output)
+        return output
+
+def build_roster(paths, output):
+    """スキルシートの一覧から要員一覧を作成し、(追加した人数, 失敗した (パス, エラー) のリスト) を返す
+
+    1件も読み込めなかった場合はファイルを作成しない
+    """
+    roster = RosterWorkbook()
+    failures = []
+    for path in paths:
+        try:
+            with span('roster.sheet', file=path):
+                with open_sheet(path) as document:
+                    roster.add(document, path)
+        except Exception as e:
+            failures.append((path, f"{type(e).__name__}: {e}"))
+    if roster.engineers:
+        roster.save(output)
+    else:
+        roster.skills.close()
+    return len(roster.engineers), failures
+
+def main(argv=None):
+    """メイン関数"""
+    from batch_convert import collect_markdown_files
+
+    parser = argparse.ArgumentParser(description="複数のスキルシートを1つのExcelファイル（要員一覧）にまとめます")
+    parser.add_argument('targets', nargs='+', help="スキルシートのファイル、ディレクトリ、またはglobパターン")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help=f"出力ファイル（既定: {DEFAULT_OUTPUT}）")
+    parser.add_argument('-r', '--recursive', action='store_true', help="ディレクトリを再帰的に探索する")
+    parser.add_argument('--csv', action='store_true', help="ディレクトリ内のグリッド形式のCSV（*.csv）も含める")
+    parser.add_argument('--xlsx', action='store_true',
+                        help="ディレクトリ内のExcelファイル（md_to_xlsx_improved.py で作成したもの）も含める")
+    args = parser.parse_args(argv)
+
+    extensions = ['.md']
+    if args.csv:
+        extensions.append('.csv')
+    if args.xlsx:
+        extensions.append('.xlsx')
+    output = os.path.normpath(args.output)
+    paths = [path for path in collect_markdown_files(args.targets, args.recursive, extensions) if path != output]
+    if not paths:
+        print("✗ スキルシートが見つかりません")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        count, failures = build_roster(paths, output)
+    except (OSError, ValueError) as e:
+        print(f"✗ エラー: {e}")
+        return 1
+    for path, error in failures:
+        print(f"✗ {path}: {error}")
+    if not count:
+        print("✗ 読み込めたスキルシートがないため、要員一覧を作成しませんでした")
+        return 1
+    print(f"✓ {count}人分のスキルシートを {output} にまとめました（{time.perf_counter() - started:.2f}秒）")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,69 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import markdown
+import base64
 import os
+import subprocess
+from html import escape
 from pathlib import Path
 
+from font_subset import find_font, subset_font
+from instrumentation import span
+from skill_sheet_model import (
+    Blockquote, CodeBlock, Heading, HorizontalRule, LineBreak, ListBlock, Paragraph, Table, load_document,
+)
+
+# HTMLからPDFを生成するNode.jsスクリプト
+HTML_TO_PDF_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'html_to_pdf.js')
+
+# 埋め込むフォントのCSSでの名前（システムのフォント名と重ならないようにする）
+EMBEDDED_FONT_FAMILY = "SkillSheet CJK"
+
 def markdown_to_html(md_file, html_file):
     """マークダウンファイルをHTMLに変換する"""
     
-    # マークダウンファイルを読み込み
-    with open(md_file, 'r', encoding='utf-8') as f:
-        md_content = f.read()
+    # マークダウンファイルを読み込み、共通ドキュメントモデルに変換
+    document = load_document(md_file)
+    
+    # HTMLファイルに出力
+    write_html(document, html_file)
     
-    # マークダウンをHTMLに変換
-    md = markdown.Markdown(extensions=['tables', 'fenced_code', 'toc'])
-    html_content = md.convert(md_content)
+    print(f"HTMLファイルが作成されました: {html_file}")
+    print("このHTMLファイルをブラウザで開き、印刷機能でPDFに保存できます。")
+    return html_file
+
+def write_html(document, html_file):
+    """ドキュメントモデルからHTMLファイルを作成する"""
+    with span('html.render'):
+        html = render_html(document)
+    with span('html.write', file=html_file):
+        with open(html_file, 'w', encoding='utf-8') as f:
+            f.write(html)
+    return html_file
+
+def font_face_style(font_file, text):
+    """textの文字だけにサブセット化したフォント（WOFF）をdata URLで埋め込む@font-faceのスタイル"""
+    with span('html.font', file=font_file):
+        data = subset_font(font_file, set(text), flavor='woff')
+    return f"""
+    <style>
+    @font-face {{
+        font-family: "{EMBEDDED_FONT_FAMILY}";
+        src: url(data:font/woff;base64,{base64.b64encode(data).decode('ascii')}) format("woff");
+    }}
+    
+    body {{
+        font-family: "{EMBEDDED_FONT_FAMILY}", "Meiryo", "Yu Gothic", "Hiragino Sans", sans-serif;
+    }}
+    </style>"""
+
+def render_html(document, title="HM スキルシート", font_file=None):
+    """ドキュメントモデルからHTML文書（文字列）を作成する
+
+    日本語フォント（font_fileまたは font_subset.find_font で見つかるもの）がある場合は、本文の文字だけの
+    サブセットを埋め込み、閲覧・PDF化する環境にフォントがなくても同じ字形で表示する
+    """
+    html_content = '\n'.join(render_block(block) for block in document.blocks)
     
     # CSSスタイルを定義（日本語フォント対応）
     css_style = """
@@ -124,6 +173,10 @@ def markdown_to_html(md_file, html_file):
     </style>
     """
     
+    font_file = find_font(font_file)
+    if font_file:
+        css_style += font_face_style(font_file, title + html_content)
+    
     # HTMLテンプレート
     html_template = f"""
     <!DOCTYPE html>
@@ -131,7 +184,7 @@ def markdown_to_html(md_file, html_file):
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>HM スキルシート</title>
+        <title>{escape(title)}</title>
         {css_style}
     </head>
     <body>
@@ -140,13 +193,99 @@ def markdown_to_html(md_file, html_file):
     </html>
     """
     
-    # HTMLファイルに出力
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_template)
+    return html_template
+
+def render_runs(runs):
+    """書式付きテキスト（TextRun）をHTMLに変換する"""
+    parts = []
+    for run in runs:
+        if isinstance(run, LineBreak):
+            parts.append('<br />')
+            continue
+        text = escape(run.text)
+        if run.code:
+            text = f'<code>{text}</code>'
+        if run.italic:
+            text = f'<em>{text}</em>'
+        if run.bold:
+            text = f'<strong>{text}</strong>'
+        if run.link:
+            text = f'<a href="{escape(run.link)}">{text}</a>'
+        parts.append(text)
+    return ''.join(parts)
+
+def render_list(list_block):
+    """リスト（ネストを含む）をHTMLに変換する"""
+    tag = 'ol' if list_block.ordered else 'ul'
+    start = ''
+    if list_block.ordered and list_block.items and list_block.items[0].number not in (None, 1):
+        start = f' start="{list_block.items[0].number}"'
+    items = []
+    for item in list_block.items:
+        children = ''.join(render_list(child) for child in item.children)
+        items.append(f'<li>{render_runs(item.runs)}{children}</li>')
+    return f'<{tag}{start}>\n' + '\n'.join(items) + f'\n</{tag}>'
+
+def render_block(block):
+    """ドキュメントモデルの1ブロックをHTMLに変換する"""
+    if isinstance(block, Heading):
+        return f'<h{block.level} id="{escape(block.anchor)}">{render_runs(block.runs)}</h{block.level}>'
+    if isinstance(block, Paragraph):
+        return f'<p>{render_runs(block.runs)}</p>'
+    if isinstance(block, ListBlock):
+        return render_list(block)
+    if isinstance(block, Table):
+        if not block.rows:
+            return ''
+        header = ''.join(f'<th>{render_runs(cell)}</th>' for cell in block.header)
+        body = '\n'.join(
+            '<tr>' + ''.join(f'<td>{render_runs(cell)}</td>' for cell in row) + '</tr>'
+            for row in block.body
+        )
+        return f'<table>\n<thead>\n<tr>{header}</tr>\n</thead>\n<tbody>\n{body}\n</tbody>\n</table>'
+    if isinstance(block, CodeBlock):
+        language = f' class="language-{escape(block.language)}"' if block.language else ''
+        return f'<pre><code{language}>{escape(block.text)}\n</code></pre>'
+    if isinstance(block, Blockquote):
+        return f'<blockquote>\n<p>{render_runs(block.runs)}</p>\n</blockquote>'
+    if isinstance(block, HorizontalRule):
+        return '<hr />'
+    return ''
+
+def markdown_to_pdf(md_file, pdf_file, backend='browser'):
+    """マークダウンファイルをPDFに変換する
+
+    backend='browser' はHTML経由（html_to_pdf.jsを使用）、'native' はPythonのみで描画する
+    """
+    document = load_document(md_file)
+    if backend == 'native':
+        # HTML・ブラウザでのPDFの変換では使わないため、ネイティブの描画を使う場合だけ読み込む
+        from md_to_pdf_native import render_pdf_native
+        return render_pdf_native(document, pdf_file)
+    return render_pdf(document, pdf_file)
+
+def render_pdf(document, pdf_file, worker=None):
+    """ドキュメントモデルからHTML経由でPDFを作成する
+
+    worker（PdfRenderWorker）を指定した場合は起動済みのブラウザで描画し、中間のHTMLファイルは作らない
+    """
+    if worker is not None:
+        with span('html.render'):
+            html = render_html(document)
+        with span('pdf.browser', file=pdf_file, worker=True):
+            worker.render(html, pdf_file).result()
+        return pdf_file
     
-    print(f"HTMLファイルが作成されました: {html_file}")
-    print("このHTMLファイルをブラウザで開き、印刷機能でPDFに保存できます。")
-    return html_file
+    html_file = write_html(document, os.path.splitext(pdf_file)[0] + '.html')
+    with span('pdf.browser', file=pdf_file, worker=False):
+        result = subprocess.run(['node', HTML_TO_PDF_SCRIPT, html_file, pdf_file],
+                                capture_output=True, text=True, encoding='utf-8')
+    if result.returncode != 0:
+        # Node.jsのスタックトレースからエラーメッセージの行を取り出す
+        messages = [line.strip() for line in result.stderr.splitlines() if 'Error' in line]
+        detail = messages[0] if messages else f"終了コード {result.returncode}"
+        raise RuntimeError(f"PDFへの変換に失敗しました: {detail}")
+    return pdf_file
 
 def convert_files():
     """マークダウンファイルをHTMLに変換する"""
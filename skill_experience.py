@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+プロジェクトの期間から技術ごとの経験月数を計算するモジュール
+技術スキルの表の経験年数は手入力で更新が漏れやすいため、プロジェクト経験の期間
+（「2022年11月〜2024年10月」「2024年12月〜現在」）と使用技術から実績の月数を求める
+
+- 期間は開始月・終了月を含む月数で数え、同じ技術を使ったプロジェクトの重なった期間は1回だけ数える
+- 「現在」まで続いているプロジェクトは基準の月（環境変数 SKILLSHEET_AS_OF、既定: 今月）まで数える。
+  同じ入力でも月が変わると結果が変わるため、一括変換（batch_convert.py --as-of）は基準の月を
+  開始時に固定し、ビルドキャッシュに記録する
+- 期間を読み取れないプロジェクトは数えない
+
+期間の重なりの統合は、要員一覧のように数千人分をまとめて計算する場合は
+(担当者, 技術) ごとのPythonのループではなく、全員分の区間を並べたNumPyの配列で1回だけ行う
+（ExperienceAggregator）。1件のスキルシート（Excelファイルの技術スキルシート）は区間が少ないため、
+NumPyを読み込まずにPythonで計算する（computed_months）
+
+使い方:
+    months = computed_months(document)                   # {索引語: 月数}
+    declared_months(months, "Vue.js (Nuxt.js)")          # 技術スキルの表の技術名から引く
+
+    aggregator = ExperienceAggregator()
+    for document in documents:
+        aggregator.add(document.iter_projects())
+    sheets, terms, months = aggregator.compute()         # 全員分を1回で計算
+"""
+
+import os
+from array import array
+from datetime import date
+
+from skill_index import parse_period, parse_since, project_technologies, term_variants
+
+# 「現在」まで続いているプロジェクトを数える基準の月（2026-10 の形式）
+AS_OF_ENV = 'SKILLSHEET_AS_OF'
+
+def current_month():
+    """基準の月の通し番号（年×12＋月−1、skill_index.month_number と同じ）
+
+    環境変数 SKILLSHEET_AS_OF があればその月、なければ今月。読み取れない場合はValueError
+    """
+    if os.environ.get(AS_OF_ENV):
+        return parse_since(os.environ[AS_OF_ENV])
+    today = date.today()
+    return today.year * 12 + today.month - 1
+
+def month_label(month):
+    """月の通し番号を「2026-10」の形式にする"""
+    return f"{month // 12}-{month % 12 + 1:02d}"
+
+def project_intervals(projects, as_of):
+    """プロジェクト経験のレコードごとの (使用技術の技術名のリスト, 開始月, 終了月の翌月) を順に返す"""
+    for project in projects:
+        period = project.get('period', '')
+        start, end = parse_period(period) if period else (None, None)
+        if start is None or end is None:
+            continue
+        end = min(end, as_of)
+        if end < start:
+            continue
+        yield project_technologies(project.get('technologies', '')), start, end + 1
+
+def union_months(intervals):
+    """区間 [開始月, 終了月の翌月) のリストの和集合の月数（少ない区間用、merged_months と同じ結果）"""
+    total = covered = 0
+    for start, end in sorted(intervals):
+        start = max(start, covered)
+        if end > start:
+            total += end - start
+        covered = max(covered, end)
+    return total
+
+def merged_months(groups, starts, ends, group_count):
+    """グループごとに区間 [開始月, 終了月の翌月) の和集合の月数を求める（NumPyの配列）
+
+    グループ・開始月の順に並べ、同じグループ内でそれまでの区間が覆っている最後の月を累積最大値で求め、
+    各区間はそれより後ろの部分だけを数える。グループごとに累積最大値をやり直す代わりに、
+    グループ番号×(最大の月＋1) を足して前のグループの値が次のグループに届かないようにする
+    """
+    import numpy as np
+
+    if len(groups) == 0:
+        return np.zeros(group_count, dtype=np.int64)
+    order = np.lexsort((starts, groups))
+    groups, starts, ends = groups[order], starts[order], ends[order]
+
+    offset = groups * (int(ends.max()) + 1)
+    reach = np.maximum.accumulate(offset + ends)
+    covered = np.empty_like(reach)
+    covered[0] = 0
+    covered[1:] = reach[:-1] - offset[1:]
+    months = np.clip(ends - np.maximum(starts, covered), 0, None)
+    return np.bincount(groups, weights=months, minlength=group_count).astype(np.int64)
+
+class ExperienceAggregator:
+    """複数のスキルシートのプロジェクトの区間を集め、技術ごとの経験月数をまとめて計算する
+
+    区間は (シート番号, 索引語の番号, 開始月, 終了月の翌月) の整数の配列だけで持つため、
+    読み終えたスキルシートは破棄してよい
+    """
+
+    def __init__(self, as_of=None):
+        self.as_of = current_month() if as_of is None else as_of
+        self.terms = {}
+        self.labels = []
+        self.sheet_count = 0
+        # 技術名 → 索引語の番号のリスト（同じ技術名は多くのプロジェクトに出てくるため正規化を1回にする）
+        self.name_terms = {}
+        self.sheets = array('q')
+        self.term_ids = array('q')
+        self.starts = array('q')
+        self.ends = array('q')
+
+    def add(self, projects):
+        """1件のスキルシートのプロジェクト経験（document.iter_projects() など）の区間を追加し、シート番号を返す"""
+        sheet = self.sheet_count
+        for names, start, end in project_intervals(projects, self.as_of):
+            term_ids = set()
+            for name in names:
+                term_ids.update(self.lookup(name))
+            for term_id in term_ids:
+                self.sheets.append(sheet)
+                self.term_ids.append(term_id)
+                self.starts.append(start)
+                self.ends.append(end)
+        self.sheet_count += 1
+        return sheet
+
+    def lookup(self, name):
+        """技術名の索引語の番号のリスト（初めての索引語には番号を振り、技術名を表示名にする）"""
+        term_ids = self.name_terms.get(name)
+        if term_ids is None:
+            term_ids = []
+            for term in term_variants(name):
+                if term not in self.terms:
+                    self.terms[term] = len(self.labels)
+                    self.labels.append(name)
+                term_ids.append(self.terms[term])
+            self.name_terms[name] = term_ids
+        return term_ids
+
+    def compute(self):
+        """(シート番号, 索引語の番号, 月数) の配列を返す（月数が1以上の組み合わせのみ）"""
+        import numpy as np
+
+        # (シート番号, 索引語の番号) の組を1つの整数にしてグループ番号を振る
+        width = max(len(self.labels), 1)
+        sheets = np.frombuffer(self.sheets, dtype=np.int64)
+        term_ids = np.frombuffer(self.term_ids, dtype=np.int64)
+        keys, groups = np.unique(sheets * width + term_ids, return_inverse=True)
+        months = merged_months(groups, np.frombuffer(self.starts, dtype=np.int64),
+                               np.frombuffer(self.ends, dtype=np.int64), len(keys))
+        found = months > 0
+        keys, months = keys[found], months[found]
+        return keys // width, keys % width, months
+
+    def term_names(self):
+        """索引語の番号順の索引語のリスト"""
+        return list(self.terms)
+
+    def iter_rows(self, names):
+        """技術名ごとに、シート番号順の経験月数の配列を返す（declared_months と同じく別名の索引語も引き、最も長いもの）"""
+        import numpy as np
+
+        sheets, term_ids, months = self.compute()
+        order = np.argsort(term_ids, kind='stable')
+        sheets, months = sheets[order], months[order]
+        bounds = np.searchsorted(term_ids[order], np.arange(len(self.labels) + 1))
+        for name in names:
+            row = np.zeros(self.sheet_count, dtype=np.int64)
+            for term in term_variants(name):
+                term_id = self.terms.get(term)
+                if term_id is not None:
+                    # 索引語ごとのシート番号は重複しないため、まとめて代入できる
+                    found = slice(bounds[term_id], bounds[term_id + 1])
+                    row[sheets[found]] = np.maximum(row[sheets[found]], months[found])
+            yield row
+
+def computed_months(document, as_of=None):
+    """1件のスキルシートの {索引語: 経験月数}（プロジェクト経験は期間と使用技術だけを読む）"""
+    as_of = current_month() if as_of is None else as_of
+    intervals = {}
+    for names, start, end in project_intervals(document.iter_project_periods(), as_of):
+        terms = {term for name in names for term in term_variants(name)}
+        for term in terms:
+            intervals.setdefault(term, []).append((start, end))
+    return {term: union_months(spans) for term, spans in intervals.items()}
+
+def declared_months(months, technology):
+    """技術スキルの表の技術名の経験月数（「Vue.js (Nuxt.js)」は vue.js・nuxt.js なども引き、最も長いもの）
+
+    プロジェクトに使用技術として出てこない場合はNone
+    """
+    found = [months[term] for term in term_variants(technology) if term in months]
+    return max(found) if found else None
+
+def months_text(months):
+    """月数を経験年数の表記（2年3ヶ月・8ヶ月・3年）にする（skill_index.parse_years で読み戻せる）"""
+    if months is None:
+        return ''
+    years, rest = divmod(months, 12)
+    if not years:
+        return f"{rest}ヶ月"
+    return f"{years}年{rest}ヶ月" if rest else f"{years}年"
+
+def months_value(months):
+    """月数を年数の数値（小数第1位まで）にする（Excelで並べ替え・集計する列用）"""
+    years = round(months / 12, 1)
+    return int(years) if years.is_integer() else years
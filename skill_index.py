@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシートの検索用インデックス（SQLite）
+技術スキル（カテゴリ・技術・経験年数）とプロジェクト経験（期間・使用技術）を
+技術名 → シートの転置インデックスとしてローカルのSQLiteファイルに保存し、
+「Python 5年以上かつAWSの経験があり、2023年以降のプロジェクトがある」のような条件で検索する
+
+インデックスの更新はシートごとに行い、サイズ・更新日時・内容のハッシュが変わっていないシートは読み直さない
+マークダウン（.md）・グリッド形式のCSV（.csv）・md_to_xlsx_improved.py で作成したExcel（.xlsx）に対応
+
+使い方:
+    python skill_index.py update skillsheets/ -r --xlsx
+    python skill_index.py query "Python>=5" AWS --since 2023
+"""
+
+import argparse
+import contextlib
+import os
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+from datetime import datetime
+
+from build_cache import file_digest
+from instrumentation import span
+
+DEFAULT_INDEX_FILE = 'skill_index.sqlite3'
+
+# スキーマや抽出方法を変えたら上げる（古いインデックスは作り直す）
+INDEX_FORMAT_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE sheets (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT,
+    title TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    digest TEXT,
+    indexed_at TEXT
+);
+CREATE TABLE skills (
+    sheet_id INTEGER NOT NULL,
+    category TEXT,
+    technology TEXT,
+    years REAL
+);
+CREATE TABLE projects (
+    sheet_id INTEGER NOT NULL,
+    no TEXT,
+    company TEXT,
+    period TEXT,
+    start_month INTEGER,
+    end_month INTEGER,
+    technologies TEXT
+);
+CREATE TABLE terms (
+    term TEXT NOT NULL,
+    sheet_id INTEGER NOT NULL,
+    years REAL,
+    source TEXT NOT NULL
+);
+CREATE INDEX terms_by_term ON terms (term, years);
+CREATE INDEX terms_by_sheet ON terms (sheet_id);
+CREATE INDEX skills_by_sheet ON skills (sheet_id);
+CREATE INDEX projects_by_sheet ON projects (sheet_id);
+CREATE INDEX projects_by_end ON projects (end_month);
+"""
+
+# 「現在」まで続いているプロジェクトの終了月（期間の比較で常に最新として扱う）
+ONGOING_MONTH = 9999 * 12
+
+# 年月（2024年4月・2024/4・2024-04）
+YEAR_MONTH_PATTERN = re.compile(r'(\d{4})\s*(?:年|/|-|\.)\s*(\d{1,2})')
+YEAR_PATTERN = re.compile(r'^(\d{4})\s*年?$')
+
+# 経験年数（4年・1.5年・6ヶ月・1年6ヶ月）
+YEARS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*年')
+MONTHS_PATTERN = re.compile(r'(\d+)\s*[ヶかカケヵ]?月')
+
+# 検索条件（Python>=5・Python≥5年）
+CONDITION_PATTERN = re.compile(r'^(.+?)\s*(?:>=|≥|＞＝)\s*(\d+(?:\.\d+)?)\s*年?$')
+
+def normalize_term(text):
+    """技術名を検索用に正規化（全角・半角と大文字・小文字を揃え、空白を除く）"""
+    return re.sub(r'\s+', '', unicodedata.normalize('NFKC', text).casefold())
+
+def term_variants(name):
+    """技術名の索引語（「Vue.js (Nuxt.js)」は vue.js(nuxt.js)・vue.js・nuxt.js）"""
+    terms = [normalize_term(name)]
+    for part in re.split(r'[()（）/／]', name):
+        term = normalize_term(part)
+        if term and term not in terms:
+            terms.append(term)
+    return [term for term in terms if term]
+
+def parse_years(text):
+    """経験年数の文字列を年数にする（読み取れない場合はNone）"""
+    text = unicodedata.normalize('NFKC', str(text))
+    years = YEARS_PATTERN.search(text)
+    months = MONTHS_PATTERN.search(text[years.end():] if years else text)
+    if years is None and months is None:
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    return (float(years.group(1)) if years else 0.0) + (int(months.group(1)) / 12 if months else 0.0)
+
+def month_number(text):
+    """「2024年4月」を月の通し番号（年×12＋月−1）にする（読み取れない場合はNone）"""
+    match = YEAR_MONTH_PATTERN.search(unicodedata.normalize('NFKC', text))
+    if match is None:
+        return None
+    return int(match.group(1)) * 12 + int(match.group(2)) - 1
+
+def parse_period(period):
+    """「2024年4月〜2024年10月」「2024年12月〜現在」を (開始月, 終了月) にする"""
+    start, _, end = period.partition('〜')
+    end_month = ONGOING_MONTH if '現在' in end else month_number(end)
+    return month_number(start), end_month
+
+def parse_since(text):
+    """--since の値（2023・2023年4月・2023-04）を月の通し番号にする"""
+    match = YEAR_PATTERN.match(text.strip())
+    if match:
+        return int(match.group(1)) * 12
+    month = month_number(text)
+    if month is None:
+        raise ValueError(f"年月を読み取れません: {text}")
+    return month
+
+def project_technologies(technologies):
+    """「言語・FW： Python, Flask | DB： MySQL」を技術名のリストにする"""
+    names = []
+    for part in technologies.split(' | '):
+        _, separator, values = part.partition('：')
+        for name in re.split(r'[,、\n]', values if separator else part):
+            if name.strip():
+                names.append(name.strip())
+    return names
+
+def parse_condition(text):
+    """検索条件を (索引語, 最低経験年数またはNone) にする"""
+    match = CONDITION_PATTERN.match(text.strip())
+    if match:
+        return normalize_term(match.group(1)), float(match.group(2))
+    return normalize_term(text), None
+
+class SkillIndex:
+    """スキルシートの転置インデックス（SQLiteファイル）"""
+
+    def __init__(self, index_file=DEFAULT_INDEX_FILE):
+        self.index_file = index_file
+        self.conn = sqlite3.connect(index_file)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._ensure_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.conn.close()
+
+    def _ensure_schema(self):
+        """スキーマを作成（形式が古い場合は作り直す）"""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == INDEX_FORMAT_VERSION:
+            return
+        with self.conn:
+            for table in ('sheets', 'skills', 'projects', 'terms'):
+                self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {INDEX_FORMAT_VERSION}')
+
+    def update(self, paths):
+        """シートをインデックスに追加・更新し、存在しなくなったシートを削除
+
+        戻り値は件数の辞書（added・updated・unchanged・removed・failed）と失敗したファイルのリスト
+        """
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+        failures = []
+        for path in paths:
+            try:
+                counts[self.update_sheet(path)] += 1
+            except Exception as e:
+                counts['failed'] += 1
+                failures.append((path, f"{type(e).__name__}: {e}"))
+        counts['removed'] = self.prune()
+        return counts, failures
+
+    def update_sheet(self, path):
+        """1シートをインデックスに反映（'added'・'updated'・'unchanged' のいずれかを返す）"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self.conn.execute('SELECT id, size, mtime_ns, digest FROM sheets WHERE path = ?', (path,)).fetchone()
+        if row is not None and row[1] == stat.st_size and row[2] == stat.st_mtime_ns:
+            return 'unchanged'
+
+        digest = file_digest(path)
+        if row is not None and row[3] == digest:
+            # 内容は同じ（保存し直しただけ）なので更新日時だけ記録する
+            with self.conn:
+                self.conn.execute('UPDATE sheets SET size = ?, mtime_ns = ? WHERE id = ?',
+                                  (stat.st_size, stat.st_mtime_ns, row[0]))
+            return 'unchanged'
+
+        with span('index.sheet', file=path):
+            with open_sheet(path) as document:
+                # 変換と同じ抽出結果を使い、1シート分を1トランザクションで入れ替える
+                with self.conn:
+                    if row is not None:
+                        self._delete(row[0])
+                    sheet_id = self.conn.execute(
+                        'INSERT INTO sheets (path, name, title, size, mtime_ns, digest, indexed_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (path, document.basic_info.get('氏名', ''), document.title, stat.st_size,
+                         stat.st_mtime_ns, digest, datetime.now().isoformat(timespec='seconds'))
+                    ).lastrowid
+                    self._insert_records(sheet_id, document)
+        return 'added' if row is None else 'updated'
+
+    def _insert_records(self, sheet_id, document):
+        """技術スキル・プロジェクト経験と索引語を書き込む"""
+        skills = []
+        terms = []
+        for category, items in document.technical_skills.items():
+            for technology, years_text in items.items():
+                years = parse_years(years_text)
+                skills.append((sheet_id, category, technology, years))
+                terms.extend((term, sheet_id, years, 'skill') for term in term_variants(technology))
+
+        projects = []
+        for project in document.iter_projects():
+            start_month, end_month = parse_period(project.get('period', ''))
+            projects.append((sheet_id, project.get('no', ''), project.get('company', ''), project.get('period', ''),
+                             start_month, end_month, project.get('technologies', '')))
+            for technology in project_technologies(project.get('technologies', '')):
+                terms.extend((term, sheet_id, None, 'project') for term in term_variants(technology))
+
+        self.conn.executemany('INSERT INTO skills VALUES (?, ?, ?, ?)', skills)
+        self.conn.executemany('INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?, ?)', projects)
+        self.conn.executemany('INSERT INTO terms VALUES (?, ?, ?, ?)', terms)
+
+    def _delete(self, sheet_id):
+        for table in ('skills', 'projects', 'terms'):
+            self.conn.execute(f'DELETE FROM {table} WHERE sheet_id = ?', (sheet_id,))
+        self.conn.execute('DELETE FROM sheets WHERE id = ?', (sheet_id,))
+
+    def prune(self):
+        """ファイルが存在しなくなったシートをインデックスから削除し、件数を返す"""
+        missing = [sheet_id for sheet_id, path in self.conn.execute('SELECT id, path FROM sheets')
+                   if not os.path.exists(path)]
+        with self.conn:
+            for sheet_id in missing:
+                self._delete(sheet_id)
+        return len(missing)
+
+    def query(self, conditions=(), since=None):
+        """条件をすべて満たすシートを返す
+
+        conditions: 「Python>=5」（技術スキルの経験年数が5年以上）や「AWS」
+                    （技術スキルまたはプロジェクトの使用技術にある）の文字列のリスト
+        since: この月の通し番号（parse_since）以降に終了した、または継続中のプロジェクトがあること
+        戻り値は path・name・title の辞書のリスト
+        """
+        subqueries = []
+        params = []
+        for condition in conditions:
+            term, min_years = parse_condition(condition)
+            if min_years is None:
+                subqueries.append('SELECT sheet_id FROM terms WHERE term = ?')
+                params.append(term)
+            else:
+                subqueries.append('SELECT sheet_id FROM terms WHERE term = ? AND years >= ?')
+                params.extend([term, min_years])
+        if since is not None:
+            subqueries.append('SELECT sheet_id FROM projects WHERE end_month >= ?')
+            params.append(since)
+
+        sql = 'SELECT path, name, title FROM sheets'
+        if subqueries:
+            sql += ' WHERE id IN (' + ' INTERSECT '.join(subqueries) + ')'
+        sql += ' ORDER BY path'
+        return [{'path': path, 'name': name, 'title': title} for path, name, title in self.conn.execute(sql, params)]
+
+    def sheet_skills(self, path, terms):
+        """シートの技術スキルのうち、索引語に一致するもの（検索結果の表示用）"""
+        row = self.conn.execute('SELECT id FROM sheets WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return []
+        matched = []
+        for category, technology, years in self.conn.execute(
+                'SELECT category, technology, years FROM skills WHERE sheet_id = ?', (row[0],)):
+            if set(term_variants(technology)) & set(terms):
+                matched.append((category, technology, years))
+        return matched
+
+@contextlib.contextmanager
+def open_sheet(path):
+    """インデックス作成用にスキルシートを開く（Excelは読み取り専用で開き、終了時に閉じる）"""
+    if not path.lower().endswith('.xlsx'):
+        from skill_sheet_model import load_document
+        yield load_document(path)
+        return
+
+    from openpyxl import load_workbook
+    from skill_sheet_model import RecordSkillSheet
+    from xlsx_to_md import read_workbook_records
+    wb = load_workbook(path, read_only=True)
+    try:
+        yield RecordSkillSheet(read_workbook_records(wb), path)
+    finally:
+        wb.close()
+
+def run_update(args):
+    """インデックスを更新"""
+    from batch_convert import collect_markdown_files
+
+    extensions = ['.md']
+    if args.csv:
+        extensions.append('.csv')
+    if args.xlsx:
+        extensions.append('.xlsx')
+    paths = collect_markdown_files(args.targets, args.recursive, tuple(extensions))
+
+    started = time.perf_counter()
+    with SkillIndex(args.index) as index:
+        counts, failures = index.update(paths)
+    elapsed = time.perf_counter() - started
+
+    for path, error in failures:
+        print(f"✗ {path}: {error}")
+    print(f"✓ インデックスを更新しました: {args.index}（{elapsed:.2f}秒）")
+    print(f"  追加 {counts['added']} / 更新 {counts['updated']} / 変更なし {counts['unchanged']} / "
+          f"削除 {counts['removed']} / 失敗 {counts['failed']}")
+    return 1 if failures else 0
+
+def run_query(args):
+    """インデックスを検索"""
+    if not os.path.exists(args.index):
+        print(f"✗ インデックスが見つかりません: {args.index}（先に update を実行してください）")
+        return 1
+    try:
+        since = parse_since(args.since) if args.since else None
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    started = time.perf_counter()
+    with SkillIndex(args.index) as index:
+        results = index.query(args.conditions, since)
+        elapsed = time.perf_counter() - started
+        terms = [parse_condition(condition)[0] for condition in args.conditions]
+        for result in results:
+            skills = ', '.join(f"{technology} {years:g}年" if years is not None else technology
+                               for _, technology, years in index.sheet_skills(result['path'], terms))
+            print(f"✓ {result['name'] or '-'}  {result['path']}" + (f"  （{skills}）" if skills else ''))
+    print(f"{len(results)}件（{elapsed * 1000:.1f} ms）")
+    return 0
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="スキルシートの検索用インデックスを作成・検索します")
+    parser.add_argument('--index', default=DEFAULT_INDEX_FILE, help=f"インデックスファイル（既定: {DEFAULT_INDEX_FILE}）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    update = subparsers.add_parser('update', help="スキルシートをインデックスに追加・更新")
+    update.add_argument('targets', nargs='+', help="スキルシートのファイル、ディレクトリ、またはglobパターン")
+    update.add_argument('-r', '--recursive', action='store_true', help="ディレクトリを再帰的に探索する")
+    update.add_argument('--csv', action='store_true', help="ディレクトリ内のグリッド形式のCSV（*.csv）も対象にする")
+    update.add_argument('--xlsx', action='store_true', help="ディレクトリ内のExcelファイル（*.xlsx）も対象にする")
+    update.set_defaults(handler=run_update)
+
+    query = subparsers.add_parser('query', help="条件に一致するスキルシートを検索")
+    query.add_argument('conditions', nargs='*',
+                       help="技術名（例: AWS）または経験年数の条件（例: \"Python>=5\"）。すべてを満たすシートを返す")
+    query.add_argument('--since', help="この年月以降に終了した（または継続中の）プロジェクトがある（例: 2023, 2023年4月）")
+    query.set_defaults(handler=run_query)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
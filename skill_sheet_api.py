@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシート変換のライブラリAPI（ファイルを介さない）
+マークダウンの文字列・バイト列・ファイルオブジェクトを受け取り、変換結果を任意のバイナリストリームに
+書き込むか、バイト列で返す。一時ファイルの書き込み・読み戻しはせず、標準出力にも何も表示しない
+
+- 入力: str（マークダウン本文）・bytes（UTF-8、BOM付きのUTF-16）・read()を持つオブジェクト・
+  解析済みのドキュメント（CSVなどは skill_sheet_model.load_document で読み込んで渡す）
+- 出力: write()を持つバイナリストリーム（xlsx・docxはseek()できないストリームにも書き込める）
+
+使い方:
+    from skill_sheet_api import convert, convert_into
+
+    data = convert(markdown_text, 'xlsx')                     # バイト列を返す
+    convert(request_stream, 'docx', output=response_stream)   # ストリームに書き込む
+    convert(markdown_text, 'pdf', backend='browser', worker=pdf_worker)
+
+    # 一括変換ではBytesIOを使い回し、変換ごとのバッファの確保と結果のコピーを避ける
+    buffer = io.BytesIO()
+    for text in texts:
+        with convert_into(buffer, text, 'xlsx') as view:
+            send(view)
+"""
+
+import io
+
+from skill_sheet_model import SkillSheetDocument, decode_markdown, parse_document
+
+# 変換できる形式と、変換結果のメディアタイプ
+MEDIA_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+def load_source(source, name=None):
+    """文字列・バイト列・ファイルオブジェクトからドキュメントを作成（ドキュメントはそのまま返す）
+
+    nameは計測やエラーの表示に使う入力の名前（ファイル名など）
+    """
+    if isinstance(source, SkillSheetDocument):
+        return source
+    if hasattr(source, 'read'):
+        source = source.read()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = decode_markdown(bytes(source))
+    if not isinstance(source, str):
+        raise TypeError(f"マークダウンの文字列・バイト列・ファイルオブジェクトを指定してください: {type(source).__name__}")
+    return parse_document(source, name)
+
+def write_xlsx(document, output, sheets=None, streaming=False, workers=None):
+    """Excelファイルをストリームに書き込む"""
+    from md_to_xlsx_improved import render_workbook
+    render_workbook(document, output, sheets, streaming, workers)
+
+def write_docx(document, output, explicit_fonts=False, template_file=None, font_file=None):
+    """Word文書をストリームに書き込む（基本文書はファイル変換と同じくプロセス内で使い回す）
+
+    font_fileを省略した場合は font_subset.find_font で見つかるフォントを埋め込む（Word・HTML・PDFで共通）
+    """
+    from md_to_docx import render_docx
+    render_docx(document, output, explicit_fonts, template_file, font_file)
+
+def write_html(document, output, font_file=None):
+    """HTML（UTF-8）をストリームに書き込む"""
+    from simple_md_to_pdf import render_html
+    output.write(render_html(document, font_file=font_file).encode('utf-8'))
+
+def write_pdf(document, output, backend='native', worker=None, font_file=None):
+    """PDFをストリームに書き込む
+
+    backend='browser' の場合はworker（PdfRenderWorker）で描画する。workerを省略した場合は
+    変換ごとにブラウザを起動するため、繰り返し変換する場合は起動済みのworkerを渡す
+    """
+    if backend == 'native':
+        from md_to_pdf_native import render_pdf_bytes
+        output.write(render_pdf_bytes(document, font_file))
+        return
+
+    from pdf_render_worker import PdfRenderWorker
+    from simple_md_to_pdf import render_html
+    html = render_html(document, font_file=font_file)
+    if worker is not None:
+        output.write(worker.render(html).result())
+        return
+    with PdfRenderWorker(pages=1) as worker:
+        output.write(worker.render(html).result())
+
+# 形式ごとのストリームへの書き込み関数
+WRITERS = {
+    'xlsx': write_xlsx,
+    'docx': write_docx,
+    'html': write_html,
+    'pdf': write_pdf,
+}
+
+def write(source, fmt, output, **options):
+    """変換結果をoutputに書き込む（optionsは形式ごとの書き込み関数の引数）"""
+    if fmt not in WRITERS:
+        raise ValueError(f"不明な形式です: {fmt}")
+    WRITERS[fmt](load_source(source), output, **options)
+    return output
+
+def convert(source, fmt, output=None, **options):
+    """スキルシートを変換する
+
+    outputを省略した場合は変換結果のバイト列を返し、指定した場合はoutputに書き込んでoutputを返す
+    """
+    if output is not None:
+        return write(source, fmt, output, **options)
+    buffer = io.BytesIO()
+    write(source, fmt, buffer, **options)
+    return buffer.getvalue()
+
+class BufferView:
+    """convert_into() の結果（BytesIOの内容をコピーせずに参照するmemoryview）
+
+    参照している間はBytesIOの大きさを変えられないため、withを抜けるかrelease()してから次の変換に使う
+    """
+
+    def __init__(self, buffer):
+        self.view = buffer.getbuffer()
+
+    def __enter__(self):
+        return self.view
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def release(self):
+        self.view.release()
+
+def convert_into(buffer, source, fmt, **options):
+    """BytesIOを先頭から上書きして変換結果を書き込み、内容を参照するBufferViewを返す
+
+    前回の変換で確保した領域をそのまま使い、末尾に残った前回の内容だけを切り詰める
+    """
+    buffer.seek(0)
+    write(source, fmt, buffer, **options)
+    buffer.truncate()
+    return BufferView(buffer)
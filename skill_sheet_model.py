@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシートの共通ドキュメントモデル
+マークダウンを1回だけ解析して見出し・リスト・テーブル・太字などのブロックと
+プロジェクト経験などのレコードに変換し、docx・xlsx・htmlの各変換で共有する
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from instrumentation import span
+
+# 見出し行
+HEADING_LINE_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+
+# リスト項目（「- 」「* 」「1. 」）
+LIST_ITEM_PATTERN = re.compile(r'^(\s*)([-*+]|\d+\.)\s+(.*)$')
+
+# 区切り線
+HORIZONTAL_RULE_PATTERN = re.compile(r'^(?:-{3,}|\*{3,}|_{3,})$')
+
+# 更新日の行（**更新日：2025年7月5日**）
+UPDATED_PATTERN = re.compile(r'^\*\*更新日[：:]\s*(.+?)\*\*\s*$', re.MULTILINE)
+
+# テーブルの区切り行（|---|:---:|）
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$')
+
+# インライン記法（リンク・コード・太字・斜体）
+INLINE_PATTERN = re.compile(
+    r'\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)\s]+)\)'
+    r'|`(?P<code>[^`]+)`'
+    r'|\*\*(?P<bold>.+?)\*\*'
+    r'|(?<![\*\w])\*(?P<italic>[^\s*](?:.*?[^\s*])?)\*(?![\*\w])'
+)
+
+@dataclass
+class TextRun:
+    """書式付きテキストの断片"""
+    text: str
+    bold: bool = False
+    italic: bool = False
+    code: bool = False
+    link: str = None
+
+@dataclass
+class LineBreak:
+    """段落内の改行（行末の2つの空白）"""
+
+@dataclass
+class Heading:
+    """見出し"""
+    level: int
+    runs: list
+    anchor: str = ''
+
+    @property
+    def text(self):
+        return runs_to_text(self.runs)
+
+@dataclass
+class Paragraph:
+    """段落"""
+    runs: list
+
+@dataclass
+class ListItem:
+    """リスト項目（ネストしたリストはchildrenに持つ）"""
+    runs: list
+    number: int = None
+    children: list = field(default_factory=list)
+
+@dataclass
+class ListBlock:
+    """箇条書き・番号付きリスト"""
+    ordered: bool
+    items: list = field(default_factory=list)
+
+@dataclass
+class Table:
+    """テーブル（rows[0]がヘッダー行、各セルはTextRunのリスト）"""
+    rows: list
+
+    @property
+    def header(self):
+        return self.rows[0] if self.rows else []
+
+    @property
+    def body(self):
+        return self.rows[1:]
+
+@dataclass
+class CodeBlock:
+    """コードブロック"""
+    text: str
+    language: str = ''
+
+@dataclass
+class Blockquote:
+    """引用"""
+    runs: list
+
+@dataclass
+class HorizontalRule:
+    """区切り線"""
+
+def runs_to_text(runs):
+    """書式を除いたプレーンテキストを返す"""
+    return ''.join('\n' if isinstance(run, LineBreak) else run.text for run in runs)
+
+def parse_inline(text):
+    """インライン記法を解析してTextRun・LineBreakのリストを返す"""
+    runs = []
+    lines = text.split('\n')
+    for line_no, line in enumerate(lines):
+        # 行末の2つの空白は改行、それ以外の改行は空白として扱う
+        hard_break = line.endswith('  ')
+        line = line.strip()
+        pos = 0
+        for match in INLINE_PATTERN.finditer(line):
+            if match.start() > pos:
+                runs.append(TextRun(line[pos:match.start()]))
+            if match.group('link_text') is not None:
+                runs.append(TextRun(match.group('link_text'), link=match.group('link_url')))
+            elif match.group('code') is not None:
+                runs.append(TextRun(match.group('code'), code=True))
+            elif match.group('bold') is not None:
+                runs.append(TextRun(match.group('bold'), bold=True))
+            else:
+                runs.append(TextRun(match.group('italic'), italic=True))
+            pos = match.end()
+        if pos < len(line):
+            runs.append(TextRun(line[pos:]))
+
+        if line_no < len(lines) - 1:
+            runs.append(LineBreak() if hard_break else TextRun(' '))
+    return runs
+
+def make_anchor(text, used):
+    """見出しのアンカーIDを作成（GitHubと同じく記号を除き空白を「-」にする）"""
+    anchor = re.sub(r'[^\w\- ]', '', text).strip().lower().replace(' ', '-')
+    candidate = anchor
+    suffix = 1
+    while candidate in used:
+        candidate = f"{anchor}-{suffix}"
+        suffix += 1
+    used.add(candidate)
+    return candidate
+
+def split_table_row(line):
+    """テーブル行をセルに分割"""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|'):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split('|')]
+
+def parse_blocks(content):
+    """マークダウンをブロックのリストに変換"""
+    blocks = []
+    lines = content.split('\n')
+    used_anchors = set()
+    paragraph_lines = []
+    list_stack = []  # (インデント, ListBlock)
+    i = 0
+
+    def flush_paragraph():
+        if paragraph_lines:
+            blocks.append(Paragraph(parse_inline('\n'.join(paragraph_lines))))
+            paragraph_lines.clear()
+
+    def close_lists():
+        list_stack.clear()
+
+    while i < len(lines):
+        raw = lines[i]
+        line = raw.strip()
+
+        # 空行
+        if not line:
+            flush_paragraph()
+            # 空行の後にインデントされた項目が続く場合はリストを継続
+            next_line = next((l for l in lines[i + 1:] if l.strip()), '')
+            if not LIST_ITEM_PATTERN.match(next_line):
+                close_lists()
+            i += 1
+            continue
+
+        # コードブロック
+        if line.startswith('```'):
+            flush_paragraph()
+            close_lists()
+            language = line[3:].strip()
+            code_lines = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith('```'):
+                code_lines.append(lines[i])
+                i += 1
+            blocks.append(CodeBlock('\n'.join(code_lines), language))
+            i += 1
+            continue
+
+        # 見出し
+        heading_match = HEADING_LINE_PATTERN.match(line)
+        if heading_match:
+            flush_paragraph()
+            close_lists()
+            runs = parse_inline(heading_match.group(2))
+            level = len(heading_match.group(1))
+            blocks.append(Heading(level, runs, make_anchor(runs_to_text(runs), used_anchors)))
+            i += 1
+            continue
+
+        # 区切り線
+        if HORIZONTAL_RULE_PATTERN.match(line):
+            flush_paragraph()
+            close_lists()
+            blocks.append(HorizontalRule())
+            i += 1
+            continue
+
+        # テーブル
+        if line.startswith('|'):
+            flush_paragraph()
+            close_lists()
+            rows = []
+            while i < len(lines) and lines[i].strip().startswith('|'):
+                row_line = lines[i].strip()
+                if not TABLE_SEPARATOR_PATTERN.match(row_line):
+                    rows.append([parse_inline(cell) for cell in split_table_row(row_line)])
+                i += 1
+            blocks.append(Table(rows))
+            continue
+
+        # 引用
+        if line.startswith('>'):
+            flush_paragraph()
+            close_lists()
+            quote_lines = []
+            while i < len(lines) and lines[i].strip().startswith('>'):
+                quote_lines.append(lines[i].strip()[1:].strip())
+                i += 1
+            blocks.append(Blockquote(parse_inline('\n'.join(quote_lines))))
+            continue
+
+        # リスト項目
+        item_match = LIST_ITEM_PATTERN.match(raw)
+        if item_match:
+            flush_paragraph()
+            indent = len(item_match.group(1).expandtabs(4))
+            marker = item_match.group(2)
+            ordered = marker[0].isdigit()
+
+            # インデントが浅くなったら親のリストに戻る
+            while list_stack and list_stack[-1][0] > indent:
+                list_stack.pop()
+
+            item = ListItem(parse_inline(item_match.group(3)), int(marker[:-1]) if ordered else None)
+            if list_stack and list_stack[-1][0] == indent and list_stack[-1][1].ordered == ordered:
+                list_stack[-1][1].items.append(item)
+            else:
+                if list_stack and list_stack[-1][0] == indent:
+                    list_stack.pop()
+                new_list = ListBlock(ordered, [item])
+                if list_stack and list_stack[-1][1].items:
+                    list_stack[-1][1].items[-1].children.append(new_list)
+                else:
+                    blocks.append(new_list)
+                list_stack.append((indent, new_list))
+            i += 1
+            continue
+
+        # リスト項目の継続行
+        if list_stack and raw.startswith(' ') and not paragraph_lines:
+            last_item = list_stack[-1][1].items[-1]
+            last_item.runs.extend([TextRun(' ')] + parse_inline(line))
+            i += 1
+            continue
+
+        # 通常の段落
+        close_lists()
+        paragraph_lines.append(raw)
+        i += 1
+
+    flush_paragraph()
+    return blocks
+
+class SkillSheetDocument:
+    """1つのスキルシートの解析結果
+
+    ブロック列・見出し索引・抽出レコードは初回アクセス時に1回だけ作成し、
+    以降は各変換で使い回す
+    """
+
+    def __init__(self, content, source=None):
+        self.content = content
+        self.source = source
+        self._cache = {}
+
+    def _cached(self, key, factory):
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    @property
+    def blocks(self):
+        """docx・htmlの描画用ブロック列"""
+        return self._cached('blocks', lambda: self._timed('parse.blocks', parse_blocks))
+
+    @property
+    def title(self):
+        """最初の「# 」見出し"""
+        if 'blocks' in self._cache:
+            for block in self.blocks:
+                if isinstance(block, Heading) and block.level == 1:
+                    return block.text
+            return ''
+        # ブロック列が不要な変換（xlsxなど）では、見出し行だけを探す
+        in_code_block = False
+        for line in self.content.split('\n'):
+            if line.lstrip().startswith('```'):
+                in_code_block = not in_code_block
+                continue
+            match = HEADING_LINE_PATTERN.match(line)
+            if match and not in_code_block and len(match.group(1)) == 1:
+                return runs_to_text(parse_inline(match.group(2)))
+        return ''
+
+    @property
+    def updated(self):
+        """「**更新日：…**」の日付（ない場合は空文字）"""
+        match = UPDATED_PATTERN.search(self.content)
+        return match.group(1).strip() if match else ''
+
+    @property
+    def index(self):
+        """「## 〜 ####」の見出し索引"""
+        from md_to_xlsx_improved import build_section_index
+        return self._cached('index', lambda: self._timed('parse.index', build_section_index))
+
+    def _timed(self, stage, parser):
+        with span(stage, source=self.source):
+            return parser(self.content)
+
+    def _extract(self, name):
+        import md_to_xlsx_improved
+        extractor = getattr(md_to_xlsx_improved, f'extract_{name}')
+        index = self.index
+
+        def extract():
+            with span('extract', section=name):
+                return extractor(self.content, index)
+        return self._cached(name, extract)
+
+    @property
+    def basic_info(self):
+        return self._extract('basic_info')
+
+    @property
+    def specialty_areas(self):
+        return self._extract('specialty_areas')
+
+    @property
+    def technical_skills(self):
+        return self._extract('technical_skills')
+
+    @property
+    def self_pr(self):
+        return self._extract('self_pr')
+
+    @property
+    def projects(self):
+        """プロジェクト経験のレコード"""
+        return self._extract('project_experience')
+
+    def iter_projects(self):
+        """プロジェクト経験を1件ずつ返す（抽出済みの場合はそのレコードを使う）"""
+        if 'project_experience' in self._cache:
+            return iter(self._cache['project_experience'])
+        from md_to_xlsx_improved import iter_project_experience
+        return iter_project_experience(self.content, self.index)
+
+    def iter_project_periods(self):
+        """プロジェクト経験の期間・使用技術だけを1件ずつ返す（抽出済みの場合はそのレコードを使う）"""
+        if 'project_experience' in self._cache:
+            return iter(self._cache['project_experience'])
+        from md_to_xlsx_improved import iter_project_periods
+        return iter_project_periods(self.content, self.index)
+
+    @property
+    def responsibility_matrix(self):
+        return self._extract('responsibility_matrix')
+
+    @property
+    def responsibility_rows(self):
+        """担当領域マトリックスの (ヘッダー, 行のリスト)（ない場合はNone）"""
+        return self._extract('responsibility_rows')
+
+    @property
+    def strengths(self):
+        return self._extract('strengths')
+
+class RecordSkillSheet(SkillSheetDocument):
+    """抽出済みのレコードから作成したスキルシート（CSVなどマークダウン以外の入力用）
+
+    recordsはマークダウンの抽出関数と同じ形式の値を持つ辞書
+    （title・updated・basic_info・specialty_areas・technical_skills・self_pr・
+    project_experience・responsibility_rows・strengths）
+    xlsxはレコードをそのまま書き込み、docx・htmlのブロック列は
+    レコードから作成したマークダウンを解析して得る
+    """
+
+    def __init__(self, records, source=None):
+        self.records = records
+        self.source = source
+        self._cache = {}
+
+    @property
+    def content(self):
+        from skill_sheet_writer import render_markdown
+        return self._cached('content', lambda: render_markdown(self))
+
+    @property
+    def title(self):
+        return self.records.get('title', '')
+
+    @property
+    def updated(self):
+        return self.records.get('updated', '')
+
+    def _extract(self, name):
+        if name == 'responsibility_matrix':
+            return self._cached(name, self._responsibility_frame)
+        return self.records.get(name, RECORD_DEFAULTS.get(name))
+
+    def _responsibility_frame(self):
+        matrix = self.responsibility_rows
+        if matrix is None:
+            return None
+        import pandas as pd
+        headers, rows = matrix
+        return pd.DataFrame(rows, columns=headers)
+
+    def iter_projects(self):
+        return iter(self.projects)
+
+    def iter_project_periods(self):
+        return iter(self.projects)
+
+# レコードがない場合の値（マークダウンの抽出関数で該当セクションがない場合と同じ）
+RECORD_DEFAULTS = {
+    'basic_info': {},
+    'specialty_areas': {},
+    'technical_skills': {},
+    'self_pr': [],
+    'project_experience': [],
+    'responsibility_rows': None,
+    'strengths': [],
+}
+
+def read_markdown(md_file):
+    """マークダウンファイルを読み込む（UTF-16で保存されたファイルにも対応）"""
+    with span('read', file=md_file):
+        with open(md_file, 'rb') as f:
+            return decode_markdown(f.read())
+
+def decode_markdown(data):
+    """マークダウンのバイト列を文字列にする（BOMでUTF-16を判定し、それ以外はUTF-8）"""
+    if data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return data.decode('utf-16')
+    return data.decode('utf-8-sig')
+
+def parse_document(content, source=None):
+    """マークダウン文字列からドキュメントを作成"""
+    return SkillSheetDocument(content, source)
+
+def load_document(md_file):
+    """マークダウンファイルからドキュメントを作成（.csvはグリッド形式のスキルシートCSVとして読み込む）"""
+    if md_file.lower().endswith('.csv'):
+        from read_hm_csv import load_hm_csv
+        return load_hm_csv(md_file)
+    return parse_document(read_markdown(md_file), md_file)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシートのレコードからマークダウンを作成するモジュール
+HM_スキルシート.md と同じ構成（md_to_xlsx_improved.py の抽出関数が前提とする見出し・表・リスト）で書き出すため、
+作成したマークダウンから抽出したレコードは元のレコードと一致する
+CSV（read_hm_csv.py）・Excel（xlsx_to_md.py）など、マークダウン以外から読み込んだスキルシートを
+docx・html・pdfやマークダウンに変換するときに使う
+"""
+
+import io
+
+# 技術スキルの表の1列目の見出し（カテゴリごと）
+TECHNICAL_SKILL_LABELS = {
+    "開発言語": "言語",
+    "フレームワーク": "フレームワーク",
+    "データベース": "DB",
+    "サーバー・OS": "技術",
+}
+
+# プロジェクト経験の小見出しとレコードのキー（リストの項目は「 | 」区切り）
+PROJECT_LIST_SECTIONS = [
+    ("主な業務内容", 'duties'),
+    ("習得スキル", 'skills'),
+    ("成果・実績", 'achievements'),
+]
+
+def table_cell(value):
+    """表のセルに書ける文字列にする（区切りの「|」は全角にし、空の場合は「-」）"""
+    text = str(value).replace('|', '｜').replace('\n', ' ').strip()
+    return text or '-'
+
+def split_items(value):
+    """「 | 」区切りの文字列をリスト項目に分ける"""
+    return [item for item in value.split(' | ') if item] if value else []
+
+def render_markdown(document):
+    """ドキュメントのレコードからマークダウン文字列を作成"""
+    output = io.StringIO()
+    write_markdown(document, output)
+    return output.getvalue()
+
+def write_markdown(document, f):
+    """ドキュメントのレコードからマークダウンを1行ずつファイルに書き出す
+
+    プロジェクト経験・担当領域の行は1件ずつ取り出して書き込むため、
+    レコードがイテレーターの場合も全件をメモリに持たない
+    """
+    def add(line):
+        f.write(line + '\n')
+
+    add(f"# {document.title}")
+    add("")
+    if document.updated:
+        add(f"**更新日：{document.updated}**")
+        add("")
+    add("---")
+    add("")
+
+    write_basic_info(add, document.basic_info)
+    write_specialty_areas(add, document.specialty_areas)
+    write_self_pr(add, document.self_pr)
+    write_technical_skills(add, document.technical_skills)
+    write_projects(add, document.iter_projects())
+    write_responsibility_rows(add, document.responsibility_rows)
+    write_strengths(add, document.strengths)
+
+def write_section_end(add):
+    """セクションの終わりの区切り線"""
+    add("---")
+    add("")
+
+def write_basic_info(add, basic_info):
+    """基本情報の表"""
+    add("## 基本情報")
+    add("")
+    add("| 項目 | 内容 |")
+    add("|------|------|")
+    for key, value in basic_info.items():
+        add(f"| **{table_cell(key)}** | {table_cell(value)} |")
+    add("")
+    write_section_end(add)
+
+def write_specialty_areas(add, specialty_areas):
+    """得意分野（太字のリスト）と得意言語・得意業務"""
+    add("## 得意分野")
+    add("")
+    for area in specialty_areas.get('得意分野', []):
+        add(f"- **{area}**")
+    add("")
+    for title in ("得意言語", "得意業務"):
+        if title in specialty_areas:
+            add(f"### {title}")
+            for item in specialty_areas[title]:
+                add(f"- {item}")
+            add("")
+    write_section_end(add)
+
+def write_self_pr(add, self_pr):
+    """自己PR・備考のリスト"""
+    add("## 自己PR・備考")
+    add("")
+    for item in self_pr:
+        add(f"- {item}")
+    add("")
+    write_section_end(add)
+
+def write_technical_skills(add, technical_skills):
+    """技術スキルのカテゴリごとの表"""
+    add("## 技術スキル")
+    add("")
+    for category, items in technical_skills.items():
+        if not items:
+            continue
+        add(f"### {category}")
+        add(f"| {TECHNICAL_SKILL_LABELS.get(category, '技術')} | 経験年数 |")
+        add("|------|----------|")
+        for name, years in items.items():
+            add(f"| {table_cell(name)} | {table_cell(years)} |")
+        add("")
+    write_section_end(add)
+
+def write_projects(add, projects):
+    """プロジェクト経験（「### N. 会社名（期間）」ごと）"""
+    add("## 職歴・プロジェクト経験（時系列順）")
+    add("")
+    for n, project in enumerate(projects, 1):
+        no = project.get('no', '')
+        no = no if str(no).isdigit() else n
+        add(f"### {no}. {project.get('company', '')}（{project.get('period') or '-'}）")
+        add(f"**業種：** {project.get('industry', '')} | **雇用形態：** {project.get('employment', '')}  ")
+        if project.get('team_size'):
+            add(f"**チーム規模：** {project['team_size']}")
+        add("")
+
+        technologies = split_items(project.get('technologies', ''))
+        if technologies:
+            add("#### 使用技術")
+            for technology in technologies:
+                label, _, value = technology.partition('：')
+                add(f"- **{label}：**{value}")
+            add("")
+
+        if project.get('overview'):
+            add("#### プロジェクト概要")
+            add(project['overview'])
+            add("")
+
+        for title, key in PROJECT_LIST_SECTIONS:
+            items = split_items(project.get(key, ''))
+            if items:
+                add(f"#### {title}")
+                for item in items:
+                    add(f"- {item}")
+                add("")
+        write_section_end(add)
+
+def write_responsibility_rows(add, matrix):
+    """担当領域の表"""
+    if matrix is None:
+        return
+    headers, rows = matrix
+    add("## 担当領域")
+    add("")
+    add("| " + " | ".join(table_cell(header) for header in headers) + " |")
+    add("|" + "|".join("-" * 12 for _ in headers) + "|")
+    for row in rows:
+        add("| " + " | ".join(table_cell(value) for value in row) + " |")
+    add("")
+    write_section_end(add)
+
+def write_strengths(add, strengths):
+    """強み・特徴の番号付きリスト（「見出し: 説明」を太字の見出しに戻す）"""
+    if not strengths:
+        return
+    add("## 強み・特徴")
+    add("")
+    for i, strength in enumerate(strengths, 1):
+        title, _, text = strength.partition(': ')
+        add(f"{i}. **{title}**: {text}")
+    add("")
+    write_section_end(add)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシート変換の統合コマンド
+形式ごとのサブコマンド（xlsx・docx・html・pdf・md・validate・batch・pipeline・roster・export・index・watch・serve）から各変換スクリプトを呼び出す
+pandas・openpyxl・python-docxなどの重い依存は、選んだ形式で必要な場合だけ読み込む
+
+使い方:
+    python skillsheet.py xlsx HM_スキルシート.md
+    python skillsheet.py pdf HM_スキルシート.md --backend native
+    python skillsheet.py xlsx HM_スキルシート.md --parallel 4
+    python skillsheet.py md HM.xlsx
+    python skillsheet.py validate skillsheets/ --strict
+    python skillsheet.py batch skillsheets/ -f xlsx docx
+    python skillsheet.py pipeline HM_スキルシート.md -f xlsx docx html pdf
+    python skillsheet.py roster skillsheets/ -o 要員一覧.xlsx
+    python skillsheet.py export skillsheets/ -o export/ -f jsonl parquet
+    python skillsheet.py index query "Python>=5" AWS --since 2023
+    python skillsheet.py watch HM_スキルシート.md -f xlsx docx html pdf
+    python skillsheet.py serve --port 8765 -j 4
+    python skillsheet.py --import-profile docx HM_スキルシート.md
+    python skillsheet.py --trace trace.json --trace-memory xlsx HM_スキルシート.md
+    python skillsheet.py --font fonts/ipaexg.ttf pdf HM_スキルシート.md --backend native
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+# python -X importtime の出力行（self [us] | cumulative [us] | モジュール名）
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|\s*(.+)$')
+
+# サブコマンド
+COMMANDS = ['xlsx', 'docx', 'html', 'pdf', 'md', 'validate', 'batch', 'pipeline', 'roster', 'export', 'index', 'watch', 'serve']
+
+# 以降の引数をそのままスクリプトのmain()に渡すサブコマンド
+PASSTHROUGH_COMMANDS = {
+    'validate': 'validate_sheet',
+    'batch': 'batch_convert',
+    'pipeline': 'async_pipeline',
+    'roster': 'roster_workbook',
+    'export': 'export_records',
+    'index': 'skill_index',
+    'watch': 'watch_convert',
+    'serve': 'convert_server',
+}
+
+# インポート時間の一覧に表示するパッケージ数
+IMPORT_PROFILE_TOP = 15
+
+def convert_file(fmt, args):
+    """1ファイルを指定形式に変換する"""
+    # 変換モジュールは形式が決まってから読み込む
+    from batch_convert import CONVERTERS, load_renderer, output_path
+    from skill_sheet_model import load_document
+
+    if not os.path.exists(args.input):
+        print(f"✗ ファイルが見つかりません: {args.input}")
+        return 1
+
+    output = args.output or output_path(args.input, CONVERTERS[fmt][0])
+    try:
+        document = load_document(args.input)
+        renderer = load_renderer(fmt, getattr(args, 'backend', 'browser'))
+        if fmt == 'xlsx':
+            renderer(document, output, args.sheets, args.streaming, args.parallel)
+        elif fmt == 'docx':
+            renderer(document, output, args.explicit_fonts, args.template)
+        else:
+            renderer(document, output)
+    except Exception as e:
+        print(f"✗ エラー: {args.input} の変換に失敗しました - {e}")
+        return 1
+
+    print(f"✓ {args.input} → {output}")
+    return 0
+
+def convert_to_markdown(args):
+    """Excel（md_to_xlsx_improved.py で作成したもの）・CSVのスキルシートをマークダウンに戻す"""
+    if not os.path.exists(args.input):
+        print(f"✗ ファイルが見つかりません: {args.input}")
+        return 1
+
+    output = args.output or os.path.splitext(args.input)[0] + '.md'
+    try:
+        if args.input.lower().endswith('.xlsx'):
+            from xlsx_to_md import excel_to_markdown
+            excel_to_markdown(args.input, output)
+        else:
+            from skill_sheet_model import load_document
+            from skill_sheet_writer import write_markdown
+            document = load_document(args.input)
+            with open(output, 'w', encoding='utf-8') as f:
+                write_markdown(document, f)
+    except Exception as e:
+        print(f"✗ エラー: {args.input} の変換に失敗しました - {e}")
+        return 1
+
+    print(f"✓ {args.input} → {output}")
+    return 0
+
+def run_passthrough(args):
+    """一括変換・インデックス・監視モード（各スクリプトと同じ引数）"""
+    import importlib
+    return importlib.import_module(PASSTHROUGH_COMMANDS[args.command]).main(args.passthrough_args)
+
+def build_parser():
+    """コマンドライン引数の定義"""
+    parser = argparse.ArgumentParser(description="スキルシート（マークダウン）をExcel・Word・HTML・PDFに変換します")
+    parser.add_argument('--import-profile', action='store_true',
+                        help="パッケージごとのインポート時間を計測して表示する")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="段階ごとの処理時間をChromeのトレース形式で保存する（chrome://tracing・Perfettoで表示）")
+    parser.add_argument('--trace-jsonl', metavar='FILE', help="段階ごとの処理時間をJSON Linesで追記する")
+    parser.add_argument('--trace-memory', action='store_true', help="段階ごとのピークメモリも記録する")
+    parser.add_argument('--font', metavar='FILE',
+                        help="Word・HTML・PDFにサブセットを埋め込む日本語フォント（TrueType、fontToolsが必要。"
+                             "既定: 環境変数 SKILLSHEET_CJK_FONT、fonts/ ディレクトリ）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for fmt, description in [
+        ('xlsx', "Excelファイルを作成"),
+        ('docx', "Word文書を作成"),
+        ('html', "HTMLファイルを作成"),
+        ('pdf', "PDFファイルを作成"),
+    ]:
+        subparser = subparsers.add_parser(fmt, help=description, description=description)
+        subparser.add_argument('input', help="マークダウンファイル")
+        subparser.add_argument('-o', '--output', help=f"出力ファイル（既定: 入力ファイルと同じ場所の .{fmt}）")
+        subparser.set_defaults(handler=lambda args, fmt=fmt: convert_file(fmt, args))
+        if fmt == 'xlsx':
+            subparser.add_argument('--sheets', nargs='+', help="作成するシート名（既定: すべて）")
+            subparser.add_argument('--streaming', action='store_true',
+                                   help="write_onlyモードで作成する（大きなファイル向け）")
+            subparser.add_argument('--parallel', type=int, metavar='N',
+                                   help="シートをN個のワーカープロセスで並列に作成する（非常に大きなファイル向け、write_onlyと同じ出力）")
+        if fmt == 'docx':
+            subparser.add_argument('--template', metavar='FILE',
+                                   help="スタイル・ページ設定に使うテンプレート（.docx・.dotx、既定: A4・Yu Gothic）")
+            subparser.add_argument('--explicit-fonts', action='store_true',
+                                   help="フォント名・サイズをスタイルから継承せず、ランごとに設定する（以前の出力）")
+        if fmt == 'pdf':
+            subparser.add_argument('--backend', choices=['browser', 'native'], default='browser',
+                                   help="描画方式（browser: Node.jsとpuppeteer, native: Pythonのみ）")
+
+    markdown = subparsers.add_parser('md', help="Excel・CSVからマークダウンを作成",
+                                     description="Excel・CSVのスキルシートからマークダウンを作成")
+    markdown.add_argument('input', help="Excelファイル（.xlsx）またはグリッド形式のCSV（.csv）")
+    markdown.add_argument('-o', '--output', help="出力ファイル（既定: 入力ファイルと同じ場所の .md）")
+    markdown.set_defaults(handler=convert_to_markdown)
+
+    # validate・batch・pipeline・roster・export・index・watch・serveの引数はmain()でそのまま各スクリプトに渡す
+    for command, description in [
+        ('validate', "変換の前にスキルシートの構造を検査（validate_sheet.py と同じ引数）"),
+        ('batch', "複数ファイルを一括変換（batch_convert.py と同じ引数）"),
+        ('pipeline', "各形式をasyncioで同時に変換（async_pipeline.py と同じ引数）"),
+        ('roster', "複数のスキルシートを要員一覧にまとめる（roster_workbook.py と同じ引数）"),
+        ('export', "レコードをJSON Lines・Parquetで書き出す（export_records.py と同じ引数）"),
+        ('index', "検索用インデックスの更新・検索（skill_index.py と同じ引数）"),
+        ('watch', "保存を監視して変更された出力を再作成（watch_convert.py と同じ引数）"),
+        ('serve', "変換のHTTPサービスを起動（convert_server.py と同じ引数）"),
+    ]:
+        passthrough = subparsers.add_parser(command, add_help=False, help=description)
+        passthrough.set_defaults(handler=run_passthrough, passthrough_args=[])
+    return parser
+
+def run_with_import_profile(argv):
+    """インポート時間の計測を有効にして自身を再実行し、パッケージごとの合計を表示"""
+    env = dict(os.environ, PYTHONPROFILEIMPORTTIME='1')
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), *argv],
+                             env=env, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace')
+    elapsed = time.perf_counter() - started
+
+    totals = {}
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match is None:
+            if not line.startswith('import time:'):
+                print(line, file=sys.stderr)
+            continue
+        # サブモジュールの時間はトップレベルのパッケージに合算する
+        package = match.group(3).strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(match.group(1))
+
+    print_import_profile(totals, elapsed)
+    return process.returncode
+
+def print_import_profile(totals, elapsed):
+    """パッケージごとのインポート時間を表示"""
+    total_ms = sum(totals.values()) / 1000
+    print("\n" + "=" * 50)
+    print("インポート時間（パッケージ別）")
+    print("=" * 50)
+    for package, microseconds in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:IMPORT_PROFILE_TOP]:
+        print(f"  {package:<24} {microseconds / 1000:8.1f} ms")
+    if len(totals) > IMPORT_PROFILE_TOP:
+        print(f"  （ほか {len(totals) - IMPORT_PROFILE_TOP} パッケージ）")
+    print(f"インポート合計: {total_ms:.1f} ms / 実行時間: {elapsed * 1000:.1f} ms")
+
+def main(argv=None):
+    """メイン関数"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    # validate・batch・pipeline・roster・export・index・watch・serve以降の引数はargparseを通さず各スクリプトに渡す
+    command = next((arg for arg in argv if arg in COMMANDS), None)
+    if command in PASSTHROUGH_COMMANDS:
+        position = argv.index(command)
+        args = parser.parse_args(argv[:position + 1])
+        args.passthrough_args = argv[position + 1:]
+    else:
+        args = parser.parse_args(argv)
+
+    if args.import_profile:
+        return run_with_import_profile([arg for arg in argv if arg != '--import-profile'])
+
+    # 各スクリプト・ワーカープロセスのどこから変換しても同じフォントを使うよう、環境変数で渡す
+    if args.font:
+        from font_subset import FONT_ENV
+        if not os.path.exists(args.font):
+            print(f"✗ フォントが見つかりません: {args.font}")
+            return 1
+        os.environ[FONT_ENV] = args.font
+
+    sinks = []
+    if args.trace or args.trace_jsonl:
+        from instrumentation import ChromeTraceSink, JsonLinesSink
+        if args.trace:
+            sinks.append(ChromeTraceSink(args.trace))
+        if args.trace_jsonl:
+            sinks.append(JsonLinesSink(args.trace_jsonl))
+    if not sinks:
+        return args.handler(args)
+
+    import instrumentation
+    with instrumentation.recording(*sinks, memory=args.trace_memory):
+        with instrumentation.span('command', command=args.command):
+            return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
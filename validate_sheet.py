@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシートの構造を変換の前に検査するスクリプト
+必須セクション・テーブルの列・プロジェクトの項目をSCHEMAで宣言し、見出し索引だけを使って検査する
+（ブロック列の作成や描画は行わないため、変換よりはるかに速い）
+
+抽出関数は見出しや行の形式が合わない部分を黙って読み飛ばすため、
+そのまま変換すると見出しだけでデータのない出力になる。ここでは読み飛ばされる箇所を行番号付きで報告する
+
+- エラー: 変換しても主要なデータが空になるもの（一括変換では描画せずに除外する）
+- 警告: 一部の行・項目が読み込まれないもの（変換は行う）
+
+使い方:
+    python validate_sheet.py HM_スキルシート.md
+    python validate_sheet.py skillsheets/ -r --csv --strict
+"""
+
+import argparse
+import bisect
+import re
+import sys
+import time
+
+from md_to_xlsx_improved import (
+    PROJECT_INFO_PATTERN, PROJECT_TITLE_PATTERN, STRENGTH_PATTERN, find_section,
+)
+from skill_index import parse_period, parse_years
+from skill_sheet_model import RecordSkillSheet, TABLE_SEPARATOR_PATTERN, load_document
+
+ERROR = 'error'
+WARNING = 'warning'
+
+SEVERITY_LABELS = {ERROR: 'エラー', WARNING: '警告'}
+
+# 番号付きリストの行
+NUMBERED_ITEM_PATTERN = re.compile(r'^\d+\.\s')
+
+# セクションごとの検査（見出しは抽出関数と同じく、装飾を除いて前方一致で探す）
+#   required  セクションがない・データが読み込めない場合はエラー（それ以外は警告）
+#   content   内容の種類（CHECKSのキー）
+#   columns   テーブルの見出し行に必要な列（ない場合、見出し行がデータとして読み込まれる）
+#   keys      テーブルの1列目に必要な項目
+SCHEMA = [
+    {'section': '基本情報', 'required': True, 'content': 'table', 'columns': ['項目'], 'keys': ['氏名']},
+    {'section': '得意分野', 'required': False, 'content': 'list'},
+    {'section': '自己PR・備考', 'required': False, 'content': 'list'},
+    {'section': '技術スキル', 'required': True, 'content': 'skill_tables', 'columns': ['経験年数']},
+    {'section': '職歴・プロジェクト経験', 'required': True, 'content': 'projects'},
+    {'section': '担当領域', 'required': False, 'content': 'matrix'},
+    {'section': '強み・特徴', 'required': False, 'content': 'strengths'},
+]
+
+# プロジェクト（「### N. 会社名（期間）」）ごとの検査
+#   fields       見出し直下の「**業種：** 〜 | **雇用形態：** 〜」の行の項目
+#   subsections  必要な「#### 」の小見出し
+PROJECT_SCHEMA = {
+    'fields': ['業種', '雇用形態'],
+    'subsections': ['プロジェクト概要', '主な業務内容'],
+}
+
+def table_cells(line):
+    """抽出関数と同じ方法でテーブルの行をセルに分ける（空のセルは詰める）"""
+    return [part.strip() for part in line.split('|') if part.strip()]
+
+class SheetValidator:
+    """1件のスキルシートの見出し索引を検査し、(行番号, 重大度, メッセージ) を集める"""
+
+    def __init__(self, content, index):
+        self.content = content
+        self.index = index
+        self.issues = []
+        # 行の開始位置（見出し索引の位置を行番号に変換する）
+        self.line_starts = [0]
+        for line in content.splitlines(keepends=True):
+            self.line_starts.append(self.line_starts[-1] + len(line))
+
+    def report(self, line, severity, message):
+        self.issues.append((line, severity, message))
+
+    def line_of(self, offset):
+        """文字位置の行番号（1始まり）"""
+        return bisect.bisect_right(self.line_starts, offset)
+
+    def lines(self, section, include_children=True):
+        """セクション本文の (行番号, 行) のリスト"""
+        end = section['end']
+        if not include_children and section['children']:
+            end = section['children'][0]['start']
+        first = self.line_of(section['body_start'])
+        return list(enumerate(self.content[section['body_start']:end].splitlines(), first))
+
+    def table(self, section):
+        """セクション内の最初のテーブルの (行番号, 行) のリスト（区切り行を除く）"""
+        rows = []
+        for number, line in self.lines(section):
+            if line.strip().startswith('|'):
+                if not TABLE_SEPARATOR_PATTERN.match(line.strip()):
+                    rows.append((number, line))
+            elif rows:
+                break
+        return rows
+
+    def heading(self, section):
+        """セクションの見出し行の行番号と、メッセージ用の見出し"""
+        return self.line_of(section['start']), f"「{section['title']}」"
+
+    def validate(self):
+        for rule in SCHEMA:
+            section = find_section(self.index, rule['section'])
+            if section is None:
+                if rule['required']:
+                    self.report(None, ERROR, f"必須のセクション「## {rule['section']}」がありません")
+                continue
+            CHECKS[rule['content']](self, section, rule)
+        # 行番号の順にする（セクションがないなど行番号のないものを先に）
+        return sorted(self.issues, key=lambda issue: issue[0] or 0)
+
+    def missing_data(self, section, rule, message):
+        """セクションから読み込めるデータがない（必須のセクションはエラー）"""
+        line, title = self.heading(section)
+        self.report(line, ERROR if rule['required'] else WARNING, f"{title}{message}")
+
+    def check_columns(self, section, rule, rows):
+        """見出し行に必要な列があるか（ない場合は見出し行がデータとして読み込まれる）"""
+        header_line, header = rows[0]
+        for column in rule.get('columns', []):
+            if column not in header:
+                self.report(header_line, WARNING,
+                            f"{self.heading(section)[1]}のテーブルの見出し行に「{column}」の列がないため、"
+                            f"見出し行がデータとして読み込まれます")
+                return rows
+        return rows[1:]
+
+    def check_table(self, section, rule):
+        """2列（項目・内容）のテーブル"""
+        rows = self.table(section)
+        if not rows:
+            self.missing_data(section, rule, "にテーブルがありません")
+            return
+        keys = set()
+        for number, line in self.check_columns(section, rule, rows):
+            cells = table_cells(line)
+            if len(cells) < 2:
+                self.report(number, WARNING, "テーブルの行の列が2つ未満（空のセルを含む）のため読み込まれません")
+            else:
+                keys.add(cells[0].replace('**', ''))
+        if not keys:
+            self.missing_data(section, rule, "のテーブルにデータ行がありません")
+            return
+        for key in rule.get('keys', []):
+            if key not in keys:
+                line, title = self.heading(section)
+                self.report(line, WARNING, f"{title}のテーブルに「{key}」の行がありません")
+
+    def check_list(self, section, rule):
+        """「- 」のリスト（下位のセクションも含む）"""
+        if not any(line.strip().startswith('- ') for _, line in self.lines(section)):
+            self.missing_data(section, rule, "にリスト項目（「- 」）がありません")
+
+    def check_skill_tables(self, section, rule):
+        """「### カテゴリ」ごとの (技術, 経験年数) のテーブル"""
+        count = 0
+        for child in section['children']:
+            rows = self.table(child)
+            if not rows:
+                line, title = self.heading(child)
+                self.report(line, WARNING, f"{title}にテーブルがありません")
+                continue
+            for number, line in self.check_columns(child, rule, rows):
+                cells = table_cells(line)
+                if len(cells) < 2:
+                    self.report(number, WARNING, "テーブルの行の列が2つ未満（空のセルを含む）のため読み込まれません")
+                    continue
+                count += 1
+                if parse_years(cells[1]) is None:
+                    self.report(number, WARNING, f"経験年数「{cells[1]}」を年数として読み取れません")
+        if not count:
+            self.missing_data(section, rule, "に読み込める技術（「### カテゴリ」ごとのテーブル）がありません")
+
+    def check_projects(self, section, rule):
+        """「### N. 会社名（期間）」ごとのプロジェクト"""
+        count = 0
+        for child in section['children']:
+            line, title = self.heading(child)
+            match = PROJECT_TITLE_PATTERN.match(child['title'])
+            if not match:
+                self.report(line, WARNING, f"見出し{title}が「N. 会社名（期間）」の形式でないため読み込まれません")
+                continue
+            count += 1
+
+            start, end = parse_period(match.group(3))
+            if start is None or end is None:
+                self.report(line, WARNING, f"{title}の期間「{match.group(3)}」を年月として読み取れません")
+
+            summary = '\n'.join(text for _, text in self.lines(child, include_children=False))
+            if not PROJECT_INFO_PATTERN.search(summary):
+                missing = [field for field in PROJECT_SCHEMA['fields'] if f"**{field}：**" not in summary]
+                fields = '・'.join(missing or PROJECT_SCHEMA['fields'])
+                self.report(line, WARNING, f"{title}の見出しの直後に「**{fields}：** 〜」の行がありません")
+
+            subsections = {subsection['title'] for subsection in child['children']}
+            for name in PROJECT_SCHEMA['subsections']:
+                if name not in subsections:
+                    self.report(line, WARNING, f"{title}に「#### {name}」がありません")
+        if not count:
+            self.missing_data(section, rule, "に読み込めるプロジェクト（「### N. 会社名（期間）」）がありません")
+
+    def check_matrix(self, section, rule):
+        """1列目がプロジェクト、2列目以降が工程のテーブル"""
+        rows = self.table(section)
+        if len(rows) < 2:
+            self.missing_data(section, rule, "にデータ行のあるテーブルがありません")
+            return
+        columns = len(table_cells(rows[0][1]))
+        for number, line in rows[1:]:
+            if len(table_cells(line)) < columns:
+                self.report(number, WARNING,
+                            f"テーブルの行の列が見出し行（{columns}列）より少ない（空のセルを含む）ため読み込まれません")
+
+    def check_strengths(self, section, rule):
+        """「1. **見出し**: 内容」の番号付きリスト"""
+        count = 0
+        for number, line in self.lines(section):
+            stripped = line.strip()
+            if not NUMBERED_ITEM_PATTERN.match(stripped):
+                continue
+            if STRENGTH_PATTERN.match(stripped):
+                count += 1
+            else:
+                self.report(number, WARNING, "「N. **見出し**: 内容」の形式でないため読み込まれません")
+        if not count:
+            self.missing_data(section, rule, "に番号付きリスト（「1. **見出し**: 内容」）がありません")
+
+# 内容の種類と検査メソッド
+CHECKS = {
+    'table': SheetValidator.check_table,
+    'list': SheetValidator.check_list,
+    'skill_tables': SheetValidator.check_skill_tables,
+    'projects': SheetValidator.check_projects,
+    'matrix': SheetValidator.check_matrix,
+    'strengths': SheetValidator.check_strengths,
+}
+
+def validate_document(document):
+    """ドキュメントを検査し、(行番号, 重大度, メッセージ) のリストを返す
+
+    CSVなどレコードから作成したドキュメントはレコードから作成したマークダウンを検査するため、
+    行番号は付けない（入力ファイルの行と対応しない）
+    """
+    issues = SheetValidator(document.content, document.index).validate()
+    if isinstance(document, RecordSkillSheet):
+        issues = [(None, severity, message) for _, severity, message in issues]
+    return issues
+
+def validate_file(path):
+    """ファイルを読み込んで検査する（読み込めない場合はエラー1件）"""
+    try:
+        document = load_document(path)
+    except Exception as e:
+        return [(None, ERROR, f"読み込めません: {type(e).__name__}: {e}")]
+    return validate_document(document)
+
+def is_rejected(issues, strict=False):
+    """変換の対象から除外するか（strictの場合は警告も除外する）"""
+    return any(severity == ERROR or strict for _, severity, _ in issues)
+
+def format_issue(path, issue):
+    """「ファイル:行: 重大度: メッセージ」の形式（行番号がない場合は省略）"""
+    line, severity, message = issue
+    location = f"{path}:{line}" if line else path
+    return f"{location}: {SEVERITY_LABELS[severity]}: {message}"
+
+def print_issues(path, issues, strict=False):
+    """1ファイル分の検査結果を表示"""
+    mark = '✗' if is_rejected(issues, strict) else '✓'
+    counts = [f"{SEVERITY_LABELS[severity]} {count}件"
+              for severity in (ERROR, WARNING)
+              for count in [sum(1 for issue in issues if issue[1] == severity)] if count]
+    print(f"{mark} {path}{'（' + ' / '.join(counts) + '）' if counts else ''}")
+    for issue in issues:
+        print(f"    {format_issue(path, issue)}")
+
+def print_validation_summary(results, strict=False):
+    """全体の件数を表示し、除外するファイルの一覧を表示"""
+    rejected = [path for path, issues in results if is_rejected(issues, strict)]
+    warned = [path for path, issues in results if issues and not is_rejected(issues, strict)]
+    print(f"\n検査: {len(results)}ファイル（問題なし {len(results) - len(rejected) - len(warned)}"
+          f" / 警告あり {len(warned)} / 不合格 {len(rejected)}）")
+    if rejected:
+        print("\n不合格のファイル:")
+        for path in rejected:
+            print(f"  - {path}")
+
+def main(argv=None):
+    """メイン関数"""
+    from batch_convert import collect_markdown_files
+
+    parser = argparse.ArgumentParser(description="スキルシートの構造（必須セクション・テーブルの列・プロジェクトの項目）を検査します")
+    parser.add_argument('targets', nargs='+', help="スキルシートのファイル、ディレクトリ、またはglobパターン")
+    parser.add_argument('-r', '--recursive', action='store_true', help="ディレクトリを再帰的に探索する")
+    parser.add_argument('--csv', action='store_true', help="ディレクトリ内のグリッド形式のCSV（*.csv）も検査する")
+    parser.add_argument('--strict', action='store_true', help="警告のあるファイルも不合格にする")
+    parser.add_argument('-q', '--quiet', action='store_true', help="問題のないファイルを表示しない")
+    args = parser.parse_args(argv)
+
+    extensions = ('.md', '.csv') if args.csv else ('.md',)
+    paths = collect_markdown_files(args.targets, args.recursive, extensions)
+    if not paths:
+        print("✗ スキルシートが見つかりません")
+        return 1
+
+    started = time.perf_counter()
+    results = []
+    for path in paths:
+        issues = validate_file(path)
+        results.append((path, issues))
+        if issues or not args.quiet:
+            print_issues(path, issues, args.strict)
+    print_validation_summary(results, args.strict)
+    print(f"所要時間: {time.perf_counter() - started:.2f}秒")
+    return 1 if any(is_rejected(issues, args.strict) for _, issues in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
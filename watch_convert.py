@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキルシートの監視モード
+マークダウン（・グリッド形式のCSV）の保存を監視し、変更されたファイルの出力だけを再作成する
+変換モジュールは起動時に1回だけ読み込み、PDFは起動済みのブラウザ（PdfRenderWorker）で描画するため、
+保存のたびにインタープリタの起動・インポート・ブラウザの起動を待たない
+
+保存が続く間は待ち（デバウンス）、最後の保存から一定時間たってから変換する
+抽出したレコードが前回と同じ場合はxlsxを、ブロック列が前回と同じ場合はdocx・html・pdfを作り直さない
+変換スクリプト自体を変更した場合は再起動が必要
+
+使い方:
+    python watch_convert.py HM_スキルシート.md
+    python watch_convert.py skillsheets/ -f xlsx docx html pdf --pdf-backend native
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+from batch_convert import CONVERTERS, DEFAULT_FORMATS, PDF_BACKENDS, collect_markdown_files, load_renderer, output_path
+from skill_sheet_model import load_document
+
+# 監視の間隔と、最後の保存から変換までの待ち時間（秒）
+DEFAULT_INTERVAL = 0.05
+DEFAULT_DEBOUNCE = 0.05
+
+# 変換関数の中で読み込まれる重い依存（起動時に読み込んで、最初の保存での変換を速くする）
+WARMUP_MODULES = {
+    'xlsx': ['openpyxl', 'openpyxl.cell', 'openpyxl.styles', 'openpyxl.packaging.custom'],
+    'docx': ['docx'],
+}
+
+# 変換の順序（速い形式から出力し、ブラウザでのPDF描画はdocxの作成と並行して行う）
+FORMAT_ORDER = ['html', 'xlsx', 'pdf', 'docx']
+
+def file_state(path):
+    """変更の検出に使う (更新日時, サイズ)（ファイルがない場合はNone）"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def record_snapshot(document):
+    """xlsxに書き込むレコード（前回と比較してxlsxの再作成が必要か判定する）"""
+    return (
+        document.title,
+        document.updated,
+        document.basic_info,
+        document.specialty_areas,
+        document.technical_skills,
+        document.self_pr,
+        document.projects,
+        document.responsibility_rows,
+        document.strengths,
+    )
+
+class WarmConverter:
+    """変換関数と前回の変換内容を保持し、変わった形式だけを再作成する"""
+
+    def __init__(self, formats, output_dir=None, pdf_backend='browser'):
+        self.formats = [fmt for fmt in FORMAT_ORDER if fmt in formats]
+        self.output_dir = output_dir
+        self.pdf_backend = pdf_backend
+        self.worker = None
+        self.previous = {}
+
+        # 変換モジュールを先に読み込んでおく
+        self.renderers = {fmt: load_renderer(fmt, pdf_backend) for fmt in self.formats}
+        for fmt in self.formats:
+            for module_name in WARMUP_MODULES.get(fmt, []):
+                importlib.import_module(module_name)
+        if 'pdf' in self.formats and pdf_backend == 'browser':
+            from pdf_render_worker import PdfRenderWorker
+            self.worker = PdfRenderWorker(pages=1)
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.close()
+            self.worker = None
+
+    def fingerprints(self, document):
+        """形式ごとに、前回と比較する内容（xlsxは抽出したレコード、それ以外はブロック列）
+
+        ブロック列はdocx・html・pdfを監視する場合だけ作成する（xlsxは見出し索引と抽出だけで足りる）
+        """
+        records = record_snapshot(document) if 'xlsx' in self.formats else None
+        blocks = document.blocks if any(fmt != 'xlsx' for fmt in self.formats) else None
+        return {fmt: records if fmt == 'xlsx' else blocks for fmt in self.formats}
+
+    def convert(self, md_file, force=False):
+        """1ファイルを変換し、(形式, 出力ファイル, 秒数またはNone, エラー) のリストを返す
+
+        秒数がNoneの形式は内容が変わっていないため再作成しなかったもの
+        """
+        results = []
+        try:
+            document = load_document(md_file)
+            fingerprints = self.fingerprints(document)
+        except Exception as e:
+            return [(None, md_file, None, f"{type(e).__name__}: {e}")]
+
+        previous = self.previous.get(md_file, {})
+        pending_pdf = None
+        for fmt in self.formats:
+            target = output_path(md_file, CONVERTERS[fmt][0], self.output_dir)
+            if not force and previous.get(fmt) == fingerprints[fmt] and os.path.exists(target):
+                results.append((fmt, target, None, None))
+                continue
+
+            started = time.perf_counter()
+            try:
+                if fmt == 'pdf' and self.worker is not None:
+                    # ブラウザでの描画を待たずに次の形式（docx）の作成を始める
+                    from simple_md_to_pdf import render_html
+                    pending_pdf = (target, started, self.worker.render(render_html(document), target))
+                    continue
+                self.renderers[fmt](document, target)
+                results.append((fmt, target, time.perf_counter() - started, None))
+                previous[fmt] = fingerprints[fmt]
+            except Exception as e:
+                results.append((fmt, target, time.perf_counter() - started, f"{type(e).__name__}: {e}"))
+
+        if pending_pdf is not None:
+            target, started, future = pending_pdf
+            try:
+                future.result()
+                previous['pdf'] = fingerprints['pdf']
+                results.append(('pdf', target, time.perf_counter() - started, None))
+            except Exception as e:
+                results.append(('pdf', target, time.perf_counter() - started, f"{type(e).__name__}: {e}"))
+
+        self.previous[md_file] = previous
+        return results
+
+def print_results(md_file, results, detected):
+    """変換結果を表示（保存の検出からの経過時間も表示する）"""
+    for fmt, target, seconds, error in results:
+        if error:
+            print(f"✗ {md_file}{f' [{fmt}]' if fmt else ''}: {error}")
+        elif seconds is not None:
+            print(f"✓ {md_file} → {target}（{seconds * 1000:.0f} ms）")
+    rendered = [fmt for fmt, _, seconds, error in results if seconds is not None and not error]
+    if detected is not None and rendered:
+        print(f"  保存から {(time.perf_counter() - detected) * 1000:.0f} ms（{', '.join(rendered)}）")
+    unchanged = [fmt for fmt, _, seconds, error in results if fmt and seconds is None and not error]
+    if unchanged:
+        print(f"  内容に変更なし: {', '.join(unchanged)}")
+
+def is_up_to_date(md_file, formats, output_dir):
+    """すべての出力が入力より新しいか"""
+    source_time = os.path.getmtime(md_file)
+    for fmt in formats:
+        target = output_path(md_file, CONVERTERS[fmt][0], output_dir)
+        if not os.path.exists(target) or os.path.getmtime(target) < source_time:
+            return False
+    return True
+
+def watch(targets, converter, recursive=False, extensions=('.md',), interval=DEFAULT_INTERVAL,
+          debounce=DEFAULT_DEBOUNCE, initial=True):
+    """ファイルを監視し、保存されるたびに変換する（Ctrl+Cで終了）"""
+    states = {}
+    pending = {}
+
+    # 起動時は出力がない、または古いファイルだけを変換し、それ以外は前回の内容として記録する
+    for md_file in collect_markdown_files(targets, recursive, extensions):
+        states[md_file] = file_state(md_file)
+        if states[md_file] is None:
+            continue
+        if initial and not is_up_to_date(md_file, converter.formats, converter.output_dir):
+            print_results(md_file, converter.convert(md_file, force=True), None)
+        else:
+            try:
+                converter.previous[md_file] = converter.fingerprints(load_document(md_file))
+            except Exception as e:
+                print(f"✗ {md_file}: {type(e).__name__}: {e}")
+
+    print(f"監視中: {len(states)}ファイル（Ctrl+Cで終了）")
+    while True:
+        time.sleep(interval)
+        now = time.perf_counter()
+        for md_file in collect_markdown_files(targets, recursive, extensions):
+            state = file_state(md_file)
+            if state is not None and state != states.get(md_file):
+                states[md_file] = state
+                # 保存が続く間は変換を延期する（最初の検出時刻は遅延の表示用に残す）
+                first_detected = pending.get(md_file, (now, now))[0]
+                pending[md_file] = (first_detected, now)
+
+        for md_file, (detected, changed) in list(pending.items()):
+            if now - changed >= debounce:
+                del pending[md_file]
+                print_results(md_file, converter.convert(md_file), detected)
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="スキルシートの保存を監視し、変更された出力を再作成します")
+    parser.add_argument('targets', nargs='+', help="マークダウンファイル、ディレクトリ、またはglobパターン")
+    parser.add_argument('-f', '--formats', nargs='+', choices=sorted(CONVERTERS), default=DEFAULT_FORMATS,
+                        help="出力形式（既定: xlsx docx html）")
+    parser.add_argument('--pdf-backend', choices=sorted(PDF_BACKENDS), default='browser',
+                        help="PDFの描画方式（browser: 起動済みのブラウザ, native: Pythonのみ）")
+    parser.add_argument('-o', '--output-dir', help="出力先ディレクトリ（既定: 入力ファイルと同じ場所）")
+    parser.add_argument('-r', '--recursive', action='store_true', help="ディレクトリを再帰的に探索する")
+    parser.add_argument('--csv', action='store_true', help="ディレクトリ内のグリッド形式のCSV（*.csv）も監視する")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"変更を確認する間隔（秒、既定: {DEFAULT_INTERVAL}）")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help=f"最後の保存から変換までの待ち時間（秒、既定: {DEFAULT_DEBOUNCE}）")
+    parser.add_argument('--no-initial', action='store_true', help="起動時に古い出力を再作成しない")
+    args = parser.parse_args(argv)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    extensions = ('.md', '.csv') if args.csv else ('.md',)
+
+    try:
+        converter = WarmConverter(args.formats, args.output_dir, args.pdf_backend)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+    try:
+        watch(args.targets, converter, args.recursive, extensions, args.interval, args.debounce,
+              initial=not args.no_initial)
+    except KeyboardInterrupt:
+        print("\n監視を終了しました")
+    finally:
+        converter.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
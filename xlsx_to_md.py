@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excelファイルからマークダウンを作成するスクリプト（md_to_xlsx_improved.py の逆変換）
+md_to_xlsx_improved.py が作成した7シート（基本情報・得意分野・技術スキル・自己PR・備考・
+プロジェクト経験・担当領域・強み・特徴）を読み取り専用モードで1行ずつ読み、
+抽出関数と同じ形式のレコードに戻してから skill_sheet_writer.py でマークダウンに書き出す
+プロジェクト経験・担当領域はマークダウンを書き出しながら1行ずつ読むため、
+数万行のワークブックでもセルを全件メモリに読み込まない
+
+使い方:
+    python xlsx_to_md.py HM.xlsx                       # HM.md を作成
+    python xlsx_to_md.py HM.xlsx -o HM_スキルシート.md
+"""
+
+import argparse
+import os
+
+from instrumentation import span
+from skill_sheet_model import RecordSkillSheet
+from skill_sheet_writer import write_markdown
+
+# プロジェクト経験シートの列とレコードのキー（md_to_xlsx_improved.py と同じ並び）
+PROJECT_KEYS = ['no', 'company', 'period', 'industry', 'employment', 'team_size', 'technologies', 'overview', 'duties', 'skills', 'achievements']
+
+# 技術スキルシートで常に持つカテゴリ（抽出関数の戻り値と同じ）
+TECHNICAL_SKILL_CATEGORIES = ["開発言語", "フレームワーク", "データベース", "サーバー・OS"]
+
+def cell_text(value):
+    """セルの値を文字列にする（空のセルは空文字、整数値の小数は整数にする）"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def data_rows(wb, title):
+    """シートのヘッダー行より下の行を、値の文字列のリストとして1行ずつ返す（シートがない場合は何も返さない）"""
+    if title not in wb.sheetnames:
+        return
+    for row in wb[title].iter_rows(min_row=2, values_only=True):
+        values = [cell_text(value) for value in row]
+        if any(values):
+            yield values
+
+def header_row(wb, title):
+    """シートのヘッダー行（シートがない、または空の場合はNone）"""
+    if title not in wb.sheetnames:
+        return None
+    for row in wb[title].iter_rows(max_row=1, values_only=True):
+        headers = [cell_text(value) for value in row]
+        while headers and not headers[-1]:
+            headers.pop()
+        return headers or None
+    return None
+
+class SheetRecords:
+    """シートの行を読むたびにレコードに変換する、繰り返し読み出せる列
+
+    リストの代わりにRecordSkillSheetに渡し、書き出すときに1行ずつ読み込む
+    """
+
+    def __init__(self, wb, title, convert):
+        self.wb = wb
+        self.title = title
+        self.convert = convert
+
+    def __iter__(self):
+        for values in data_rows(self.wb, self.title):
+            yield self.convert(values)
+
+def project_record(values):
+    """プロジェクト経験シートの1行をレコードにする"""
+    values = values + [''] * (len(PROJECT_KEYS) - len(values))
+    return dict(zip(PROJECT_KEYS, values))
+
+def read_basic_info(wb):
+    """基本情報シート（項目, 内容）"""
+    return {values[0]: values[1] if len(values) > 1 else '' for values in data_rows(wb, "基本情報")}
+
+def read_specialty_areas(wb):
+    """得意分野シート（カテゴリ, 内容）"""
+    specialty_areas = {}
+    for values in data_rows(wb, "得意分野"):
+        specialty_areas.setdefault(values[0], []).append(values[1] if len(values) > 1 else '')
+    return specialty_areas
+
+def read_technical_skills(wb):
+    """技術スキルシート（カテゴリ, 技術・言語, 経験年数。経験年数（実績）の列は変換のたびに計算するため読まない）"""
+    skills = {category: {} for category in TECHNICAL_SKILL_CATEGORIES}
+    for values in data_rows(wb, "技術スキル"):
+        values = values + [''] * (3 - len(values))
+        skills.setdefault(values[0], {})[values[1]] = values[2]
+    return skills
+
+def read_numbered_items(wb, title):
+    """自己PR・備考シート、強み・特徴シート（No, 内容）"""
+    return [values[1] for values in data_rows(wb, title) if len(values) > 1]
+
+def read_responsibility_rows(wb):
+    """担当領域シート（ヘッダーと、行を1件ずつ読む列）"""
+    headers = header_row(wb, "担当領域")
+    if headers is None:
+        return None
+    width = len(headers)
+    rows = SheetRecords(wb, "担当領域", lambda values: (values + [''] * width)[:width])
+    return headers, rows
+
+def default_title(basic_info):
+    """表題がプロパティにない場合（以前のバージョンで作成したファイル）は氏名から作る"""
+    name = basic_info.get("氏名", '').split('（')[0].strip()
+    return f"{name} スキルシート" if name else "スキルシート"
+
+def read_workbook_records(wb):
+    """読み取り専用で開いたワークブックからレコードの辞書を作成"""
+    from md_to_xlsx_improved import UPDATED_PROPERTY
+
+    basic_info = read_basic_info(wb)
+    updated = ''
+    for prop in wb.custom_doc_props:
+        if prop.name == UPDATED_PROPERTY:
+            updated = cell_text(prop.value)
+    return {
+        'title': wb.properties.title or default_title(basic_info),
+        'updated': updated,
+        'basic_info': basic_info,
+        'specialty_areas': read_specialty_areas(wb),
+        'technical_skills': read_technical_skills(wb),
+        'self_pr': read_numbered_items(wb, "自己PR・備考"),
+        'project_experience': SheetRecords(wb, "プロジェクト経験", project_record),
+        'responsibility_rows': read_responsibility_rows(wb),
+        'strengths': read_numbered_items(wb, "強み・特徴"),
+    }
+
+def excel_to_markdown(excel_file, md_file):
+    """Excelファイルを読み込み、マークダウンファイルに書き出す"""
+    # openpyxlは読み込みに時間がかかるため、変換するときだけインポートする
+    from openpyxl import load_workbook
+
+    with span('xlsx.read', file=excel_file):
+        wb = load_workbook(excel_file, read_only=True)
+    try:
+        document = RecordSkillSheet(read_workbook_records(wb), excel_file)
+        with span('markdown.write', file=md_file):
+            with open(md_file, 'w', encoding='utf-8') as f:
+                write_markdown(document, f)
+    finally:
+        wb.close()
+    return md_file
+
+def main(argv=None):
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="スキルシートのExcelファイルをマークダウンに変換します")
+    parser.add_argument('input', help="Excelファイル（md_to_xlsx_improved.py で作成したもの）")
+    parser.add_argument('-o', '--output', help="出力ファイル（既定: 入力ファイルと同じ場所の .md）")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f"✗ ファイルが見つかりません: {args.input}")
+        return 1
+
+    output = args.output or os.path.splitext(args.input)[0] + '.md'
+    try:
+        excel_to_markdown(args.input, output)
+    except Exception as e:
+        print(f"✗ エラー: {args.input} の変換に失敗しました - {e}")
+        return 1
+    print(f"✓ {args.input} → {output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())